@@ -0,0 +1,156 @@
+import importlib.util
+import os
+import time
+
+import numpy as np
+import cv2
+
+# scipy is optional and slow to import, so it is only loaded on first use.
+HAVE_SCIPY = importlib.util.find_spec("scipy") is not None
+
+# ─────────────────────────────────────────────
+# Pluggable real-input FFT backends.
+# All backends take float32 images and return the complex64 half spectrum
+# of rfft2 (shape H × W//2+1, unshifted); irfft2 inverts it back to float32.
+# The transform runs over the last two axes, so a (C, H, W) stack of planes
+# is processed as one batch.
+# ─────────────────────────────────────────────
+
+
+def optimal_shape(shape):
+    # Sizes with only small prime factors (2, 3, 5) transform much faster.
+    return cv2.getOptimalDFTSize(shape[0]), cv2.getOptimalDFTSize(shape[1])
+
+
+def pad_to(img, shape):
+    # Pads the last two axes up to shape by mirroring the edge.  Zero padding
+    # would add an artificial step at the border whose ringing changes the
+    # filtered image, and differently for every image size.
+    rows, cols = img.shape[-2:]
+    if (rows, cols) == tuple(shape):
+        return img
+    widths = [(0, 0)] * (img.ndim - 2) + [(0, shape[0] - rows), (0, shape[1] - cols)]
+    return np.pad(img, widths, mode="symmetric")
+
+
+def hermitian_full(half, width, odd=False):
+    # Rebuilds the full-width array from an rfft2 half using F[-k] = conj(F[k]).
+    # For real-valued views pass odd=True for antisymmetric ones (phase).
+    rows, half_cols = half.shape[-2:]
+    full = np.empty(half.shape[:-1] + (width,), dtype=half.dtype)
+    full[..., :half_cols] = half
+    mirror_rows = (-np.arange(rows)) % rows
+    mirror_cols = width - np.arange(half_cols, width)
+    mirrored = half[..., mirror_rows, :][..., mirror_cols]
+    if np.iscomplexobj(half):
+        mirrored = np.conj(mirrored)
+    elif odd:
+        mirrored = -mirrored
+    full[..., half_cols:] = mirrored
+    return full
+
+
+# ═══════════════════════════════════════════════════════
+# BACKENDS
+# ═══════════════════════════════════════════════════════
+class NumpyFFT:
+    name = "numpy"
+
+    def rfft2(self, img):
+        return np.fft.rfft2(img).astype(np.complex64, copy=False)
+
+    def irfft2(self, half, shape):
+        return np.fft.irfft2(half, s=shape).astype(np.float32, copy=False)
+
+
+class OpenCVFFT:
+    # cv2.dft is strictly 2-D, so stacked planes are transformed one by one.
+    name = "opencv"
+
+    def rfft2(self, img):
+        if img.ndim == 3:
+            return np.stack([self.rfft2(plane) for plane in img])
+        out = cv2.dft(np.ascontiguousarray(img, dtype=np.float32), flags=cv2.DFT_COMPLEX_OUTPUT)
+        half_cols = img.shape[1] // 2 + 1
+        return np.ascontiguousarray(out[:, :half_cols]).view(np.complex64)[..., 0]
+
+    def irfft2(self, half, shape):
+        if half.ndim == 3:
+            return np.stack([self.irfft2(plane, shape) for plane in half])
+        full = hermitian_full(half.astype(np.complex64, copy=False), shape[1])
+        planes = full.view(np.float32).reshape(shape[0], shape[1], 2)
+        return cv2.idft(planes, flags=cv2.DFT_SCALE | cv2.DFT_REAL_OUTPUT)
+
+
+class ScipyFFT:
+    name = "scipy"
+
+    def __init__(self, workers=-1):
+        self.workers = workers
+
+    @property
+    def fft(self):
+        import scipy.fft
+        return scipy.fft
+
+    def rfft2(self, img):
+        return self.fft.rfft2(img, workers=self.workers).astype(np.complex64, copy=False)
+
+    def irfft2(self, half, shape):
+        return self.fft.irfft2(half, s=shape, workers=self.workers).astype(np.float32, copy=False)
+
+
+def available_backends(workers=-1):
+    backends = {"numpy": NumpyFFT(), "opencv": OpenCVFFT()}
+    if HAVE_SCIPY:
+        backends["scipy"] = ScipyFFT(workers)
+    return backends
+
+
+_active = NumpyFFT()
+
+
+def get_backend():
+    return _active
+
+
+def set_backend(name, workers=-1):
+    global _active
+    backends = available_backends(workers)
+    if name not in backends:
+        raise ValueError(f"FFT backend '{name}' is not available "
+                         f"(choose from: {', '.join(backends)})")
+    _active = backends[name]
+    return _active
+
+
+# ═══════════════════════════════════════════════════════
+# STARTUP MICRO-BENCHMARK
+# ═══════════════════════════════════════════════════════
+def benchmark(shape=(600, 800), repeats=3, workers=-1):
+    # Best-of-N forward + inverse time per backend, in seconds.
+    img = np.random.default_rng(0).random(optimal_shape(shape), dtype=np.float32)
+    timings = {}
+    for name, backend in available_backends(workers).items():
+        best = float("inf")
+        for _ in range(repeats):
+            t0 = time.perf_counter()
+            backend.irfft2(backend.rfft2(img), img.shape)
+            best = min(best, time.perf_counter() - t0)
+        timings[name] = best
+    return timings
+
+
+def select_fastest(shape=(600, 800), repeats=3, workers=-1):
+    timings = benchmark(shape, repeats, workers)
+    set_backend(min(timings, key=timings.get), workers)
+    return _active.name, timings
+
+
+def configure(name="auto", workers=-1):
+    # "auto" runs the micro-benchmark; anything else selects that backend.
+    # IPS_FFT_BACKEND in the environment overrides "auto".
+    name = os.environ.get("IPS_FFT_BACKEND", name) if name == "auto" else name
+    if name == "auto":
+        return select_fastest(workers=workers)[0]
+    return set_backend(name, workers).name
@@ -1,30 +1,48 @@
-﻿import sys
-import numpy as np
-import cv2
-from PyQt5.QtWidgets import (
+﻿import importlib
+import os
+import sys
+import math
+import time
+_STARTED = time.perf_counter()    # before the heavy imports, so startup time includes them
+from collections import OrderedDict  # noqa: E402
+from concurrent.futures.process import BrokenProcessPool  # noqa: E402
+import numpy as np  # noqa: E402
+import cv2  # noqa: E402
+from PyQt5.QtWidgets import (  # noqa: E402
     QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout,
     QPushButton, QLabel, QFileDialog, QFrame, QGroupBox,
-    QScrollArea, QGraphicsView, QGraphicsScene, QGraphicsPixmapItem,
+    QScrollArea, QGraphicsView, QGraphicsScene, QGraphicsItem,
     QDialog, QTextEdit, QDoubleSpinBox, QSpinBox, QDialogButtonBox,
-    QTabWidget, QSizePolicy, QSplitter
+    QTabWidget, QSplitter, QSlider, QListWidget, QShortcut, QDockWidget,
+    QLineEdit, QGridLayout, QComboBox, QCheckBox
 )
-from PyQt5.QtGui import QFont, QPixmap, QImage, QColor
-from PyQt5.QtCore import Qt, QTimer
-from PyQt5.QtGui import QTextCursor
-from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as FigureCanvas
-from matplotlib.figure import Figure
-import matplotlib.pyplot as plt
+from PyQt5.QtGui import QFont, QPixmap, QImage, QColor, QKeySequence, QPainter  # noqa: E402
+from PyQt5.QtCore import Qt, QTimer, QObject, QRunnable, QThreadPool, QRectF, pyqtSignal  # noqa: E402
+from PyQt5.QtGui import QTextCursor  # noqa: E402
+from PyQt5 import sip  # noqa: E402
+
+import fft_backend  # noqa: E402
+import image_history  # noqa: E402
+import image_ops  # noqa: E402
+import image_profile  # noqa: E402
 
 # ─────────────────────────────────────────────
 # Dialog: filter / noise / denoise parameters
 # ─────────────────────────────────────────────
 class FilterParamsDialog(QDialog):
+    # Non-modal: every change emits paramsChanged so the caller can render a
+    # live preview; Apply/Cancel map to accepted/rejected.  Denoise panels
+    # also offer auto-tuning (metric name, raw parameters).
+    paramsChanged = pyqtSignal()
+    autoTuneRequested = pyqtSignal(str, bool)
+
     def __init__(self, filter_name, parent=None):
         super().__init__(parent)
         self.setWindowTitle(f"⚙️ {filter_name} Parameters")
-        self.setModal(True)
-        self.resize(350, 220)
+        self.setModal(False)
+        self.resize(350, 240)
         self.params = {}
+        self.tune_box = None
 
         layout = QVBoxLayout(self)
 
@@ -40,6 +58,7 @@ class FilterParamsDialog(QDialog):
             self.params["strength"].setRange(0.0, 1.0)
             self.params["strength"].setValue(0.5)
             self.params["strength"].setSingleStep(0.1)
+            self.add_slider(layout, self.params["strength"], 100)
             layout.addWidget(self.params["strength"])
 
         elif "Denoise" in filter_name:
@@ -48,25 +67,69 @@ class FilterParamsDialog(QDialog):
             self.params["strength"].setRange(0.0, 1.0)
             self.params["strength"].setValue(0.5)
             self.params["strength"].setSingleStep(0.1)
+            self.add_slider(layout, self.params["strength"], 100)
             layout.addWidget(self.params["strength"])
+            self.add_tune_box(layout)
 
         elif filter_name in ["Low Pass", "High Pass", "Notch Pass", "Notch Reject", "Gaussian"]:
             layout.addWidget(QLabel("Cutoff Frequency:"))
             self.params["cutoff"] = QSpinBox()
             self.params["cutoff"].setRange(5, 200)
             self.params["cutoff"].setValue(30)
+            self.add_slider(layout, self.params["cutoff"], 1)
             layout.addWidget(self.params["cutoff"])
 
+        for box in self.params.values():
+            box.valueChanged.connect(self.paramsChanged)
+
         buttons = QDialogButtonBox(
             QDialogButtonBox.Ok | QDialogButtonBox.Cancel
         )
+        buttons.button(QDialogButtonBox.Ok).setText("✅ Apply")
         buttons.accepted.connect(self.accept)
         buttons.rejected.connect(self.reject)
         layout.addWidget(buttons)
 
+    def add_slider(self, layout, box, factor):
+        # Slider kept in sync with the spin box (slider units = value × factor).
+        slider = QSlider(Qt.Horizontal)
+        slider.setRange(int(box.minimum() * factor), int(box.maximum() * factor))
+        slider.setValue(int(round(box.value() * factor)))
+        slider.valueChanged.connect(lambda v: box.setValue(v / factor if factor != 1 else v))
+        box.valueChanged.connect(lambda v: slider.setValue(int(round(v * factor))))
+        layout.addWidget(slider)
+
+    def add_tune_box(self, layout):
+        # Sweeps the strength (or the raw cv2 parameters) against the
+        # original image and applies the best setting.
+        self.tune_box = QGroupBox("🎯 Auto-Tune")
+        box_layout = QVBoxLayout(self.tune_box)
+        row = QHBoxLayout()
+        row.addWidget(QLabel("Score:"))
+        self.tune_metric = QComboBox()
+        self.tune_metric.addItems(["PSNR", "SSIM"])
+        row.addWidget(self.tune_metric)
+        self.tune_raw = QCheckBox("Raw cv2 parameters")
+        row.addWidget(self.tune_raw)
+        box_layout.addLayout(row)
+        self.btn_tune = QPushButton("🎯 Find Best Setting")
+        self.btn_tune.clicked.connect(lambda: self.autoTuneRequested.emit(
+            self.tune_metric.currentText().lower(), self.tune_raw.isChecked()))
+        box_layout.addWidget(self.btn_tune)
+        self.tune_label = QLabel("Scored against the original image")
+        self.tune_label.setWordWrap(True)
+        box_layout.addWidget(self.tune_label)
+        layout.addWidget(self.tune_box)
+
     def get_params(self):
         return self.params
 
+    def value(self):
+        return next(iter(self.params.values())).value()
+
+    def set_value(self, value):
+        next(iter(self.params.values())).setValue(value)
+
 # ─────────────────────────────────────────────
 # Dialog: shows CV2 code snippet
 # ─────────────────────────────────────────────
@@ -102,19 +165,12 @@ class CodeViewerDialog(QDialog):
         close_btn.clicked.connect(self.accept)
         layout.addWidget(close_btn)
 
-# ─────────────────────────────────────────────
-# Matplotlib canvas helper
-# ─────────────────────────────────────────────
-class MplCanvas(FigureCanvas):
-    def __init__(self, figsize=(7, 4)):
-        self.fig = Figure(figsize=figsize, dpi=100, facecolor='#FAFAF8')
-        self.ax = self.fig.add_subplot(111, facecolor='#FAFAF8')
-        super().__init__(self.fig)
-
 # ─────────────────────────────────────────────
 # Zoomable / pan-able QGraphicsView
 # ─────────────────────────────────────────────
 class ZoomableGraphicsView(QGraphicsView):
+    zoomed = pyqtSignal()
+
     def __init__(self, parent=None):
         super().__init__(parent)
         self.setDragMode(QGraphicsView.DragMode.ScrollHandDrag)
@@ -122,12 +178,383 @@ class ZoomableGraphicsView(QGraphicsView):
         self.setResizeAnchor(QGraphicsView.ViewportAnchor.AnchorUnderMouse)
 
     def wheelEvent(self, event):
+        image_profile.begin("Zoom")
         zoom_in = 1.25
         zoom_out = 1 / zoom_in
         if event.angleDelta().y() > 0:
             self.scale(zoom_in, zoom_in)
         else:
             self.scale(zoom_out, zoom_out)
+        self.zoomed.emit()
+
+# ─────────────────────────────────────────────
+# Tiled mipmap pyramid for the image view
+# ─────────────────────────────────────────────
+def half_size(img):
+    # Exact 2×2 box average (INTER_AREA at an integer factor), so a region
+    # of a level can be rebuilt on its own and match a full rebuild.
+    h, w = img.shape[0] // 2, img.shape[1] // 2
+    return cv2.resize(img[:2 * h, :2 * w], (w, h), interpolation=cv2.INTER_AREA)
+
+
+class TiledImageItem(QGraphicsItem):
+    # Paints an image from a mipmap pyramid of tiles.  Levels are built on
+    # first use, tiles are converted to pixmaps only when they intersect
+    # the exposed area at the level that matches the zoom, and set_image()
+    # re-converts only the tiles whose pixels changed.  The pyramid holds
+    # the raw image; `view` maps each tile to what is displayed (channel,
+    # grayscale, HSI...), so display temporaries are tile-sized and a mode
+    # change does not rebuild the pyramid.
+    TILE = 512
+    MAX_PIXMAPS = 256
+
+    def __init__(self, to_pixmap, view=None):
+        super().__init__()
+        self.to_pixmap = to_pixmap
+        self.view = view
+        self.levels = []             # level k is 2^k times smaller; None = not built
+        self.pending = []            # per level: level-0 rects still to refresh
+        self.pixmaps = OrderedDict() # (level, ty, tx) -> QPixmap, LRU
+        self.setFlag(QGraphicsItem.ItemUsesExtendedStyleOption)
+
+    def boundingRect(self):
+        if not self.levels:
+            return QRectF()
+        h, w = self.levels[0].shape[:2]
+        return QRectF(0, 0, w, h)
+
+    def set_image(self, img, scale=1.0):
+        # scale < 1 marks a downscaled preview: the item is stretched back so
+        # the scene keeps the geometry (and zoom) of the full image.
+        old = self.levels[0] if self.levels else None
+        if old is img:
+            return
+        if old is None or old.shape != img.shape or self.scale() != 1.0 / scale:
+            self.prepareGeometryChange()
+            self.levels = [img] + [None] * (self.level_count(img.shape) - 1)
+            self.pending = [[] for _ in self.levels]
+            self.pixmaps.clear()
+            self.setScale(1.0 / scale)
+            self.update()
+            return
+
+        dirty = self.changed_tiles(old, img)
+        self.levels[0] = img
+        for k in range(1, len(self.levels)):
+            if self.levels[k] is not None:
+                self.pending[k].extend(dirty)
+        for key in list(self.pixmaps):
+            if any(self.intersects(self.tile_rect(*key), r) for r in dirty):
+                del self.pixmaps[key]
+        for y0, y1, x0, x1 in dirty:
+            self.update(QRectF(x0, y0, x1 - x0, y1 - y0))
+
+    def refresh(self):
+        # The view function changed its output (e.g. a new display mode).
+        self.pixmaps.clear()
+        self.update()
+
+    def level_count(self, shape):
+        h, w = shape[:2]
+        count = 1
+        while max(h, w) > self.TILE and min(h, w) >= 2:
+            h, w = h // 2, w // 2
+            count += 1
+        return count
+
+    def changed_tiles(self, old, new):
+        # Level-0 rects (y0, y1, x0, x1) of the tiles whose pixels differ.
+        h, w = new.shape[:2]
+        t = self.TILE
+        return [(y, min(y + t, h), x, min(x + t, w))
+                for y in range(0, h, t) for x in range(0, w, t)
+                if not np.array_equal(old[y:y + t, x:x + t], new[y:y + t, x:x + t])]
+
+    def intersects(self, a, b):
+        return a[0] < b[1] and b[0] < a[1] and a[2] < b[3] and b[2] < a[3]
+
+    def tile_rect(self, k, ty, tx):
+        # Level-0 rect covered by tile (ty, tx) of level k.
+        span = self.TILE << k
+        h, w = self.levels[0].shape[:2]
+        return ty * span, min((ty + 1) * span, h), tx * span, min((tx + 1) * span, w)
+
+    def level(self, k):
+        if self.levels[k] is None:
+            self.levels[k] = half_size(self.level(k - 1))
+            self.pending[k] = []
+        elif self.pending[k]:
+            prev, img, f = self.level(k - 1), self.levels[k], 1 << k
+            lh, lw = img.shape[:2]
+            for y0, y1, x0, x1 in self.pending[k]:
+                ly0, ly1 = y0 // f, min(-(-y1 // f), lh)
+                lx0, lx1 = x0 // f, min(-(-x1 // f), lw)
+                if ly0 < ly1 and lx0 < lx1:
+                    img[ly0:ly1, lx0:lx1] = half_size(prev[2 * ly0:2 * ly1, 2 * lx0:2 * lx1])
+            self.pending[k] = []
+        return self.levels[k]
+
+    def tile_pixmap(self, k, ty, tx):
+        key = (k, ty, tx)
+        pixmap = self.pixmaps.get(key)
+        if pixmap is None:
+            t = self.TILE
+            tile = self.level(k)[ty * t:(ty + 1) * t, tx * t:(tx + 1) * t]
+            with image_profile.stage("display: tile view"):
+                display = tile if self.view is None else self.view(tile)
+                if display is tile:
+                    # the pixmap pins its buffer; a tile-sized copy keeps it from
+                    # pinning the whole level after the image is replaced
+                    display = tile.copy()
+            with image_profile.stage("display: bgr_to_qpixmap"):
+                pixmap = self.to_pixmap(display)
+            self.pixmaps[key] = pixmap
+            while len(self.pixmaps) > self.MAX_PIXMAPS:
+                self.pixmaps.popitem(last=False)
+        else:
+            self.pixmaps.move_to_end(key)
+        return pixmap
+
+    def paint(self, painter, option, widget=None):
+        if not self.levels:
+            return
+        with image_profile.stage("display: paint"):
+            self.paint_tiles(painter, option)
+
+    def paint_tiles(self, painter, option):
+        lod = option.levelOfDetailFromTransform(painter.worldTransform())
+        k = min(max(int(math.floor(math.log2(1.0 / lod))), 0), len(self.levels) - 1) if lod < 1 else 0
+        f, t = 1 << k, self.TILE
+        h, w = self.levels[0].shape[:2]
+        lh, lw = self.level(k).shape[:2]
+        if lod * f != 1.0:
+            painter.setRenderHint(QPainter.SmoothPixmapTransform)
+
+        exposed = option.exposedRect
+        ty0, tx0 = max(int(exposed.top()) // (t * f), 0), max(int(exposed.left()) // (t * f), 0)
+        ty1 = min(int(math.ceil(exposed.bottom() / (t * f))), -(-lh // t))
+        tx1 = min(int(math.ceil(exposed.right() / (t * f))), -(-lw // t))
+        for ty in range(ty0, ty1):
+            for tx in range(tx0, tx1):
+                pixmap = self.tile_pixmap(k, ty, tx)
+                x, y = tx * t * f, ty * t * f
+                # the last row/column of a level also covers the pixels lost
+                # to flooring its size
+                tw = w - x if (tx + 1) * t >= lw else pixmap.width() * f
+                th = h - y if (ty + 1) * t >= lh else pixmap.height() * f
+                painter.drawPixmap(QRectF(x, y, tw, th), pixmap, QRectF(pixmap.rect()))
+
+# ─────────────────────────────────────────────
+# Dialog: denoise comparison grid
+# ─────────────────────────────────────────────
+class CompareDialog(QDialog):
+    # Non-modal grid of denoise results, one row per strength and one
+    # column per method.  All views share one zoom and scroll position, so
+    # the same detail can be compared across methods.
+    runRequested = pyqtSignal(list)          # strengths
+    useRequested = pyqtSignal(str, float)    # method, strength
+
+    MAX_STRENGTHS = 4
+
+    def __init__(self, to_pixmap, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("🔬 Compare Denoise Methods")
+        self.setModal(False)
+        self.resize(1200, 800)
+        self.to_pixmap = to_pixmap
+        self.cells = {}             # (method, strength) -> (caption, view, item, use button)
+        self.fitted = False
+        self.syncing = False
+
+        layout = QVBoxLayout(self)
+
+        title_label = QLabel("🔬 Denoise Methods Side by Side")
+        title_label.setObjectName("DialogTitle")
+        title_label.setAlignment(Qt.AlignCenter)
+        title_label.setFont(QFont("Tahoma", 11, QFont.Bold))
+        layout.addWidget(title_label)
+
+        controls = QHBoxLayout()
+        controls.addWidget(QLabel("Strengths (0.0-1.0, comma-separated):"))
+        self.strengths_edit = QLineEdit("0.5")
+        self.strengths_edit.returnPressed.connect(self.request_run)
+        controls.addWidget(self.strengths_edit, 1)
+        run_btn = QPushButton("▶️ Run")
+        run_btn.clicked.connect(self.request_run)
+        controls.addWidget(run_btn)
+        layout.addLayout(controls)
+
+        self.info_label = QLabel("")
+        self.info_label.setFont(QFont("Tahoma", 8))
+        layout.addWidget(self.info_label)
+
+        self.grid = QGridLayout()
+        self.grid.setSpacing(6)
+        layout.addLayout(self.grid, 1)
+
+    def strengths(self):
+        # Raises ValueError for anything but 1..MAX_STRENGTHS values in [0, 1].
+        values = [float(v) for v in self.strengths_edit.text().replace(";", ",").split(",") if v.strip()]
+        if not 1 <= len(values) <= self.MAX_STRENGTHS or not all(0.0 <= v <= 1.0 for v in values):
+            raise ValueError(f"Enter 1-{self.MAX_STRENGTHS} strengths between 0.0 and 1.0")
+        return values
+
+    def request_run(self):
+        try:
+            strengths = self.strengths()
+        except ValueError as exc:
+            self.info_label.setText(f"❌ {exc}")
+            return
+        self.runRequested.emit(strengths)
+
+    def set_grid(self, methods, strengths):
+        while self.grid.count():
+            widget = self.grid.takeAt(0).widget()
+            if widget is not None:
+                widget.deleteLater()
+        self.cells = {}
+        self.fitted = False
+        for row, strength in enumerate(strengths):
+            for col, method in enumerate(methods):
+                self.grid.addWidget(self.make_cell(method, strength), row, col)
+
+    def make_cell(self, method, strength):
+        frame = QFrame()
+        frame.setObjectName("FourierPlotFrame")
+        frame.setFrameShape(QFrame.StyledPanel)
+        cell_layout = QVBoxLayout(frame)
+        cell_layout.setContentsMargins(4, 4, 4, 4)
+        cell_layout.setSpacing(4)
+
+        caption = QLabel(f"⏳ {method.title()} {strength:g}")
+        caption.setObjectName("FourierPlotTitle")
+        caption.setAlignment(Qt.AlignCenter)
+        caption.setFont(QFont("Tahoma", 9, QFont.Bold))
+        cell_layout.addWidget(caption)
+
+        view = ZoomableGraphicsView()
+        scene = QGraphicsScene(view)
+        scene.setItemIndexMethod(QGraphicsScene.NoIndex)
+        view.setScene(scene)
+        item = TiledImageItem(self.to_pixmap)
+        scene.addItem(item)
+        view.zoomed.connect(lambda v=view: self.sync_views(v))
+        view.horizontalScrollBar().valueChanged.connect(lambda _, v=view: self.sync_views(v))
+        view.verticalScrollBar().valueChanged.connect(lambda _, v=view: self.sync_views(v))
+        cell_layout.addWidget(view, 1)
+
+        use_btn = QPushButton("✅ Use this result")
+        use_btn.setEnabled(False)
+        use_btn.clicked.connect(lambda: self.useRequested.emit(method, strength))
+        cell_layout.addWidget(use_btn)
+
+        self.cells[(method, strength)] = (caption, view, item, use_btn)
+        return frame
+
+    def set_result(self, method, strength, bgr, seconds):
+        caption, view, item, use_btn = self.cells[(method, strength)]
+        item.set_image(bgr)
+        view.setSceneRect(item.sceneBoundingRect())
+        caption.setText(f"{method.title()} {strength:g}  |  ⏱️ {seconds:.3f}s")
+        use_btn.setEnabled(True)
+        if not self.fitted:
+            self.fitted = True
+            view.fitInView(item.sceneBoundingRect(), Qt.KeepAspectRatio)
+        self.sync_views(self.reference_view(view))
+
+    def set_failed(self, method, strength, message):
+        caption = self.cells[(method, strength)][0]
+        caption.setText(f"❌ {method.title()} {strength:g}: {message}")
+
+    def reference_view(self, fallback):
+        # The first view that already shows an image sets zoom and position.
+        for caption, view, item, use_btn in self.cells.values():
+            if use_btn.isEnabled() and view is not fallback:
+                return view
+        return fallback
+
+    def sync_views(self, source):
+        if self.syncing:
+            return
+        self.syncing = True
+        try:
+            h = source.horizontalScrollBar().value()
+            v = source.verticalScrollBar().value()
+            for caption, view, item, use_btn in self.cells.values():
+                if view is not source:
+                    view.setTransform(source.transform())
+                    view.horizontalScrollBar().setValue(h)
+                    view.verticalScrollBar().setValue(v)
+        finally:
+            self.syncing = False
+
+# ─────────────────────────────────────────────
+# Background worker for heavy operations
+# ─────────────────────────────────────────────
+class WorkerSignals(QObject):
+    finished = pyqtSignal(int, object)   # job id, result
+    failed   = pyqtSignal(int, str)      # job id, error message
+
+
+class OperationWorker(QRunnable):
+    # Runs fn(*args) on a QThreadPool thread and posts the result back to the
+    # GUI thread through a queued signal.  cv2 calls cannot be interrupted, so
+    # cancelling only guarantees that the result is never emitted; a job that
+    # has not started yet returns at once.  The pool deletes the C++ side of a
+    # finished runnable, so never pass a stored worker back to the pool
+    # (tryTake): only its Python attributes are safe to touch.
+    def __init__(self, job_id, fn, *args):
+        super().__init__()
+        self.job_id = job_id
+        self.fn = fn
+        self.args = args
+        self.cancelled = False
+        self.signals = WorkerSignals()
+
+    def run(self):
+        if self.cancelled:
+            return
+        try:
+            result = self.fn(*self.args)
+        except Exception as exc:
+            if not self.cancelled:
+                self.signals.failed.emit(self.job_id, str(exc))
+            return
+        if not self.cancelled:
+            self.signals.finished.emit(self.job_id, result)
+
+
+def run_recorded(bgr, label, step, fn, *args):
+    # Runs the operation and builds its undo entry on the worker thread, so
+    # compressing large deltas never blocks the GUI.
+    result = fn(bgr, *args)
+    with image_profile.stage("history: delta"):
+        return result, image_history.make_entry(label, step, bgr, result)
+
+
+def render_chain(bgr, cache, source, token, chain, scale):
+    # Re-renders an edited chain from `source`; the current image bgr is
+    # only the "before" state of the undo entry.
+    return cache.render(source, token, chain, scale)
+
+
+def warm_up():
+    # Startup work deferred until the window is up: picking the fastest FFT
+    # backend (a micro-benchmark) and importing Matplotlib for the plots.
+    name = fft_backend.configure("auto")
+    importlib.import_module("image_plots")
+    return name
+
+
+def compute_fourier_views(bgr, cache, version):
+    # Executed on the worker thread when the Fourier tab needs a refresh.
+    return cache.get(bgr, version).precompute_views()
+
+
+def cached_frequency_filter(bgr, filter_type, cutoff, color, cache, version):
+    # Reuses the forward FFT of the current image version if it is cached.
+    return image_ops.frequency_filter(bgr, filter_type, cutoff,
+                                      spectrum=cache.get(bgr, version, color), color=color)
 
 # ─────────────────────────────────────────────
 # Main application window
@@ -139,12 +566,110 @@ class ImageAnalyzer(QMainWindow):
         self.setWindowTitle("Image Analyzer -- Ver 1.5.1 (LIGHT XP STYLE - RESIZABLE SIDEBAR)")
         self.resize(1600, 900)
 
-        self.original_bgr = None
+        self.image_version  = 0
+        self.spectrum_cache = image_ops.SpectrumCache()
+        self.hsi_cache      = image_ops.HSICache()
+        self.full_original_bgr = None    # as loaded, always full resolution
+        self.original_bgr = None         # start of the chain: full image or proxy
         self.working_bgr  = None
+        self.proxy_scale  = 1.0          # < 1 while the proxy mode is active
+        self.operation_chain = []        # (name, args) steps, full-resolution params
+        self.chain_cache = image_ops.ChainCache()   # output of every chain prefix
+        self.load_id     = 0             # chain cache token of the loaded image
+        self.edit_job    = 0             # chain-step edit waiting for its base image
+        self.edit_worker = None
+        self.edit_open   = None
         self.visualization_mode = "combined"
         self.current_filter_code   = ""
         self.current_denoise_code  = ""
         self.current_freq_code     = ""
+        self.filter_color          = False
+        self.radial_max_bins       = 1024    # None = one bin per pixel of radius
+        self.radial_log_bins       = False
+
+        # background jobs: only the result of the latest job id is accepted
+        self.thread_pool   = QThreadPool(self)
+        self.job_id        = 0
+        self.active_worker = None
+        self.active_done   = None
+        self.active_abort  = None
+        self.active_step   = None
+        self.active_record = False
+        self.busy_text     = ""
+        self.busy_frame    = 0
+        self.busy_timer    = QTimer(self)
+        self.busy_timer.setInterval(150)
+        self.busy_timer.timeout.connect(self.animate_busy)
+
+        # worker processes for the comparison grid and auto-tuning,
+        # started on first use
+        self.process_pool     = None
+        self.process_workers  = os.cpu_count() or 1
+
+        # denoise comparison
+        self.compare_dialog   = None
+        self.comparison       = None
+        self.compare_job      = 0
+        self.compare_version  = None
+        self.compare_results  = {}
+        self.compare_received = 0
+        self.compare_expected = 0
+        self.compare_started  = 0.0
+        self.compare_signals  = WorkerSignals()
+        self.compare_signals.finished.connect(self.on_comparison_result, Qt.QueuedConnection)
+
+        # auto-tune: one parameter sweep at a time, for the open denoise panel
+        self.sweep         = None
+        self.tune_job      = 0
+        self.tune_version  = None
+        self.tune_scored   = 0
+        self.tune_total    = 0
+        self.tune_started  = 0.0
+        self.tune_signals  = WorkerSignals()
+        # queued even from the GUI thread: futures that finish before the
+        # sweep is constructed report from inside its constructor
+        self.tune_signals.finished.connect(self.on_tune_result, Qt.QueuedConnection)
+
+        # undo/redo: compressed entries, oldest evicted past the budget
+        self.history = image_history.History(budget=512 * 1024 * 1024)
+
+        # live preview for the parameter panel: slider events are debounced,
+        # at most one preview computes at a time and only the newest is shown
+        self.preview_panel   = None
+        self.preview_step    = None      # value -> (name, args)
+        self.preview_apply   = None      # value -> None, runs the real operation
+        self.preview_base    = None      # image the step applies to (None = current)
+        self.preview_tail    = ()        # later steps re-applied after it
+        self.preview_job_id  = 0
+        self.preview_worker  = None
+        self.preview_pending = False
+        self.preview_source  = None
+        self.preview_source_version = None
+        self.preview_scale   = 1.0
+        self.preview_spectra = image_ops.SpectrumCache(capacity=1)
+        self.preview_timer   = QTimer(self)
+        self.preview_timer.setSingleShot(True)
+        self.preview_timer.setInterval(120)
+        self.preview_timer.timeout.connect(self.request_preview)
+
+        # Fourier tab: recomputed lazily, only while it is the visible tab;
+        # back-to-back invalidations are coalesced by a single-shot timer
+        self.fourier_dirty  = False
+        self.fourier_worker = None
+        self.fourier_timer  = QTimer(self)
+        self.fourier_timer.setSingleShot(True)
+        self.fourier_timer.setInterval(30)
+        self.fourier_timer.timeout.connect(self.refresh_fourier)
+
+        # Quality metrics against original_bgr: measured on a worker after
+        # every change, once per image version
+        self.metrics = None
+        self.metrics_version = None
+        self.metrics_worker = None
+        self.metrics_timer = QTimer(self)
+        self.metrics_timer.setSingleShot(True)
+        self.metrics_timer.setInterval(30)
+        self.metrics_timer.timeout.connect(self.refresh_metrics)
 
         # ── central layout with SPLITTER ──
         central = QWidget()
@@ -173,6 +698,7 @@ class ImageAnalyzer(QMainWindow):
         sidebar_layout.setContentsMargins(6, 12, 6, 12)
 
         sidebar_scroll.setWidget(sidebar)
+        self.lazy_panels = {}            # panel attribute -> (group layout, builder)
 
         # ── sidebar title ──
         title_label = QLabel("Image Tasks")
@@ -201,6 +727,69 @@ class ImageAnalyzer(QMainWindow):
         file_layout.addWidget(self.btn_reset)
         sidebar_layout.addWidget(file_group)
 
+        # ══════════════════════════════════════
+        # HISTORY group
+        # ══════════════════════════════════════
+        history_group = QGroupBox("History")
+        history_group.setObjectName("LightGroup")
+        history_layout = QVBoxLayout(history_group)
+        history_layout.setSpacing(6)
+        history_layout.setContentsMargins(12, 20, 12, 12)
+
+        history_buttons = QHBoxLayout()
+        self.btn_undo = self.create_sub_button("↩️ Undo", self.undo)
+        self.btn_redo = self.create_sub_button("↪️ Redo", self.redo)
+        self.btn_undo.setEnabled(False)
+        self.btn_redo.setEnabled(False)
+        history_buttons.addWidget(self.btn_undo)
+        history_buttons.addWidget(self.btn_redo)
+        history_layout.addLayout(history_buttons)
+
+        self.history_list = QListWidget()
+        self.history_list.setObjectName("HistoryList")
+        self.history_list.setFont(QFont("Tahoma", 9))
+        self.history_list.setMaximumHeight(140)
+        self.history_list.itemClicked.connect(self.on_history_clicked)
+        history_layout.addWidget(self.history_list)
+
+        budget_row = QHBoxLayout()
+        self.history_label = QLabel("")
+        self.history_label.setFont(QFont("Tahoma", 8))
+        budget_row.addWidget(self.history_label, 1)
+        budget_row.addWidget(QLabel("Budget:"))
+        self.history_budget = QSpinBox()
+        self.history_budget.setRange(16, 65536)
+        self.history_budget.setSingleStep(128)
+        self.history_budget.setSuffix(" MB")
+        self.history_budget.setValue(self.history.budget // (1024 * 1024))
+        self.history_budget.valueChanged.connect(self.set_history_budget)
+        budget_row.addWidget(self.history_budget)
+        history_layout.addLayout(budget_row)
+
+        chain_title = QLabel("Operation chain (double-click to edit):")
+        chain_title.setFont(QFont("Tahoma", 8))
+        history_layout.addWidget(chain_title)
+        self.chain_list = QListWidget()
+        self.chain_list.setObjectName("HistoryList")
+        self.chain_list.setFont(QFont("Consolas", 9))
+        self.chain_list.setMaximumHeight(120)
+        self.chain_list.itemDoubleClicked.connect(
+            lambda item: self.edit_chain_step(self.chain_list.row(item)))
+        history_layout.addWidget(self.chain_list)
+
+        chain_buttons = QHBoxLayout()
+        self.btn_edit_step = self.create_sub_button("✏️ Edit Step",
+                                                    lambda: self.edit_chain_step(self.chain_list.currentRow()))
+        self.btn_remove_step = self.create_sub_button("🗑️ Remove Step",
+                                                      lambda: self.remove_chain_step(self.chain_list.currentRow()))
+        chain_buttons.addWidget(self.btn_edit_step)
+        chain_buttons.addWidget(self.btn_remove_step)
+        history_layout.addLayout(chain_buttons)
+        sidebar_layout.addWidget(history_group)
+
+        QShortcut(QKeySequence.Undo, self, self.undo)
+        QShortcut(QKeySequence.Redo, self, self.redo)
+
         # ══════════════════════════════════════
         # VISUALIZATION group  (toggle panel)
         # ══════════════════════════════════════
@@ -216,25 +805,8 @@ class ImageAnalyzer(QMainWindow):
         self.btn_visualization.setEnabled(False)
         vis_layout.addWidget(self.btn_visualization)
 
-        self.visualization_panel = QFrame()
-        self.visualization_panel.setObjectName("LightSubPanel")
-        vis_sub_layout = QVBoxLayout(self.visualization_panel)
-        vis_sub_layout.setSpacing(2)
-        vis_sub_layout.setContentsMargins(24, 8, 8, 8)
-
-        self.btn_combined  = self.create_sub_button("🎨 Combined (RGB)",     lambda: self.set_vis_mode("combined"))
-        self.btn_grayscale = self.create_sub_button("⬜ Grayscale",          lambda: self.set_vis_mode("grayscale"))
-        self.btn_red       = self.create_sub_button("🔴 Red Channel",        lambda: self.set_vis_mode("red"))
-        self.btn_green     = self.create_sub_button("🟢 Green Channel",      lambda: self.set_vis_mode("green"))
-        self.btn_blue      = self.create_sub_button("🔵 Blue Channel",       lambda: self.set_vis_mode("blue"))
-        self.btn_hsi       = self.create_sub_button("🌈 HSI Color Space",    lambda: self.set_vis_mode("hsi"))
-
-        for b in [self.btn_combined, self.btn_grayscale, self.btn_red,
-                  self.btn_green, self.btn_blue, self.btn_hsi]:
-            vis_sub_layout.addWidget(b)
-
-        self.visualization_panel.setVisible(False)
-        vis_layout.addWidget(self.visualization_panel)
+        self.visualization_panel = None           # built on first expand
+        self.lazy_panels["visualization_panel"] = (vis_layout, self.build_visualization_panel)
         sidebar_layout.addWidget(vis_group)
 
         # ══════════════════════════════════════
@@ -252,24 +824,8 @@ class ImageAnalyzer(QMainWindow):
         self.btn_ops.setEnabled(False)
         ops_layout.addWidget(self.btn_ops)
 
-        self.ops_panel = QFrame()
-        self.ops_panel.setObjectName("LightSubPanel")
-        ops_sub_layout = QVBoxLayout(self.ops_panel)
-        ops_sub_layout.setSpacing(2)
-        ops_sub_layout.setContentsMargins(24, 8, 8, 8)
-
-        self.btn_invert   = self.create_sub_button("🔁 Invert",        self.invert_image)
-        self.btn_flip_h   = self.create_sub_button("↔️ Flip H",        self.flip_horizontal)
-        self.btn_flip_v   = self.create_sub_button("↕️ Flip V",        self.flip_vertical)
-        self.btn_rotate90 = self.create_sub_button("🔃 Rotate 90°",    self.rotate_90)
-        self.btn_equalize = self.create_sub_button("📊 Equalize",       self.equalize_histogram)
-
-        for b in [self.btn_invert, self.btn_flip_h, self.btn_flip_v,
-                  self.btn_rotate90, self.btn_equalize]:
-            ops_sub_layout.addWidget(b)
-
-        self.ops_panel.setVisible(False)
-        ops_layout.addWidget(self.ops_panel)
+        self.ops_panel = None           # built on first expand
+        self.lazy_panels["ops_panel"] = (ops_layout, self.build_ops_panel)
         sidebar_layout.addWidget(ops_group)
 
         # ══════════════════════════════════════
@@ -287,22 +843,8 @@ class ImageAnalyzer(QMainWindow):
         self.btn_denoise.setEnabled(False)
         denoise_layout.addWidget(self.btn_denoise)
 
-        self.denoise_panel = QFrame()
-        self.denoise_panel.setObjectName("LightSubPanel")
-        denoise_sub_layout = QVBoxLayout(self.denoise_panel)
-        denoise_sub_layout.setSpacing(2)
-        denoise_sub_layout.setContentsMargins(24, 8, 8, 8)
-
-        self.btn_bilateral  = self.create_sub_button("🏔️ Bilateral",       lambda: self.show_denoise_dialog("Bilateral"))
-        self.btn_mean       = self.create_sub_button("📐 Mean",            lambda: self.show_denoise_dialog("Mean"))
-        self.btn_median     = self.create_sub_button("📊 Median",          lambda: self.show_denoise_dialog("Median"))
-        self.btn_nlmeans    = self.create_sub_button("🧠 Non-Local Means", lambda: self.show_denoise_dialog("Non-Local Means"))
-
-        for b in [self.btn_bilateral, self.btn_mean, self.btn_median, self.btn_nlmeans]:
-            denoise_sub_layout.addWidget(b)
-
-        self.denoise_panel.setVisible(False)
-        denoise_layout.addWidget(self.denoise_panel)
+        self.denoise_panel = None           # built on first expand
+        self.lazy_panels["denoise_panel"] = (denoise_layout, self.build_denoise_panel)
         sidebar_layout.addWidget(denoise_group)
 
         # ══════════════════════════════════════
@@ -320,24 +862,8 @@ class ImageAnalyzer(QMainWindow):
         self.btn_noise.setEnabled(False)
         noise_layout.addWidget(self.btn_noise)
 
-        self.noise_panel = QFrame()
-        self.noise_panel.setObjectName("LightSubPanel")
-        noise_sub_layout = QVBoxLayout(self.noise_panel)
-        noise_sub_layout.setSpacing(2)
-        noise_sub_layout.setContentsMargins(24, 8, 8, 8)
-
-        self.btn_pepper_salt   = self.create_sub_button("🧂 Pepper & Salt",  lambda: self.show_noise_dialog("Pepper & Salt"))
-        self.btn_gaussian_noise= self.create_sub_button("📈 Gaussian Noise", lambda: self.show_noise_dialog("Gaussian"))
-        self.btn_speckle_noise = self.create_sub_button("✨ Speckle Noise",  lambda: self.show_noise_dialog("Speckle"))
-        self.btn_poisson_noise = self.create_sub_button("⚡ Poisson Noise",  lambda: self.show_noise_dialog("Poisson"))
-
-        noise_sub_layout.addWidget(self.btn_pepper_salt)
-        noise_sub_layout.addWidget(self.btn_gaussian_noise)
-        noise_sub_layout.addWidget(self.btn_speckle_noise)
-        noise_sub_layout.addWidget(self.btn_poisson_noise)
-
-        self.noise_panel.setVisible(False)
-        noise_layout.addWidget(self.noise_panel)
+        self.noise_panel = None           # built on first expand
+        self.lazy_panels["noise_panel"] = (noise_layout, self.build_noise_panel)
         sidebar_layout.addWidget(noise_group)
 
         # ══════════════════════════════════════
@@ -355,26 +881,8 @@ class ImageAnalyzer(QMainWindow):
         self.btn_filters.setEnabled(False)
         filter_layout.addWidget(self.btn_filters)
 
-        self.filters_panel = QFrame()
-        self.filters_panel.setObjectName("LightSubPanel")
-        filters_sub_layout = QVBoxLayout(self.filters_panel)
-        filters_sub_layout.setSpacing(2)
-        filters_sub_layout.setContentsMargins(20, 6, 6, 6)
-
-        self.btn_lowpass     = self.create_sub_button("🔽 Low Pass filter",    lambda: self.show_filter_dialog("Low Pass"))
-        self.btn_highpass    = self.create_sub_button("🔼 High Pass filter",   lambda: self.show_filter_dialog("High Pass"))
-        self.btn_notchpass   = self.create_sub_button("🎯 Notch Pass filter",  lambda: self.show_filter_dialog("Notch Pass"))
-        self.btn_notchreject = self.create_sub_button("🚫 Notch Reject filter",lambda: self.show_filter_dialog("Notch Reject"))
-        self.btn_gaussian    = self.create_sub_button("⛰️ Gaussian filter",    lambda: self.show_filter_dialog("Gaussian"))
-
-        filters_sub_layout.addWidget(self.btn_lowpass)
-        filters_sub_layout.addWidget(self.btn_highpass)
-        filters_sub_layout.addWidget(self.btn_notchpass)
-        filters_sub_layout.addWidget(self.btn_notchreject)
-        filters_sub_layout.addWidget(self.btn_gaussian)
-
-        self.filters_panel.setVisible(False)
-        filter_layout.addWidget(self.filters_panel)
+        self.filters_panel = None           # built on first expand
+        self.lazy_panels["filters_panel"] = (filter_layout, self.build_filters_panel)
         sidebar_layout.addWidget(filter_group)
 
         # ══════════════════════════════════════
@@ -392,24 +900,8 @@ class ImageAnalyzer(QMainWindow):
         self.btn_code.setEnabled(False)
         code_layout.addWidget(self.btn_code)
 
-        self.code_panel = QFrame()
-        self.code_panel.setObjectName("LightSubPanel")
-        code_sub_layout = QVBoxLayout(self.code_panel)
-        code_sub_layout.setSpacing(4)
-        code_sub_layout.setContentsMargins(24, 8, 8, 8)
-
-        self.btn_show_noise_code   = self.create_sub_button("🎚️ Noise Code",   self.show_current_noise_code)
-        self.btn_show_denoise_code = self.create_sub_button("🧹 Denoise Code", self.show_current_denoise_code)
-        self.btn_show_filter_code  = self.create_sub_button("🎛️ Filter Code",  self.show_current_filter_code)
-        self.btn_show_stats_code   = self.create_sub_button("📊 HSI Code",     self.show_hsi_code)
-
-        code_sub_layout.addWidget(self.btn_show_noise_code)
-        code_sub_layout.addWidget(self.btn_show_denoise_code)
-        code_sub_layout.addWidget(self.btn_show_filter_code)
-        code_sub_layout.addWidget(self.btn_show_stats_code)
-
-        self.code_panel.setVisible(False)
-        code_layout.addWidget(self.code_panel)
+        self.code_panel = None           # built on first expand
+        self.lazy_panels["code_panel"] = (code_layout, self.build_code_panel)
         sidebar_layout.addWidget(code_group)
 
         # ══════════════════════════════════════
@@ -424,7 +916,13 @@ class ImageAnalyzer(QMainWindow):
         self.status_label = QLabel("Ready - Resizable Sidebar Version")
         self.status_label.setObjectName("StatusLabel")
         self.status_label.setFont(QFont("Tahoma", 8))
-        status_layout.addWidget(self.status_label)
+        status_layout.addWidget(self.status_label, 1)
+
+        self.btn_cancel = self.create_tool_button("⛔ Cancel", self.cancel_operation)
+        self.btn_cancel.setObjectName("CancelButton")
+        self.btn_cancel.setFixedHeight(20)
+        self.btn_cancel.setVisible(False)
+        status_layout.addWidget(self.btn_cancel)
         sidebar_layout.addWidget(status_frame)
 
         # ══════════════════════════════════════
@@ -453,8 +951,20 @@ class ImageAnalyzer(QMainWindow):
         self.btn_reset_zoom.setMinimumHeight(12)
         self.btn_reset_zoom.setEnabled(False)
 
+        self.btn_proxy = self.create_tool_button("⚡ Proxy Mode", self.toggle_proxy_mode)
+        self.btn_proxy.setCheckable(True)
+        self.btn_proxy.setEnabled(False)
+        self.btn_commit = self.create_tool_button("✅ Commit", self.commit_full_resolution)
+        self.btn_commit.setEnabled(False)
+
         toolbar_layout.addWidget(self.btn_fit)
         toolbar_layout.addWidget(self.btn_reset_zoom)
+        self.btn_profile = self.create_tool_button("⏱️ Profile", self.toggle_profiling)
+        self.btn_profile.setCheckable(True)
+
+        toolbar_layout.addWidget(self.btn_proxy)
+        toolbar_layout.addWidget(self.btn_commit)
+        toolbar_layout.addWidget(self.btn_profile)
         toolbar_layout.addStretch(1)
 
         view_label = QLabel("🖼️ Image Preview & Analysis")
@@ -481,14 +991,31 @@ class ImageAnalyzer(QMainWindow):
         self.graphics_view = ZoomableGraphicsView()
         self.graphics_view.setObjectName("ImageView")
         self.graphics_scene = QGraphicsScene()
+        self.graphics_scene.setItemIndexMethod(QGraphicsScene.NoIndex)
         self.graphics_view.setScene(self.graphics_scene)
+        self.image_item = TiledImageItem(self.bgr_to_qpixmap, self.mode_visual)
+        self.graphics_scene.addItem(self.image_item)
         self.graphics_view.setAlignment(Qt.AlignCenter)
         image_tab_layout.addWidget(self.graphics_view, 1)
 
-        # histogram canvas (below image)
-        self.histogram_canvas = MplCanvas(figsize=(7, 2.2))
-        self.histogram_canvas.setObjectName("HistogramCanvas")
-        image_tab_layout.addWidget(self.histogram_canvas)
+        # MSE / PSNR / SSIM of the working image against the original
+        self.metrics_label = QLabel("📏 Load an image to compare it with the original.")
+        self.metrics_label.setObjectName("MetricsLabel")
+        self.metrics_label.setAlignment(Qt.AlignCenter)
+        self.metrics_label.setFont(QFont("Tahoma", 9))
+        image_tab_layout.addWidget(self.metrics_label)
+
+        # histogram canvas (below image): a placeholder of the same height
+        # until the first image, so Matplotlib is not imported at startup
+        self.histogram_canvas = None
+        self.histogram_renderer = None
+        self.histogram_version = None
+        self.histogram_max_samples = 4_000_000   # larger images are sampled
+        self.histogram_placeholder = QFrame()
+        self.histogram_placeholder.setObjectName("HistogramCanvas")
+        self.histogram_placeholder.setFixedHeight(220)
+        self.image_tab_layout = image_tab_layout
+        image_tab_layout.addWidget(self.histogram_placeholder)
 
         self.tab_widget.addTab(image_tab, "🖼️  Image & Histogram")
 
@@ -518,8 +1045,6 @@ class ImageAnalyzer(QMainWindow):
         mag_title.setFont(QFont("Tahoma", 9, QFont.Bold))
         mag_layout.addWidget(mag_title)
 
-        self.mag_canvas = MplCanvas(figsize=(4.5, 3.5))
-        mag_layout.addWidget(self.mag_canvas)
         plots_layout.addWidget(mag_frame, 1)
 
         # 2) Power Spectrum
@@ -536,8 +1061,6 @@ class ImageAnalyzer(QMainWindow):
         pow_title.setFont(QFont("Tahoma", 9, QFont.Bold))
         pow_layout.addWidget(pow_title)
 
-        self.pow_canvas = MplCanvas(figsize=(4.5, 3.5))
-        pow_layout.addWidget(self.pow_canvas)
         plots_layout.addWidget(pow_frame, 1)
 
         # 3) Phase Spectrum
@@ -554,8 +1077,6 @@ class ImageAnalyzer(QMainWindow):
         phase_title.setFont(QFont("Tahoma", 9, QFont.Bold))
         phase_layout.addWidget(phase_title)
 
-        self.phase_canvas = MplCanvas(figsize=(4.5, 3.5))
-        phase_layout.addWidget(self.phase_canvas)
         plots_layout.addWidget(phase_frame, 1)
 
         fourier_tab_layout.addWidget(plots_widget, 3)
@@ -574,8 +1095,9 @@ class ImageAnalyzer(QMainWindow):
         radial_title.setFont(QFont("Tahoma", 9, QFont.Bold))
         radial_layout.addWidget(radial_title)
 
-        self.radial_canvas = MplCanvas(figsize=(12, 2.8))
-        radial_layout.addWidget(self.radial_canvas)
+        # the four canvases are created by the first update_fourier()
+        self.mag_canvas = self.pow_canvas = self.phase_canvas = self.radial_canvas = None
+        self.fourier_layouts = (mag_layout, pow_layout, phase_layout, radial_layout)
 
         fourier_tab_layout.addWidget(radial_frame, 1)
 
@@ -586,7 +1108,8 @@ class ImageAnalyzer(QMainWindow):
         self.fourier_info_label.setFont(QFont("Tahoma", 9))
         fourier_tab_layout.addWidget(self.fourier_info_label)
 
-        self.tab_widget.addTab(fourier_tab, "🌊  Fourier Analysis")
+        self.fourier_tab_index = self.tab_widget.addTab(fourier_tab, "🌊  Fourier Analysis")
+        self.tab_widget.currentChanged.connect(self.on_tab_changed)
 
         # Add sidebar and content to splitter
         self.splitter.addWidget(sidebar_scroll)
@@ -598,11 +1121,62 @@ class ImageAnalyzer(QMainWindow):
         # Add splitter to main layout
         main_layout.addWidget(self.splitter)
 
+        # ── PROFILER dock: stage breakdown of the last action ──
+        self.profile_dock = QDockWidget("⏱️ Profiler", self)
+        self.profile_dock.setObjectName("ProfileDock")
+        self.profile_dock.setFeatures(QDockWidget.DockWidgetMovable | QDockWidget.DockWidgetFloatable)
+        profile_widget = QWidget()
+        profile_layout = QVBoxLayout(profile_widget)
+        profile_layout.setContentsMargins(8, 8, 8, 8)
+        profile_layout.setSpacing(6)
+
+        self.profile_label = QLabel("")
+        self.profile_label.setFont(QFont("Tahoma", 8))
+        self.profile_label.setWordWrap(True)
+        profile_layout.addWidget(self.profile_label)
+
+        self.profile_list = QListWidget()
+        self.profile_list.setObjectName("HistoryList")
+        self.profile_list.setFont(QFont("Consolas", 9))
+        profile_layout.addWidget(self.profile_list, 1)
+
+        profile_buttons = QHBoxLayout()
+        profile_buttons.addWidget(self.create_sub_button("💾 Export Trace", self.export_profile_trace))
+        profile_buttons.addWidget(self.create_sub_button("🗑️ Clear", self.clear_profile))
+        profile_layout.addLayout(profile_buttons)
+
+        self.profile_dock.setWidget(profile_widget)
+        self.addDockWidget(Qt.RightDockWidgetArea, self.profile_dock)
+        self.profile_dock.setVisible(False)
+
+        # spans arrive from worker threads: the panel polls while visible
+        self.profile_shown = -1
+        self.profile_timer = QTimer(self)
+        self.profile_timer.setInterval(300)
+        self.profile_timer.timeout.connect(self.update_profile_panel)
+        if image_profile.PROFILER.enabled:       # IPS_PROFILE=1
+            self.btn_profile.setChecked(True)
+            self.toggle_profiling()
+
         # ──────────────────────────────────
         # Stylesheet
         # ──────────────────────────────────
         self.setStyleSheet(self._stylesheet())
 
+    # ═══════════════════════════════════════════════════════
+    # WORKING IMAGE
+    # ═══════════════════════════════════════════════════════
+    @property
+    def working_bgr(self):
+        return self._working_bgr
+
+    @working_bgr.setter
+    def working_bgr(self, value):
+        # Every assignment is a new image version, so version-keyed caches
+        # never serve data computed from older pixels.
+        self._working_bgr = value
+        self.image_version += 1
+
     # ═══════════════════════════════════════════════════════
     # STYLESHEET
     # ═══════════════════════════════════════════════════════
@@ -711,12 +1285,25 @@ class ImageAnalyzer(QMainWindow):
             background: #E0E0E0;
             border: 1px solid #9B9B7A;
         }
+        QPushButton#SubButton:checked {
+            background: #D0E8FF;
+            border: 1px solid #5A8FD9;
+        }
         QFrame#LightSubPanel {
             background: #FAFAF8;
             border: 1px solid #C0C0B0;
             border-radius: 3px;
             padding: 4px;
         }
+        QListWidget#HistoryList {
+            background: #FFFFFF;
+            border: 1px solid #C0C0B0;
+            border-radius: 3px;
+        }
+        QListWidget#HistoryList::item:selected {
+            background: #D0E8FF;
+            color: #000000;
+        }
         QFrame#LightStatusFrame {
             background: qlineargradient(
                 x1:0, y1:0, x2:0, y2:1,
@@ -729,6 +1316,17 @@ class ImageAnalyzer(QMainWindow):
             color: #000000;
             padding-left: 4px;
         }
+        QPushButton#CancelButton {
+            background: #F0F0E8;
+            border: 1px solid #9B9B7A;
+            border-radius: 3px;
+            padding: 0px 8px;
+            color: #8B0000;
+        }
+        QPushButton#CancelButton:hover {
+            background: #FFF7D0;
+            border: 1px solid #FFB347;
+        }
         QFrame#LightToolbar {
             background: qlineargradient(
                 x1:0, y1:0, x2:0, y2:1,
@@ -762,6 +1360,13 @@ class ImageAnalyzer(QMainWindow):
             background: #C0C0C0;
             border: 2px inset #9B9B7A;
         }
+        QPushButton#ToolButton:checked {
+            background: qlineargradient(
+                x1:0, y1:0, x2:0, y2:1,
+                stop:0 #A8D8FF, stop:1 #6CAEF5
+            );
+            border: 2px inset #5A8FD9;
+        }
         QPushButton#ToolButton:disabled {
             background: #D4D0C8;
             color: #808080;
@@ -812,7 +1417,7 @@ class ImageAnalyzer(QMainWindow):
             color: #003D79;
             padding: 4px;
         }
-        QLabel#FourierInfoLabel {
+        QLabel#FourierInfoLabel, QLabel#MetricsLabel {
             color: #666666;
             font-style: italic;
         }
@@ -883,11 +1488,21 @@ class ImageAnalyzer(QMainWindow):
         if img is None:
             self.status_label.setText("❌ Failed to load image")
             return
-        self.original_bgr = img.copy()
-        self.working_bgr  = img.copy()
+        self.supersede_jobs()
+        image_profile.begin("Load image")
+        self.full_original_bgr = img
+        self.operation_chain = []
+        self.load_id += 1
+        self.chain_cache.clear()
+        self.proxy_scale = self.viewport_proxy_scale() if self.btn_proxy.isChecked() else 1.0
+        self.original_bgr = image_ops.make_proxy(img, self.proxy_scale)
+        self.working_bgr  = self.original_bgr.copy()
+        self.history.clear()
+        self.update_history_panel()
         self.enable_buttons(True)
+        self.btn_commit.setEnabled(self.proxy_scale < 1.0)
         self.update_display()
-        self.update_fourier()
+        self.invalidate_fourier()
         self.status_label.setText(f"✅ Loaded: {path.split('/')[-1]}  |  {img.shape[1]}×{img.shape[0]}")
 
     def save_image(self):
@@ -897,323 +1512,869 @@ class ImageAnalyzer(QMainWindow):
             self, "Save Image", "",
             "PNG (*.png);;JPEG (*.jpg *.jpeg);;BMP (*.bmp);;All Files (*)"
         )
-        if path:
-            cv2.imwrite(path, self.working_bgr)
-            self.status_label.setText(f"💾 Saved: {path.split('/')[-1]}")
+        if not path:
+            return
+        if self.proxy_scale < 1.0:
+            # the proxy is only a preview: render the chain at full size first
+            self.commit_full_resolution(lambda: self.write_image(path))
+        else:
+            self.write_image(path)
+
+    def write_image(self, path):
+        cv2.imwrite(path, self.working_bgr)
+        self.status_label.setText(f"💾 Saved: {path.split('/')[-1]}")
 
     def reset_image(self):
         if self.original_bgr is not None:
-            self.working_bgr = self.original_bgr.copy()
-            self.current_filter_code   = ""
-            self.current_denoise_code  = ""
-            self.current_freq_code     = ""
-            self.update_display()
-            self.update_fourier()
-            self.status_label.setText("🔄 Image reset to original")
+            def done():
+                self.operation_chain = []
+                self.current_filter_code   = ""
+                self.current_denoise_code  = ""
+                self.current_freq_code     = ""
+                self.status_label.setText("🔄 Image reset to original")
+
+            # recorded like any other edit, so a reset can be undone
+            self.start_operation("Resetting to original", None, done,
+                                 fn=lambda bgr, original: original.copy(),
+                                 args=(self.original_bgr,), record=True)
 
     def enable_buttons(self, state):
         for btn in [self.btn_save, self.btn_reset, self.btn_visualization,
                     self.btn_ops, self.btn_denoise, self.btn_noise,
-                    self.btn_filters, self.btn_code, self.btn_fit, self.btn_reset_zoom]:
+                    self.btn_filters, self.btn_code, self.btn_fit, self.btn_reset_zoom,
+                    self.btn_proxy]:
             btn.setEnabled(state)
 
+    # ═══════════════════════════════════════════════════════
+    # PROXY MODE
+    # ═══════════════════════════════════════════════════════
+    def viewport_proxy_scale(self):
+        # Fit the viewport, but never preview below ~1 MP worth of detail.
+        vp = self.graphics_view.viewport().size()
+        return image_ops.proxy_scale(self.full_original_bgr.shape,
+                                     max(vp.width(), 1280), max(vp.height(), 800))
+
+    def toggle_proxy_mode(self):
+        if self.full_original_bgr is None:
+            return
+        if not self.btn_proxy.isChecked():
+            self.commit_full_resolution()
+            return
+
+        scale = self.viewport_proxy_scale()
+        if scale >= 1.0:
+            self.btn_proxy.setChecked(False)
+            self.status_label.setText("⚡ Image already fits the view - proxy not needed")
+            return
+
+        # Rebuild the preview by replaying the chain on the downscaled image.
+        # The proxy only becomes the original once the replay is accepted.
+        proxy = image_ops.make_proxy(self.full_original_bgr, scale)
+        h, w = proxy.shape[:2]
+
+        def done():
+            self.proxy_scale = scale
+            self.original_bgr = proxy
+            self.history.clear()          # entries are sized for the old image
+            self.update_history_panel()
+            self.btn_commit.setEnabled(True)
+            self.fit_to_window()
+            self.status_label.setText(f"⚡ Proxy {scale:.0%}  |  {w}×{h} of "
+                                      f"{self.full_original_bgr.shape[1]}×{self.full_original_bgr.shape[0]}")
+
+        self.start_operation("Building proxy", None, done, fn=self.chain_cache.render,
+                             args=(self.load_id, list(self.operation_chain), scale),
+                             source=proxy, on_abort=self.sync_proxy_button)
+
+    def commit_full_resolution(self, then=None):
+        # Replays the recorded chain on the full-resolution image and leaves
+        # the proxy mode; `then` runs once the full-size result is in place.
+        if self.full_original_bgr is None:
+            return
+        if self.proxy_scale >= 1.0:
+            if then:
+                then()
+            return
+
+        def done():
+            self.proxy_scale = 1.0
+            self.original_bgr = self.full_original_bgr
+            self.btn_proxy.setChecked(False)
+            self.btn_commit.setEnabled(False)
+            self.history.clear()
+            self.update_history_panel()
+            self.fit_to_window()
+            self.status_label.setText(f"✅ Committed {len(self.operation_chain)} step(s) at full resolution")
+            if then:
+                then()
+
+        self.start_operation("Rendering full resolution", None, done, fn=self.chain_cache.render,
+                             args=(self.load_id, list(self.operation_chain), 1.0),
+                             source=self.full_original_bgr, on_abort=self.sync_proxy_button)
+
+    def sync_proxy_button(self):
+        # After a cancelled or failed switch: show the mode actually in use.
+        self.btn_proxy.blockSignals(True)
+        self.btn_proxy.setChecked(self.proxy_scale < 1.0)
+        self.btn_proxy.blockSignals(False)
+
     # ═══════════════════════════════════════════════════════
     # DISPLAY helpers
     # ═══════════════════════════════════════════════════════
     def bgr_to_qpixmap(self, bgr):
-        rgb = cv2.cvtColor(bgr, cv2.COLOR_BGR2RGB)
-        h, w, _ = rgb.shape
-        return QPixmap.fromImage(QImage(rgb.data, w, h, w * 3, QImage.Format_RGB888).copy())
+        # Wraps the (possibly strided) buffer in place: Format_BGR888 and
+        # Grayscale8 need no channel swap or copy.  The raster backend may
+        # share that memory with the pixmap, so the pixmap keeps the array.
+        if bgr.ndim == 3 and not hasattr(QImage, "Format_BGR888"):   # Qt < 5.14
+            bgr = cv2.cvtColor(bgr, cv2.COLOR_BGR2RGB)
+            fmt = QImage.Format_RGB888
+        else:
+            fmt = QImage.Format_Grayscale8 if bgr.ndim == 2 else QImage.Format_BGR888
+        if bgr.strides[-1] != 1 or (bgr.ndim == 3 and bgr.strides[1] != 3):
+            bgr = np.ascontiguousarray(bgr)
+        h, w = bgr.shape[:2]
+        image = QImage(sip.voidptr(bgr.ctypes.data), w, h, bgr.strides[0], fmt)
+        pixmap = QPixmap.fromImage(image)
+        pixmap.buffer = bgr
+        return pixmap
 
     def update_display(self):
         if self.working_bgr is None:
             return
         
-        mode = self.visualization_mode
-        if mode == "combined":
-            display = self.working_bgr.copy()
-        elif mode == "grayscale":
-            gray = cv2.cvtColor(self.working_bgr, cv2.COLOR_BGR2GRAY)
-            display = cv2.cvtColor(gray, cv2.COLOR_GRAY2BGR)
-        elif mode == "red":
-            display = np.zeros_like(self.working_bgr)
-            display[:, :, 2] = self.working_bgr[:, :, 2]
-        elif mode == "green":
-            display = np.zeros_like(self.working_bgr)
-            display[:, :, 1] = self.working_bgr[:, :, 1]
-        elif mode == "blue":
-            display = np.zeros_like(self.working_bgr)
-            display[:, :, 0] = self.working_bgr[:, :, 0]
-        elif mode == "hsi":
-            display = self.compute_hsi_visual()
-        else:
-            display = self.working_bgr.copy()
-
-        pixmap = self.bgr_to_qpixmap(display)
-        self.graphics_scene.clear()
-        self.graphics_scene.addPixmap(pixmap)
-        self.graphics_view.setSceneRect(self.graphics_scene.itemsBoundingRect())
-        
+        self.show_visual(self.working_bgr, version=self.image_version)
         self.update_histogram()
+        if self.metrics_version != self.image_version:
+            self.metrics_timer.start()
+
+    def mode_visual(self, bgr):
+        # Called per display tile: the working image is never copied, and
+        # channel views only allocate a tile-sized buffer.
+        mode = self.visualization_mode
+        if mode == "grayscale":
+            return cv2.cvtColor(bgr, cv2.COLOR_BGR2GRAY)
+        if mode in ("red", "green", "blue"):
+            channel = {"blue": 0, "green": 1, "red": 2}[mode]
+            display = np.zeros_like(bgr)
+            display[:, :, channel] = bgr[:, :, channel]
+            return display
+        return bgr
+
+    def show_visual(self, bgr, scale=1.0, version=None):
+        # One persistent tiled item: unchanged tiles keep their pixmaps and
+        # the display mode is applied tile by tile.  HSI is the exception:
+        # the item shows the HSI image itself, cached per version of the
+        # working image (previews have no version and are small).
+        if self.visualization_mode == "hsi":
+            if version is None:
+                bgr = image_ops.compute_hsi_visual(bgr)
+            else:
+                bgr = self.hsi_cache.get(bgr, version).visual
+        with image_profile.stage("display: diff tiles"):
+            self.image_item.set_image(bgr, scale)
+        self.graphics_view.setSceneRect(self.image_item.sceneBoundingRect())
 
     def update_histogram(self):
         if self.working_bgr is None:
             return
-        
-        self.histogram_canvas.ax.clear()
-        
-        colors = ('b', 'g', 'r')
-        labels = ('Blue', 'Green', 'Red')
-        
-        for i, (col, label) in enumerate(zip(colors, labels)):
-            hist = cv2.calcHist([self.working_bgr], [i], None, [256], [0, 256])
-            self.histogram_canvas.ax.plot(hist, color=col, label=label, linewidth=1.5)
-        
-        self.histogram_canvas.ax.set_xlim([0, 256])
-        self.histogram_canvas.ax.set_xlabel('Pixel Intensity', fontsize=9)
-        self.histogram_canvas.ax.set_ylabel('Frequency', fontsize=9)
-        self.histogram_canvas.ax.set_title('Color Histogram', fontsize=10, fontweight='bold')
-        self.histogram_canvas.ax.legend(loc='upper right', fontsize=8)
-        self.histogram_canvas.ax.grid(True, alpha=0.3)
-        self.histogram_canvas.fig.tight_layout()
-        self.histogram_canvas.draw()
-
-    def compute_hsi_visual(self):
-        rgb = cv2.cvtColor(self.working_bgr, cv2.COLOR_BGR2RGB).astype(np.float32) / 255.0
-        H, S, I = self.compute_hsi(rgb)
-        
-        # Normalize for display
-        H_norm = (H / 360.0 * 255).astype(np.uint8)
-        S_norm = (S * 255).astype(np.uint8)
-        I_norm = (I * 255).astype(np.uint8)
-        
-        # Stack as BGR for display
-        hsi_display = cv2.merge([H_norm, S_norm, I_norm])
-        return hsi_display
+        # The histogram depends only on the pixels, not on the display mode.
+        if self.histogram_version == self.image_version:
+            return
+        self.histogram_version = self.image_version
+
+        hists = image_ops.channel_histograms(self.working_bgr, self.histogram_max_samples)
+        step = image_ops.histogram_sample_step(self.working_bgr.shape, self.histogram_max_samples)
+        self.ensure_histogram_canvas()
+        with image_profile.stage("histogram: draw"):
+            self.histogram_renderer.update(hists, sampled=step > 1)
+
+    def ensure_histogram_canvas(self):
+        if self.histogram_canvas is not None:
+            return
+        import image_plots
+        self.histogram_canvas = image_plots.MplCanvas(figsize=(7, 2.2))
+        self.histogram_canvas.setObjectName("HistogramCanvas")
+        self.histogram_renderer = image_plots.HistogramRenderer(self.histogram_canvas)
+        self.image_tab_layout.replaceWidget(self.histogram_placeholder, self.histogram_canvas)
+        self.histogram_placeholder.deleteLater()
+        self.histogram_placeholder = None
+
+    def compute_hsi_visual(self, bgr=None):
+        return image_ops.compute_hsi_visual(self.working_bgr if bgr is None else bgr)
 
     def compute_hsi(self, rgb):
-        eps = 1e-8
-        R, G, B = rgb[:,:,0], rgb[:,:,1], rgb[:,:,2]
-        
-        I = (R + G + B) / 3.0
-        
-        min_rgb  = np.minimum(np.minimum(R, G), B)
-        sum_rgb  = R + G + B
-        S = 1.0 - (3.0 * min_rgb / (sum_rgb + eps))
-        S = np.clip(S, 0.0, 1.0)
-        
-        num   = 0.5 * ((R - G) + (R - B))
-        den   = np.sqrt((R-G)**2 + (R-B)*(G-B)) + eps
-        theta = np.arccos(np.clip(num / den, -1.0, 1.0))
-        H     = np.degrees(theta)
-        H     = np.where(B > G, 360.0 - H, H)
-        H     = np.mod(H, 360.0)
-        
-        return H, S, I
+        return image_ops.compute_hsi(rgb)
+
+    # ═══════════════════════════════════════════════════════
+    # QUALITY METRICS
+    # ═══════════════════════════════════════════════════════
+    def refresh_metrics(self):
+        if self.working_bgr is None or self.metrics_version == self.image_version:
+            return
+        version = self.image_version
+        if self.metrics_worker is not None:
+            if self.metrics_worker.job_id == version:
+                return  # already measuring this version
+            self.metrics_worker.cancelled = True
+            self.metrics_worker = None
+        if self.working_bgr.shape != self.original_bgr.shape:
+            self.metrics = None
+            self.metrics_version = version
+            self.metrics_label.setText("📏 Size differs from the original: no metrics")
+            return
+
+        worker = OperationWorker(version, image_ops.image_quality, self.original_bgr, self.working_bgr)
+        worker.signals.finished.connect(self.on_metrics_ready)
+        worker.signals.failed.connect(self.on_metrics_failed)
+        self.metrics_worker = worker
+        self.metrics_label.setText("⏳ Measuring against the original…")
+        self.thread_pool.start(worker)
+
+    def on_metrics_ready(self, version, metrics):
+        if self.metrics_worker is not None and self.metrics_worker.job_id == version:
+            self.metrics_worker = None
+        if version != self.image_version:
+            self.refresh_metrics()  # image changed meanwhile
+            return
+        self.metrics = metrics
+        self.metrics_version = version
+        if metrics["mse"] == 0:
+            self.metrics_label.setText("📏 Identical to the original")
+            return
+        self.metrics_label.setText(f"📏 vs original  |  MSE {metrics['mse']:.2f}  |  "
+                                   f"PSNR {metrics['psnr']:.2f} dB  |  SSIM {metrics['ssim']:.4f}")
+
+    def on_metrics_failed(self, version, message):
+        if self.metrics_worker is not None and self.metrics_worker.job_id == version:
+            self.metrics_worker = None
+        self.metrics_label.setText(f"❌ Metrics failed: {message}")
 
     # ═══════════════════════════════════════════════════════
     # FOURIER ANALYSIS
     # ═══════════════════════════════════════════════════════
-    def update_fourier(self):
+    def fourier_visible(self):
+        return self.tab_widget.currentIndex() == self.fourier_tab_index
+
+    def invalidate_fourier(self):
+        # Called on every image change: costs nothing until the tab is shown.
+        self.fourier_dirty = True
+        if self.fourier_visible():
+            self.fourier_timer.start()
+
+    def on_tab_changed(self, index):
+        if index == self.fourier_tab_index and self.fourier_dirty:
+            image_profile.begin("Fourier analysis")
+            self.fourier_timer.start()
+
+    def refresh_fourier(self):
+        if not self.fourier_dirty or not self.fourier_visible() or self.working_bgr is None:
+            return
+        version = self.image_version
+        if self.fourier_worker is not None:
+            if self.fourier_worker.job_id == version:
+                return  # already computing this version
+            self.fourier_worker.cancelled = True
+
+        worker = OperationWorker(version, compute_fourier_views,
+                                 self.working_bgr, self.spectrum_cache, version)
+        worker.signals.finished.connect(self.on_fourier_ready)
+        worker.signals.failed.connect(self.on_fourier_failed)
+        self.fourier_worker = worker
+        self.fourier_info_label.setText("⏳ Computing Fourier analysis…")
+        self.thread_pool.start(worker)
+
+    def on_fourier_ready(self, version, spectrum):
+        if self.fourier_worker is not None and self.fourier_worker.job_id == version:
+            self.fourier_worker = None
+        if version != self.image_version:
+            self.refresh_fourier()  # image changed meanwhile
+            return
+        self.fourier_dirty = False
+        self.update_fourier(spectrum)
+
+    def on_fourier_failed(self, version, message):
+        if self.fourier_worker is not None and self.fourier_worker.job_id == version:
+            self.fourier_worker = None
+        self.fourier_info_label.setText(f"❌ Fourier analysis failed: {message}")
+
+    def update_fourier(self, spectrum=None):
         if self.working_bgr is None:
             return
         
-        gray = cv2.cvtColor(self.working_bgr, cv2.COLOR_BGR2GRAY)
-        
-        # Compute FFT
-        f = np.fft.fft2(gray)
-        fshift = np.fft.fftshift(f)
-        
-        magnitude = np.abs(fshift)
-        phase = np.angle(fshift)
-        power = magnitude ** 2
-        
-        # Log scale for visualization
-        magnitude_log = np.log(magnitude + 1)
-        power_log = np.log(power + 1)
+        if spectrum is None:
+            spectrum = self.spectrum_cache.get(self.working_bgr, self.image_version)
+        magnitude_log = spectrum.magnitude_log
+        power_log = spectrum.power_log
+        phase = spectrum.phase
+        self.ensure_fourier_canvases()
         
         # Update magnitude plot
-        self.mag_canvas.ax.clear()
-        im1 = self.mag_canvas.ax.imshow(magnitude_log, cmap='hot')
-        self.mag_canvas.ax.set_title('Magnitude (log scale)', fontsize=9)
-        self.mag_canvas.ax.axis('off')
-        self.mag_canvas.fig.tight_layout()
-        self.mag_canvas.draw()
+        with image_profile.stage("fourier: magnitude canvas"):
+            self.mag_canvas.ax.clear()
+            im1 = self.mag_canvas.ax.imshow(magnitude_log, cmap='hot')
+            self.mag_canvas.ax.set_title('Magnitude (log scale)', fontsize=9)
+            self.mag_canvas.ax.axis('off')
+            self.mag_canvas.fig.tight_layout()
+            self.mag_canvas.draw()
         
         # Update power plot
-        self.pow_canvas.ax.clear()
-        im2 = self.pow_canvas.ax.imshow(power_log, cmap='viridis')
-        self.pow_canvas.ax.set_title('Power (log scale)', fontsize=9)
-        self.pow_canvas.ax.axis('off')
-        self.pow_canvas.fig.tight_layout()
-        self.pow_canvas.draw()
+        with image_profile.stage("fourier: power canvas"):
+            self.pow_canvas.ax.clear()
+            im2 = self.pow_canvas.ax.imshow(power_log, cmap='viridis')
+            self.pow_canvas.ax.set_title('Power (log scale)', fontsize=9)
+            self.pow_canvas.ax.axis('off')
+            self.pow_canvas.fig.tight_layout()
+            self.pow_canvas.draw()
         
         # Update phase plot
-        self.phase_canvas.ax.clear()
-        im3 = self.phase_canvas.ax.imshow(phase, cmap='twilight')
-        self.phase_canvas.ax.set_title('Phase', fontsize=9)
-        self.phase_canvas.ax.axis('off')
-        self.phase_canvas.fig.tight_layout()
-        self.phase_canvas.draw()
+        with image_profile.stage("fourier: phase canvas"):
+            self.phase_canvas.ax.clear()
+            im3 = self.phase_canvas.ax.imshow(phase, cmap='twilight')
+            self.phase_canvas.ax.set_title('Phase', fontsize=9)
+            self.phase_canvas.ax.axis('off')
+            self.phase_canvas.fig.tight_layout()
+            self.phase_canvas.draw()
         
         # Radial average
-        radial_profile = self.compute_radial_average(magnitude_log)
-        self.radial_canvas.ax.clear()
-        self.radial_canvas.ax.plot(radial_profile, linewidth=2, color='#0B278C')
-        self.radial_canvas.ax.set_xlabel('Frequency (pixels)', fontsize=9)
-        self.radial_canvas.ax.set_ylabel('Magnitude (log)', fontsize=9)
-        self.radial_canvas.ax.set_title('Radial Average of Magnitude Spectrum', fontsize=10)
-        self.radial_canvas.ax.grid(True, alpha=0.3)
-        self.radial_canvas.fig.tight_layout()
-        self.radial_canvas.draw()
+        radii, radial_profile = image_ops.radial_profile(magnitude_log, self.radial_max_bins,
+                                                         self.radial_log_bins)
+        with image_profile.stage("fourier: radial canvas"):
+            self.radial_canvas.ax.clear()
+            self.radial_canvas.ax.plot(radii, radial_profile, linewidth=2, color='#0B278C')
+            if self.radial_log_bins:
+                self.radial_canvas.ax.set_xscale('symlog', linthresh=1)
+            self.radial_canvas.ax.set_xlabel('Frequency (pixels)', fontsize=9)
+            self.radial_canvas.ax.set_ylabel('Magnitude (log)', fontsize=9)
+            self.radial_canvas.ax.set_title('Radial Average of Magnitude Spectrum', fontsize=10)
+            self.radial_canvas.ax.grid(True, alpha=0.3)
+            self.radial_canvas.fig.tight_layout()
+            self.radial_canvas.draw()
         
-        self.fourier_info_label.setText(f"Fourier analysis updated | Image size: {gray.shape[1]}×{gray.shape[0]}")
+        self.fourier_info_label.setText(f"Fourier analysis updated | Image size: {spectrum.image_shape[1]}×{spectrum.image_shape[0]}"
+                                        f"  |  FFT: {fft_backend.get_backend().name} {spectrum.shape[1]}×{spectrum.shape[0]}")
+
+    def ensure_fourier_canvases(self):
+        if self.mag_canvas is not None:
+            return
+        import image_plots
+        self.mag_canvas = image_plots.MplCanvas(figsize=(4.5, 3.5))
+        self.pow_canvas = image_plots.MplCanvas(figsize=(4.5, 3.5))
+        self.phase_canvas = image_plots.MplCanvas(figsize=(4.5, 3.5))
+        self.radial_canvas = image_plots.MplCanvas(figsize=(12, 2.8))
+        canvases = (self.mag_canvas, self.pow_canvas, self.phase_canvas, self.radial_canvas)
+        for layout, canvas in zip(self.fourier_layouts, canvases):
+            layout.addWidget(canvas)
 
     def compute_radial_average(self, data):
-        y, x = np.indices(data.shape)
-        center = np.array([(x.max()-x.min())/2.0, (y.max()-y.min())/2.0])
-        r = np.hypot(x - center[0], y - center[1])
-        
-        r = r.astype(int)
-        tbin = np.bincount(r.ravel(), data.ravel())
-        nr = np.bincount(r.ravel())
-        radialprofile = tbin / nr
-        return radialprofile
+        return image_ops.compute_radial_average(data)
 
     # ═══════════════════════════════════════════════════════
     # ZOOM CONTROLS
     # ═══════════════════════════════════════════════════════
     def fit_to_window(self):
+        image_profile.begin("Zoom")
         self.graphics_view.fitInView(self.graphics_scene.sceneRect(), Qt.KeepAspectRatio)
 
     def reset_zoom(self):
+        image_profile.begin("Zoom")
         self.graphics_view.resetTransform()
 
     # ═══════════════════════════════════════════════════════
     # VISUALIZATION MODE
     # ═══════════════════════════════════════════════════════
     def set_vis_mode(self, mode):
+        image_profile.begin(f"View: {mode}")
         self.visualization_mode = mode
+        self.image_item.refresh()
         self.update_display()
         self.status_label.setText(f"📊 Visualization: {mode.upper()}")
 
+    # ═══════════════════════════════════════════════════════
+    # BACKGROUND JOBS
+    # ═══════════════════════════════════════════════════════
+    def start_operation(self, busy_text, step, on_done, fn=None, args=(), source=None, record=None,
+                        on_abort=None):
+        # step is the (name, args) entry appended to the operation chain when
+        # the result is accepted (None for replays).  By default it runs from
+        # the registry with spatial parameters scaled to the proxy; fn/args
+        # and source override what runs and on which image.  Recorded jobs
+        # (by default, those with a step) also push an undo entry.
+        # on_abort runs instead of on_done if the job fails or is superseded.
+        # Any new request supersedes the one still in flight.
+        self.supersede_jobs()
+        image_profile.begin(busy_text)
+        if fn is None:
+            fn, args = image_ops.apply_step, (step, self.proxy_scale)
+        record = step is not None if record is None else record
+        if record:
+            fn, args = run_recorded, (self.history_label_for(busy_text, step), step, fn, *args)
+        bgr = self.working_bgr if source is None else source
+        worker = OperationWorker(self.job_id, fn, bgr, *args)
+        worker.signals.finished.connect(self.on_operation_finished)
+        worker.signals.failed.connect(self.on_operation_failed)
+        self.active_worker = worker
+        self.active_done = on_done
+        self.active_abort = on_abort
+        self.active_step = step
+        self.active_record = record
+        self.set_busy(busy_text)
+        self.thread_pool.start(worker)
+
+    def start_warm_up(self):
+        # Not a user job: it is never superseded and reports nothing.
+        self.warm_up_worker = OperationWorker(0, lambda: warm_up())
+        self.thread_pool.start(self.warm_up_worker)
+
+    def supersede_jobs(self):
+        self.job_id += 1
+        abort = None
+        if self.active_worker is not None:
+            self.active_worker.cancelled = True
+            abort = self.active_abort
+        self.active_worker = None
+        self.active_done = None
+        self.active_abort = None
+        if self.edit_worker is not None:      # a step edit still rendering its base
+            self.edit_worker.cancelled = True
+            self.edit_job += 1
+            self.edit_worker = self.edit_open = None
+        self.set_busy(None)
+        if abort:
+            abort()
+
+    def cancel_operation(self):
+        if self.active_worker is None:
+            return
+        self.supersede_jobs()
+        self.status_label.setText("⛔ Operation cancelled")
+
+    def on_operation_finished(self, job_id, result):
+        if job_id != self.job_id:
+            return  # stale result from a superseded job
+        on_done, step, record = self.active_done, self.active_step, self.active_record
+        self.active_worker = None
+        self.active_done = None
+        self.active_abort = None
+        self.active_step = None
+        self.set_busy(None)
+
+        entry = None
+        if record:
+            result, entry = result
+            entry.chain_before = list(self.operation_chain)
+        self.working_bgr = result
+        if step is not None:
+            self.operation_chain.append(step)
+        self.update_display()
+        self.invalidate_fourier()
+        on_done()
+        # every accepted result is the output of the current chain
+        self.chain_cache.put(self.load_id, self.proxy_scale, self.operation_chain, self.working_bgr)
+        if entry is not None:
+            entry.chain_after = list(self.operation_chain)
+            self.history.push(entry)
+        self.update_history_panel()
+
+    def on_operation_failed(self, job_id, message):
+        if job_id != self.job_id:
+            return
+        abort = self.active_abort
+        self.active_worker = None
+        self.active_done = None
+        self.active_abort = None
+        self.set_busy(None)
+        self.status_label.setText(f"❌ {message}")
+        if abort:
+            abort()
+
+    def set_busy(self, text):
+        if text:
+            self.busy_text = text
+            self.busy_frame = 0
+            self.animate_busy()
+            self.busy_timer.start()
+        else:
+            self.busy_timer.stop()
+        self.btn_cancel.setVisible(bool(text))
+
+    def animate_busy(self):
+        spinner = "◐◓◑◒"
+        self.status_label.setText(f"{spinner[self.busy_frame % 4]} {self.busy_text}…")
+        self.busy_frame += 1
+
+    # ═══════════════════════════════════════════════════════
+    # UNDO / REDO HISTORY
+    # ═══════════════════════════════════════════════════════
+    def history_label_for(self, busy_text, step):
+        if step is not None and len(step[1]) > 1:
+            return f"{busy_text} ({format(step[1][1], 'g')})"
+        return busy_text
+
+    def undo(self):
+        self.go_to_history(self.history.cursor - 1)
+
+    def redo(self):
+        self.go_to_history(self.history.cursor + 1)
+
+    def on_history_clicked(self, item):
+        self.go_to_history(self.history_list.row(item))
+
+    def go_to_history(self, target):
+        # Moves to the state after `target` entries (row 0 = oldest kept).
+        if self.working_bgr is None or target == self.history.cursor:
+            return
+        if not 0 <= target <= len(self.history.entries):
+            return
+        moves = self.history.moves_to(target)
+        undoing = target < self.history.cursor
+        more = f" (+{len(moves) - 1} more)" if len(moves) > 1 else ""
+
+        def done():
+            self.history.cursor = target
+            self.operation_chain = self.history.chain_at(target)
+            self.update_history_panel()
+            icon, verb = ("↩️", "Undo") if undoing else ("↪️", "Redo")
+            self.status_label.setText(f"{icon} {verb}: {moves[-1][0].label}{more}")
+
+        self.start_operation("Undoing" if undoing else "Redoing", None, done,
+                             fn=image_history.travel, args=(moves,))
+
+    def set_history_budget(self, megabytes):
+        self.history.set_budget(megabytes * 1024 * 1024)
+        self.update_history_panel()
+
+    def update_history_panel(self):
+        history = self.history
+        self.history_list.clear()
+        self.history_list.addItem("📂 Original" if not history.evicted else "📂 Oldest kept state")
+        for i, entry in enumerate(history.entries):
+            self.history_list.addItem(entry.label)
+            if i >= history.cursor:
+                self.history_list.item(i + 1).setForeground(QColor("#9B9B9B"))   # redo branch
+        self.history_list.setCurrentRow(history.cursor)
+        self.btn_undo.setEnabled(history.can_undo())
+        self.btn_redo.setEnabled(history.can_redo())
+        self.history_label.setText(f"{len(history.entries)} step(s)  |  {history.nbytes / 1e6:.1f} MB  |  "
+                                   f"cache {self.chain_cache.nbytes / 1e6:.0f} MB")
+
+        self.chain_list.clear()
+        for i, step in enumerate(self.operation_chain):
+            self.chain_list.addItem(f"{i + 1}. {image_ops.step_spec(step)}")
+        has_steps = bool(self.operation_chain)
+        self.btn_edit_step.setEnabled(has_steps)
+        self.btn_remove_step.setEnabled(has_steps)
+
+    # ═══════════════════════════════════════════════════════
+    # OPERATION CHAIN  (non-destructive editing)
+    # ═══════════════════════════════════════════════════════
+    def edit_chain_step(self, index):
+        chain = list(self.operation_chain)
+        if not 0 <= index < len(chain):
+            return
+        name, args = chain[index]
+        if not args:
+            self.status_label.setText(f"ℹ️ {name} has no parameters - remove it instead")
+            return
+        if name == "denoise_raw":
+            self.status_label.setText("ℹ️ Tuned cv2 parameters have no slider - remove the step and tune again")
+            return
+        kind = args[0]
+        if name == "noise":
+            title = f"{kind.replace('_', ' ').title()} Noise"
+        elif name == "denoise":
+            title = f"{kind.title()} Denoise"
+        else:
+            title = kind.title()
+
+        extra = args[2:]              # e.g. the noise seed, kept as recorded
+        token = self.load_id
+
+        def apply(value):
+            chain[index] = (name, (kind, value, *extra))
+            self.rerender_chain(chain, index, f"Editing step {index + 1} ({image_ops.step_spec(chain[index])})")
+
+        def open_panel(base):
+            if self.operation_chain != chain or self.load_id != token:
+                return  # the chain changed while the base was rendering
+            self.status_label.setText(f"✏️ Editing step {index + 1}")
+            self.open_params_panel(title, lambda v: (name, (kind, v, *extra)), apply,
+                                   initial=args[1], base=base, tail=chain[index + 1:])
+
+        # Steps before `index` are untouched: preview and re-render start
+        # from the output of step index-1.  It is usually cached, but after
+        # an eviction the prefix is re-run, so it is rendered on a worker.
+        if self.edit_worker is not None:
+            self.edit_worker.cancelled = True
+        self.edit_job += 1
+        self.edit_open = open_panel
+        worker = OperationWorker(self.edit_job, self.chain_cache.render, self.original_bgr,
+                                 token, chain[:index], self.proxy_scale)
+        worker.signals.finished.connect(self.on_edit_base_ready)
+        worker.signals.failed.connect(self.on_edit_base_failed)
+        self.edit_worker = worker
+        self.status_label.setText(f"⏳ Rendering steps 1-{index} for editing…" if index
+                                  else f"✏️ Editing step {index + 1}")
+        self.thread_pool.start(worker)
+
+    def on_edit_base_ready(self, job, base):
+        if job != self.edit_job:
+            return
+        open_panel, self.edit_open, self.edit_worker = self.edit_open, None, None
+        open_panel(base)
+
+    def on_edit_base_failed(self, job, message):
+        if job != self.edit_job:
+            return
+        self.edit_open = self.edit_worker = None
+        self.status_label.setText(f"❌ {message}")
+
+    def remove_chain_step(self, index):
+        chain = list(self.operation_chain)
+        if not 0 <= index < len(chain):
+            return
+        removed = chain.pop(index)
+        self.rerender_chain(chain, index, f"Removing step {index + 1} ({image_ops.step_spec(removed)})")
+
+    def rerender_chain(self, chain, index, busy_text):
+        def done():
+            self.operation_chain = list(chain)
+            self.status_label.setText(f"✅ Re-rendered {len(chain) - index} step(s) from step {index + 1}")
+
+        self.start_operation(busy_text, None, done, fn=render_chain,
+                             args=(self.chain_cache, self.original_bgr, self.load_id, chain, self.proxy_scale),
+                             record=True)
+
     # ═══════════════════════════════════════════════════════
     # IMAGE OPERATIONS
     # ═══════════════════════════════════════════════════════
     def invert_image(self):
         if self.working_bgr is not None:
-            self.working_bgr = cv2.bitwise_not(self.working_bgr)
-            self.update_display()
-            self.update_fourier()
-            self.status_label.setText("🔁 Image inverted")
+            self.start_operation("Inverting", ("invert", ()),
+                                 lambda: self.status_label.setText("🔁 Image inverted"))
 
     def flip_horizontal(self):
         if self.working_bgr is not None:
-            self.working_bgr = cv2.flip(self.working_bgr, 1)
-            self.update_display()
-            self.update_fourier()
-            self.status_label.setText("↔️ Flipped horizontally")
+            self.start_operation("Flipping horizontally", ("flip_h", ()),
+                                 lambda: self.status_label.setText("↔️ Flipped horizontally"))
 
     def flip_vertical(self):
         if self.working_bgr is not None:
-            self.working_bgr = cv2.flip(self.working_bgr, 0)
-            self.update_display()
-            self.update_fourier()
-            self.status_label.setText("↕️ Flipped vertically")
+            self.start_operation("Flipping vertically", ("flip_v", ()),
+                                 lambda: self.status_label.setText("↕️ Flipped vertically"))
 
     def rotate_90(self):
         if self.working_bgr is not None:
-            self.working_bgr = cv2.rotate(self.working_bgr, cv2.ROTATE_90_CLOCKWISE)
-            self.update_display()
-            self.update_fourier()
-            self.status_label.setText("🔃 Rotated 90° clockwise")
+            self.start_operation("Rotating", ("rotate90", ()),
+                                 lambda: self.status_label.setText("🔃 Rotated 90° clockwise"))
 
     def equalize_histogram(self):
         if self.working_bgr is not None:
-            ycrcb = cv2.cvtColor(self.working_bgr, cv2.COLOR_BGR2YCrCb)
-            ycrcb[:, :, 0] = cv2.equalizeHist(ycrcb[:, :, 0])
-            self.working_bgr = cv2.cvtColor(ycrcb, cv2.COLOR_YCrCb2BGR)
-            self.update_display()
-            self.update_fourier()
-            self.status_label.setText("📊 Histogram equalized")
+            self.start_operation("Equalizing", ("equalize", ()),
+                                 lambda: self.status_label.setText("📊 Histogram equalized"))
 
     # ═══════════════════════════════════════════════════════
     # NOISE FUNCTIONS
     # ═══════════════════════════════════════════════════════
-    def apply_noise(self, noise_type, strength):
+    def apply_noise(self, noise_type, strength, seed=None):
         if self.working_bgr is None:
             return
         
-        img = self.working_bgr.astype(np.float32) / 255.0
-        
-        if noise_type == "pepper_&_salt":
-            noise = np.random.rand(*img.shape[:2])
-            img[noise < strength * 0.5] = 0
-            img[noise > 1 - strength * 0.5] = 1
-            code = f"# Pepper & Salt Noise\nnoise = np.random.rand(*img.shape[:2])\nimg[noise < {strength * 0.5}] = 0\nimg[noise > {1 - strength * 0.5}] = 1"
-            
-        elif noise_type == "gaussian":
-            noise = np.random.normal(0, strength * 0.1, img.shape)
-            img = img + noise
-            code = f"# Gaussian Noise\nnoise = np.random.normal(0, {strength * 0.1}, img.shape)\nimg = img + noise"
-            
-        elif noise_type == "speckle":
-            noise = np.random.randn(*img.shape)
-            img = img + img * noise * strength * 0.3
-            code = f"# Speckle Noise\nnoise = np.random.randn(*img.shape)\nimg = img + img * noise * {strength * 0.3}"
-            
-        elif noise_type == "poisson":
-            vals = len(np.unique(img))
-            vals = 2 ** np.ceil(np.log2(vals))
-            img = np.random.poisson(img * vals * strength) / float(vals * strength)
-            code = f"# Poisson Noise\nvals = 2 ** np.ceil(np.log2(len(np.unique(img))))\nimg = np.random.poisson(img * vals * {strength}) / float(vals * {strength})"
-        else:
-            code = "# Unknown noise type"
-        
-        img = np.clip(img, 0, 1)
-        self.working_bgr = (img * 255).astype(np.uint8)
-        self.current_filter_code = code
-        self.update_display()
-        self.update_fourier()
-        self.status_label.setText(f"🎚️ Applied {noise_type.replace('_', ' ').title()} noise")
+        label = noise_type.replace('_', ' ').title()
+        # the seed is part of the step, so chain replays reproduce the noise
+        seed = image_ops.new_seed() if seed is None else seed
+
+        def done():
+            self.current_filter_code = image_ops.noise_code(noise_type, strength, seed)
+            self.status_label.setText(f"🎚️ Applied {label} noise  |  seed {seed}")
+
+        self.start_operation(f"Adding {label} noise", ("noise", (noise_type, strength, seed)), done)
 
     # ═══════════════════════════════════════════════════════
     # DENOISE FUNCTIONS
     # ═══════════════════════════════════════════════════════
-    def apply_denoise(self, method, strength):
+    def apply_denoise(self, method, strength, result=None):
+        # result: an already computed output for the current image (from the
+        # comparison grid), accepted without running the filter again.
         if self.working_bgr is None:
             return
         
-        ksize = int(3 + strength * 10)
-        if ksize % 2 == 0:
-            ksize += 1
-        
-        if method == "bilateral":
-            d = int(5 + strength * 10)
-            sigma_color = int(50 + strength * 100)
-            sigma_space = int(50 + strength * 100)
-            self.working_bgr = cv2.bilateralFilter(self.working_bgr, d, sigma_color, sigma_space)
-            code = f"# Bilateral Filter\nimg = cv2.bilateralFilter(img, {d}, {sigma_color}, {sigma_space})"
-            
-        elif method == "mean":
-            self.working_bgr = cv2.blur(self.working_bgr, (ksize, ksize))
-            code = f"# Mean Filter\nimg = cv2.blur(img, ({ksize}, {ksize}))"
-            
-        elif method == "median":
-            self.working_bgr = cv2.medianBlur(self.working_bgr, ksize)
-            code = f"# Median Filter\nimg = cv2.medianBlur(img, {ksize})"
-            
-        elif method == "non-local means":
-            h = int(3 + strength * 20)
-            self.working_bgr = cv2.fastNlMeansDenoisingColored(self.working_bgr, None, h, h, 7, 21)
-            code = f"# Non-Local Means\nimg = cv2.fastNlMeansDenoisingColored(img, None, {h}, {h}, 7, 21)"
+        def done():
+            self.current_denoise_code = image_ops.denoise_code(method, strength)
+            self.status_label.setText(f"🧹 Applied {method.title()} denoising")
+
+        fn = None if result is None else (lambda bgr: result)
+        self.start_operation(f"{method.title()} denoising", ("denoise", (method, strength)), done, fn=fn)
+
+    # ═══════════════════════════════════════════════════════
+    # DENOISE COMPARISON
+    # ═══════════════════════════════════════════════════════
+    def in_process_pool(self, start):
+        # start(pool) submits jobs to the shared worker processes; a pool
+        # broken by a dead worker (e.g. out of memory) is replaced once.
+        import image_compare
+        if self.process_pool is None:
+            self.process_pool = image_compare.make_pool(self.process_workers)
+        try:
+            return start(self.process_pool)
+        except BrokenProcessPool:
+            self.process_pool.shutdown(wait=False)
+            self.process_pool = image_compare.make_pool(self.process_workers)
+            return start(self.process_pool)
+
+    def show_compare_dialog(self):
+        if self.working_bgr is None:
+            return
+        if self.compare_dialog is None:
+            self.compare_dialog = CompareDialog(self.bgr_to_qpixmap, self)
+            self.compare_dialog.runRequested.connect(self.run_comparison)
+            self.compare_dialog.useRequested.connect(self.use_comparison_result)
+            self.compare_dialog.finished.connect(lambda _: self.close_comparison())
+        self.compare_dialog.show()
+        self.compare_dialog.raise_()
+        self.compare_dialog.request_run()
+
+    def run_comparison(self, strengths):
+        # Every method × strength runs at once in worker processes; results
+        # fill the grid as they arrive.
+        import image_compare
+        self.cancel_comparison()
+        self.compare_job += 1
+        job = self.compare_job
+        methods = image_ops.DENOISE_METHODS
+        self.compare_version = self.image_version
+        self.compare_results = {}
+        self.compare_received = 0
+        self.compare_expected = len(methods) * len(strengths)
+        self.compare_started = time.perf_counter()
+        self.compare_dialog.set_grid(methods, strengths)
+        self.compare_dialog.info_label.setText(
+            f"⏳ Running {self.compare_expected} job(s) on {self.process_workers} process(es)…")
+        self.comparison = self.in_process_pool(
+            lambda pool: image_compare.DenoiseComparison(pool, self.working_bgr, methods,
+                                                         strengths, self.proxy_scale))
+        # called on a pool thread: the queued signal hands over to the GUI
+        self.comparison.add_done_callback(lambda *res: self.compare_signals.finished.emit(job, res))
+
+    def on_comparison_result(self, job, res):
+        if job != self.compare_job or self.compare_dialog is None:
+            return
+        method, strength, result, seconds, error = res
+        self.compare_received += 1
+        if error is not None:
+            self.compare_dialog.set_failed(method, strength, error)
         else:
-            code = "# Unknown denoise method"
-        
-        self.current_denoise_code = code
-        self.update_display()
-        self.update_fourier()
-        self.status_label.setText(f"🧹 Applied {method.title()} denoising")
+            self.compare_results[(method, strength)] = result
+            self.compare_dialog.set_result(method, strength, result, seconds)
+        if self.compare_received == self.compare_expected:
+            elapsed = time.perf_counter() - self.compare_started
+            self.compare_dialog.info_label.setText(
+                f"✅ {len(self.compare_results)} result(s) in {elapsed:.2f}s  |  "
+                f"zoom and pan are shared by all views")
+            self.comparison = None
+
+    def cancel_comparison(self):
+        self.compare_job += 1
+        if self.comparison is not None:
+            self.comparison.cancel()
+            self.comparison = None
+        self.compare_results = {}
+
+    def close_comparison(self):
+        # Closing the grid drops its results; reopening runs it again.
+        self.cancel_comparison()
+        self.compare_dialog.set_grid((), ())
+
+    def use_comparison_result(self, method, strength):
+        result = self.compare_results.get((method, strength))
+        if self.compare_version != self.image_version:
+            result = None           # the image changed since: run it again
+        self.apply_denoise(method, strength, result)
+
+    # ═══════════════════════════════════════════════════════
+    # AUTO-TUNE
+    # ═══════════════════════════════════════════════════════
+    def run_auto_tune(self, method, metric, raw):
+        # Scores the working image denoised at every candidate setting
+        # against the original, in worker processes with early stopping.
+        panel = self.preview_panel
+        if panel is None or self.working_bgr is None:
+            return
+        if self.working_bgr.shape != self.original_bgr.shape:
+            panel.tune_label.setText("❌ The image size differs from the original")
+            return
+        import image_tune
+        self.cancel_auto_tune()
+        self.tune_job += 1
+        job = self.tune_job
+        lines = image_tune.candidate_lines(method, raw, scale=self.proxy_scale)
+        self.tune_version = self.image_version
+        self.tune_scored = 0
+        self.tune_total = sum(len(line) for line in lines)
+        self.tune_started = time.perf_counter()
+        panel.btn_tune.setEnabled(False)
+        panel.tune_label.setText(f"⏳ Scoring {self.tune_total} candidate(s) on "
+                                 f"{self.process_workers} process(es)…")
+        # callbacks run on a pool thread: the queued signal hands over to the GUI
+        self.sweep = self.in_process_pool(
+            lambda pool: image_tune.ParameterSweep(
+                pool, self.working_bgr, self.original_bgr, lines, metric, self.proxy_scale,
+                callback=lambda *res: self.tune_signals.finished.emit(job, res),
+                on_finished=lambda: self.tune_signals.finished.emit(job, None)))
+
+    def on_tune_result(self, job, res):
+        if job != self.tune_job or self.sweep is None:
+            return
+        if res is None:
+            self.finish_auto_tune()
+            return
+        self.tune_scored += 1
+        best = self.sweep.best()
+        if best is not None and self.preview_panel is not None:
+            metric = self.sweep.metric
+            self.preview_panel.tune_label.setText(
+                f"⏳ {self.tune_scored}/{self.tune_total} scored  |  best {metric.upper()} "
+                f"{best[1][metric]:.4f} at {image_ops.step_spec(best[0])}")
+
+    def finish_auto_tune(self):
+        sweep, self.sweep = self.sweep, None
+        panel = self.preview_panel
+        best = sweep.best()
+        if panel is not None:
+            panel.btn_tune.setEnabled(True)
+        if best is None:
+            if panel is not None:
+                panel.tune_label.setText(f"❌ Every candidate failed: {sweep.results[-1][3]}"
+                                         if sweep.results else "❌ Nothing was scored")
+            return
+        if self.tune_version != self.image_version:
+            if panel is not None:
+                panel.tune_label.setText("⚠️ The image changed while tuning - run it again")
+            return
+
+        step, metrics, _ = best
+        name, (method, *values) = step
+        metric = sweep.metric
+        elapsed = time.perf_counter() - self.tune_started
+        spec = image_ops.step_spec(step)
+
+        def done():
+            if name == "denoise":
+                self.current_denoise_code = image_ops.denoise_code(method, values[0])
+            else:
+                self.current_denoise_code = image_ops.denoise_params_code(
+                    method, image_ops.raw_denoise_params(method, values))
+            self.status_label.setText(
+                f"🎯 Applied {spec}  |  {metric.upper()} {metrics[metric]:.4f}  |  "
+                f"{len(sweep.results)} scored, {sweep.skipped} skipped in {elapsed:.1f}s")
+
+        self.close_params_panel()
+        self.start_operation(f"{method.title()} denoising (auto-tuned)", step, done)
+
+    def cancel_auto_tune(self):
+        self.tune_job += 1
+        if self.sweep is not None:
+            self.sweep.cancel()
+            self.sweep = None
 
     # ═══════════════════════════════════════════════════════
     # FREQUENCY FILTERS
@@ -1222,85 +2383,179 @@ class ImageAnalyzer(QMainWindow):
         if self.working_bgr is None:
             return
         
-        gray = cv2.cvtColor(self.working_bgr, cv2.COLOR_BGR2GRAY)
-        
-        # FFT
-        f = np.fft.fft2(gray)
-        fshift = np.fft.fftshift(f)
-        
-        rows, cols = gray.shape
-        crow, ccol = rows // 2, cols // 2
-        
-        # Create filter mask
-        mask = np.zeros((rows, cols), np.uint8)
-        
-        if filter_type == "low pass":
-            cv2.circle(mask, (ccol, crow), cutoff, 1, -1)
-            code = f"# Low Pass Filter\nmask = np.zeros((rows, cols), np.uint8)\ncv2.circle(mask, (ccol, crow), {cutoff}, 1, -1)"
-            
-        elif filter_type == "high pass":
-            mask = np.ones((rows, cols), np.uint8)
-            cv2.circle(mask, (ccol, crow), cutoff, 0, -1)
-            code = f"# High Pass Filter\nmask = np.ones((rows, cols), np.uint8)\ncv2.circle(mask, (ccol, crow), {cutoff}, 0, -1)"
-            
-        elif filter_type == "notch pass":
-            cv2.circle(mask, (ccol - cutoff, crow - cutoff), 20, 1, -1)
-            cv2.circle(mask, (ccol + cutoff, crow + cutoff), 20, 1, -1)
-            code = f"# Notch Pass Filter\ncv2.circle(mask, (ccol - {cutoff}, crow - {cutoff}), 20, 1, -1)\ncv2.circle(mask, (ccol + {cutoff}, crow + {cutoff}), 20, 1, -1)"
-            
-        elif filter_type == "notch reject":
-            mask = np.ones((rows, cols), np.uint8)
-            cv2.circle(mask, (ccol - cutoff, crow - cutoff), 20, 0, -1)
-            cv2.circle(mask, (ccol + cutoff, crow + cutoff), 20, 0, -1)
-            code = f"# Notch Reject Filter\nmask = np.ones((rows, cols), np.uint8)\ncv2.circle(mask, (ccol - {cutoff}, crow - {cutoff}), 20, 0, -1)\ncv2.circle(mask, (ccol + {cutoff}, crow + {cutoff}), 20, 0, -1)"
-            
-        elif filter_type == "gaussian":
-            x = np.linspace(-cols//2, cols//2, cols)
-            y = np.linspace(-rows//2, rows//2, rows)
-            X, Y = np.meshgrid(x, y)
-            mask = np.exp(-(X**2 + Y**2) / (2 * cutoff**2))
-            code = f"# Gaussian Filter\nx = np.linspace(-cols//2, cols//2, cols)\ny = np.linspace(-rows//2, rows//2, rows)\nX, Y = np.meshgrid(x, y)\nmask = np.exp(-(X**2 + Y**2) / (2 * {cutoff}**2))"
-        else:
-            code = "# Unknown filter type"
-        
-        # Apply filter
-        fshift = fshift * mask
-        
-        # Inverse FFT
-        f_ishift = np.fft.ifftshift(fshift)
-        img_back = np.fft.ifft2(f_ishift)
-        img_back = np.abs(img_back)
-        
-        # Normalize
-        img_back = np.uint8(255 * img_back / np.max(img_back))
-        
-        # Convert back to BGR
-        self.working_bgr = cv2.cvtColor(img_back, cv2.COLOR_GRAY2BGR)
-        self.current_freq_code = code
-        self.update_display()
-        self.update_fourier()
-        self.status_label.setText(f"🎛️ Applied {filter_type.title()} filter")
+        color = self.filter_color
+
+        def done():
+            self.current_freq_code = image_ops.frequency_filter_code(filter_type, cutoff, color)
+            mode = " (color)" if color else ""
+            self.status_label.setText(f"🎛️ Applied {filter_type.title()} filter{mode}")
+
+        step = ("filter_color" if color else "filter", (filter_type, cutoff))
+        self.start_operation(f"{filter_type.title()} filtering", step, done, fn=cached_frequency_filter,
+                             args=(filter_type, cutoff, color, self.spectrum_cache, self.image_version))
+
+    def toggle_filter_color(self):
+        self.filter_color = self.btn_filter_color.isChecked()
+        mode = "per-channel color" if self.filter_color else "grayscale"
+        self.status_label.setText(f"🎨 Frequency filters: {mode}")
 
     # ═══════════════════════════════════════════════════════
     # PANEL TOGGLES
     # ═══════════════════════════════════════════════════════
+    def show_panel(self, name, visible):
+        # Tool panels are built the first time they are expanded.
+        panel = getattr(self, name)
+        if panel is None:
+            if not visible:
+                return
+            layout, build = self.lazy_panels[name]
+            panel = build()
+            layout.addWidget(panel)
+            setattr(self, name, panel)
+        panel.setVisible(visible)
+
     def toggle_visualization_panel(self):
-        self.visualization_panel.setVisible(self.btn_visualization.isChecked())
+        self.show_panel("visualization_panel", self.btn_visualization.isChecked())
 
     def toggle_ops_panel(self):
-        self.ops_panel.setVisible(self.btn_ops.isChecked())
+        self.show_panel("ops_panel", self.btn_ops.isChecked())
 
     def toggle_denoise_panel(self):
-        self.denoise_panel.setVisible(self.btn_denoise.isChecked())
+        self.show_panel("denoise_panel", self.btn_denoise.isChecked())
 
     def toggle_noise_panel(self):
-        self.noise_panel.setVisible(self.btn_noise.isChecked())
+        self.show_panel("noise_panel", self.btn_noise.isChecked())
 
     def toggle_filters_panel(self):
-        self.filters_panel.setVisible(self.btn_filters.isChecked())
+        self.show_panel("filters_panel", self.btn_filters.isChecked())
 
     def toggle_code_panel(self):
-        self.code_panel.setVisible(self.btn_code.isChecked())
+        self.show_panel("code_panel", self.btn_code.isChecked())
+
+    # ═══════════════════════════════════════════════════════
+    # LAZY TOOL PANELS
+    # ═══════════════════════════════════════════════════════
+    def build_visualization_panel(self):
+        panel = QFrame()
+        panel.setObjectName("LightSubPanel")
+        vis_sub_layout = QVBoxLayout(panel)
+        vis_sub_layout.setSpacing(2)
+        vis_sub_layout.setContentsMargins(24, 8, 8, 8)
+
+        self.btn_combined  = self.create_sub_button("🎨 Combined (RGB)",     lambda: self.set_vis_mode("combined"))
+        self.btn_grayscale = self.create_sub_button("⬜ Grayscale",          lambda: self.set_vis_mode("grayscale"))
+        self.btn_red       = self.create_sub_button("🔴 Red Channel",        lambda: self.set_vis_mode("red"))
+        self.btn_green     = self.create_sub_button("🟢 Green Channel",      lambda: self.set_vis_mode("green"))
+        self.btn_blue      = self.create_sub_button("🔵 Blue Channel",       lambda: self.set_vis_mode("blue"))
+        self.btn_hsi       = self.create_sub_button("🌈 HSI Color Space",    lambda: self.set_vis_mode("hsi"))
+
+        for b in [self.btn_combined, self.btn_grayscale, self.btn_red,
+                  self.btn_green, self.btn_blue, self.btn_hsi]:
+            vis_sub_layout.addWidget(b)
+
+        return panel
+
+    def build_ops_panel(self):
+        panel = QFrame()
+        panel.setObjectName("LightSubPanel")
+        ops_sub_layout = QVBoxLayout(panel)
+        ops_sub_layout.setSpacing(2)
+        ops_sub_layout.setContentsMargins(24, 8, 8, 8)
+
+        self.btn_invert   = self.create_sub_button("🔁 Invert",        self.invert_image)
+        self.btn_flip_h   = self.create_sub_button("↔️ Flip H",        self.flip_horizontal)
+        self.btn_flip_v   = self.create_sub_button("↕️ Flip V",        self.flip_vertical)
+        self.btn_rotate90 = self.create_sub_button("🔃 Rotate 90°",    self.rotate_90)
+        self.btn_equalize = self.create_sub_button("📊 Equalize",       self.equalize_histogram)
+
+        for b in [self.btn_invert, self.btn_flip_h, self.btn_flip_v,
+                  self.btn_rotate90, self.btn_equalize]:
+            ops_sub_layout.addWidget(b)
+
+        return panel
+
+    def build_denoise_panel(self):
+        panel = QFrame()
+        panel.setObjectName("LightSubPanel")
+        denoise_sub_layout = QVBoxLayout(panel)
+        denoise_sub_layout.setSpacing(2)
+        denoise_sub_layout.setContentsMargins(24, 8, 8, 8)
+
+        self.btn_bilateral  = self.create_sub_button("🏔️ Bilateral",       lambda: self.show_denoise_dialog("Bilateral"))
+        self.btn_mean       = self.create_sub_button("📐 Mean",            lambda: self.show_denoise_dialog("Mean"))
+        self.btn_median     = self.create_sub_button("📊 Median",          lambda: self.show_denoise_dialog("Median"))
+        self.btn_nlmeans    = self.create_sub_button("🧠 Non-Local Means", lambda: self.show_denoise_dialog("Non-Local Means"))
+
+        self.btn_compare    = self.create_sub_button("🔬 Compare All",     self.show_compare_dialog)
+
+        for b in [self.btn_bilateral, self.btn_mean, self.btn_median, self.btn_nlmeans,
+                  self.btn_compare]:
+            denoise_sub_layout.addWidget(b)
+
+        return panel
+
+    def build_noise_panel(self):
+        panel = QFrame()
+        panel.setObjectName("LightSubPanel")
+        noise_sub_layout = QVBoxLayout(panel)
+        noise_sub_layout.setSpacing(2)
+        noise_sub_layout.setContentsMargins(24, 8, 8, 8)
+
+        self.btn_pepper_salt   = self.create_sub_button("🧂 Pepper & Salt",  lambda: self.show_noise_dialog("Pepper & Salt"))
+        self.btn_gaussian_noise= self.create_sub_button("📈 Gaussian Noise", lambda: self.show_noise_dialog("Gaussian"))
+        self.btn_speckle_noise = self.create_sub_button("✨ Speckle Noise",  lambda: self.show_noise_dialog("Speckle"))
+        self.btn_poisson_noise = self.create_sub_button("⚡ Poisson Noise",  lambda: self.show_noise_dialog("Poisson"))
+
+        noise_sub_layout.addWidget(self.btn_pepper_salt)
+        noise_sub_layout.addWidget(self.btn_gaussian_noise)
+        noise_sub_layout.addWidget(self.btn_speckle_noise)
+        noise_sub_layout.addWidget(self.btn_poisson_noise)
+
+        return panel
+
+    def build_filters_panel(self):
+        panel = QFrame()
+        panel.setObjectName("LightSubPanel")
+        filters_sub_layout = QVBoxLayout(panel)
+        filters_sub_layout.setSpacing(2)
+        filters_sub_layout.setContentsMargins(20, 6, 6, 6)
+
+        self.btn_lowpass     = self.create_sub_button("🔽 Low Pass filter",    lambda: self.show_filter_dialog("Low Pass"))
+        self.btn_highpass    = self.create_sub_button("🔼 High Pass filter",   lambda: self.show_filter_dialog("High Pass"))
+        self.btn_notchpass   = self.create_sub_button("🎯 Notch Pass filter",  lambda: self.show_filter_dialog("Notch Pass"))
+        self.btn_notchreject = self.create_sub_button("🚫 Notch Reject filter",lambda: self.show_filter_dialog("Notch Reject"))
+        self.btn_gaussian    = self.create_sub_button("⛰️ Gaussian filter",    lambda: self.show_filter_dialog("Gaussian"))
+
+        filters_sub_layout.addWidget(self.btn_lowpass)
+        filters_sub_layout.addWidget(self.btn_highpass)
+        filters_sub_layout.addWidget(self.btn_notchpass)
+        filters_sub_layout.addWidget(self.btn_notchreject)
+        filters_sub_layout.addWidget(self.btn_gaussian)
+
+        self.btn_filter_color = self.create_sub_button("🎨 Preserve Color", self.toggle_filter_color)
+        self.btn_filter_color.setCheckable(True)
+        filters_sub_layout.addWidget(self.btn_filter_color)
+
+        return panel
+
+    def build_code_panel(self):
+        panel = QFrame()
+        panel.setObjectName("LightSubPanel")
+        code_sub_layout = QVBoxLayout(panel)
+        code_sub_layout.setSpacing(4)
+        code_sub_layout.setContentsMargins(24, 8, 8, 8)
+
+        self.btn_show_noise_code   = self.create_sub_button("🎚️ Noise Code",   self.show_current_noise_code)
+        self.btn_show_denoise_code = self.create_sub_button("🧹 Denoise Code", self.show_current_denoise_code)
+        self.btn_show_filter_code  = self.create_sub_button("🎛️ Filter Code",  self.show_current_filter_code)
+        self.btn_show_stats_code   = self.create_sub_button("📊 HSI Code",     self.show_hsi_code)
+
+        code_sub_layout.addWidget(self.btn_show_noise_code)
+        code_sub_layout.addWidget(self.btn_show_denoise_code)
+        code_sub_layout.addWidget(self.btn_show_filter_code)
+        code_sub_layout.addWidget(self.btn_show_stats_code)
+
+        return panel
 
     # ═══════════════════════════════════════════════════════
     # CODE VIEWER  show-code functions
@@ -1346,31 +2601,234 @@ class ImageAnalyzer(QMainWindow):
     # DIALOG launchers
     # ═══════════════════════════════════════════════════════
     def show_noise_dialog(self, noise_type):
-        dialog = FilterParamsDialog(f"{noise_type} Noise", self)
-        if dialog.exec() == QDialog.DialogCode.Accepted:
-            self.apply_noise(
-                noise_type.lower().replace(" & ", "_&_").replace(" ", "_"),
-                dialog.get_params()["strength"].value()
-            )
+        name = noise_type.lower().replace(" & ", "_&_").replace(" ", "_")
+        seed = image_ops.new_seed()   # one pattern while dragging, and the one applied
+        self.open_params_panel(f"{noise_type} Noise",
+                               lambda v: ("noise", (name, v, seed)),
+                               lambda v: self.apply_noise(name, v, seed))
 
     def show_denoise_dialog(self, method_name):
-        dialog = FilterParamsDialog(f"{method_name} Denoise", self)
-        if dialog.exec() == QDialog.DialogCode.Accepted:
-            self.apply_denoise(method_name.lower(), dialog.get_params()["strength"].value())
+        method = method_name.lower()
+        self.open_params_panel(f"{method_name} Denoise",
+                               lambda v: ("denoise", (method, v)),
+                               lambda v: self.apply_denoise(method, v))
+        if self.preview_panel is not None:
+            self.preview_panel.autoTuneRequested.connect(
+                lambda metric, raw: self.run_auto_tune(method, metric, raw))
 
     def show_filter_dialog(self, filter_name):
-        dialog = FilterParamsDialog(filter_name, self)
-        if dialog.exec() == QDialog.DialogCode.Accepted:
-            params = dialog.get_params()
-            cutoff = params["cutoff"].value() if "cutoff" in params else 30
-            self.apply_frequency_filter(filter_name.lower(), cutoff)
+        filter_type = filter_name.lower()
+        self.open_params_panel(filter_name,
+                               lambda v: ("filter_color" if self.filter_color else "filter",
+                                          (filter_type, v)),
+                               lambda v: self.apply_frequency_filter(filter_type, v))
+
+    # ═══════════════════════════════════════════════════════
+    # LIVE PREVIEW
+    # ═══════════════════════════════════════════════════════
+    def open_params_panel(self, title, make_step, on_apply, initial=None, base=None, tail=()):
+        # base/tail preview an edited chain step: the step is applied to base
+        # and followed by the tail steps.
+        if self.working_bgr is None:
+            return
+        self.close_params_panel()
+
+        panel = FilterParamsDialog(title, self)
+        if initial is not None:
+            panel.set_value(initial)
+        if panel.tune_box is not None:
+            panel.tune_box.setVisible(base is None)   # not when editing a chain step
+        panel.paramsChanged.connect(self.preview_timer.start)   # debounce
+        panel.accepted.connect(self.on_panel_accepted)
+        panel.rejected.connect(self.on_panel_rejected)
+        self.preview_panel = panel
+        self.preview_step = make_step
+        self.preview_apply = on_apply
+        self.preview_base = base
+        self.preview_tail = list(tail)
+        panel.show()
+        self.preview_timer.start()
+
+    def close_params_panel(self):
+        panel = self.preview_panel
+        self.preview_panel = None
+        self.preview_timer.stop()
+        self.cancel_auto_tune()
+        self.preview_job_id += 1          # drop any preview still in flight
+        if self.preview_worker is not None:
+            self.preview_worker.cancelled = True
+            self.preview_worker = None
+        self.preview_pending = False
+        self.preview_source = None
+        self.preview_source_version = None
+        self.preview_base = None
+        self.preview_tail = ()
+        self.preview_spectra.clear()
+        if panel is not None:
+            panel.blockSignals(True)
+            panel.close()
+            panel.deleteLater()
+
+    def on_panel_accepted(self):
+        value = self.preview_panel.value()
+        apply = self.preview_apply
+        self.close_params_panel()
+        # the last preview stays on screen until the full result replaces it
+        apply(value)
+
+    def on_panel_rejected(self):
+        self.close_params_panel()
+        self.update_display()
+
+    def request_preview(self):
+        if self.preview_panel is None or self.working_bgr is None:
+            return
+        if self.preview_worker is not None:
+            # a newer value arrived: drop the running preview, redo on landing
+            self.preview_pending = True
+            return
+
+        image_profile.begin("Preview")
+        if self.preview_source_version != self.image_version:
+            # preview at (at most) viewport resolution of the current image
+            base = self.working_bgr if self.preview_base is None else self.preview_base
+            vp = self.graphics_view.viewport().size()
+            self.preview_scale = image_ops.proxy_scale(base.shape,
+                                                       max(vp.width(), 1280), max(vp.height(), 800))
+            self.preview_source = image_ops.make_proxy(base, self.preview_scale)
+            self.preview_source_version = self.image_version
+            self.preview_spectra.clear()
+
+        name, args = self.preview_step(self.preview_panel.value())
+        if name in ("filter", "filter_color") and self.preview_base is None:
+            # the cutoff is the only thing changing: reuse the forward FFT
+            cache = self.spectrum_cache if self.preview_scale == 1.0 else self.preview_spectra
+            fn, fargs = cached_frequency_filter, (*args, name == "filter_color", cache, self.image_version)
+        else:
+            fn, fargs = image_ops.apply_chain, ([(name, args), *self.preview_tail],
+                                                self.proxy_scale * self.preview_scale)
+
+        self.preview_job_id += 1
+        worker = OperationWorker(self.preview_job_id, fn, self.preview_source, *fargs)
+        worker.signals.finished.connect(self.on_preview_ready)
+        worker.signals.failed.connect(self.on_preview_failed)
+        self.preview_worker = worker
+        self.thread_pool.start(worker)
+
+    def on_preview_ready(self, job_id, result):
+        if job_id != self.preview_job_id:
+            return
+        self.preview_worker = None
+        if self.preview_pending:
+            self.preview_pending = False
+            self.request_preview()        # stale value: skip straight to the newest
+            return
+        self.show_visual(result, self.preview_scale)
+        self.status_label.setText("👁️ Preview - Apply to keep it")
+
+    def on_preview_failed(self, job_id, message):
+        if job_id != self.preview_job_id:
+            return
+        self.preview_worker = None
+        self.status_label.setText(f"❌ Preview failed: {message}")
+
+    # ═══════════════════════════════════════════════════════
+    # PROFILER
+    # ═══════════════════════════════════════════════════════
+    def toggle_profiling(self):
+        on = self.btn_profile.isChecked()
+        image_profile.PROFILER.enabled = on
+        self.profile_dock.setVisible(on)
+        if on:
+            self.profile_shown = -1
+            self.update_profile_panel()
+            self.profile_timer.start()
+            self.status_label.setText("⏱️ Profiling on - stage timings in the Profiler panel")
+        else:
+            self.profile_timer.stop()
+            self.status_label.setText("⏱️ Profiling off")
+
+    def update_profile_panel(self):
+        profiler = image_profile.PROFILER
+        if profiler.count == self.profile_shown:
+            return
+        self.profile_shown = profiler.count
+        label, wall, stages = profiler.breakdown()
+        self.profile_list.clear()
+        if not stages:
+            self.profile_label.setText("Run an operation to see where its time goes.")
+            return
+        # nested and parallel stages overlap, so shares can exceed 100%
+        self.profile_label.setText(f"{label}  |  {wall * 1000:.1f} ms  |  {profiler.count} spans in trace")
+        for name, total, calls in stages:
+            share = total / wall if wall else 0.0
+            bar = "█" * round(min(share, 1.0) * 10)
+            count = f" ×{calls}" if calls > 1 else ""
+            self.profile_list.addItem(f"{total * 1000:9.1f} ms {share:5.0%} {bar:<10} {name}{count}")
+
+    def export_profile_trace(self):
+        path, _ = QFileDialog.getSaveFileName(
+            self, "Export Trace", "ips-trace.json", "Chrome Trace (*.json);;All Files (*)"
+        )
+        if not path:
+            return
+        try:
+            image_profile.PROFILER.export(path)
+        except OSError as exc:
+            self.status_label.setText(f"❌ Failed to export trace: {exc}")
+            return
+        self.status_label.setText(f"💾 Trace exported: {path.split('/')[-1]}  |  "
+                                  f"open in chrome://tracing or ui.perfetto.dev")
+
+    def clear_profile(self):
+        image_profile.PROFILER.clear()
+        self.profile_shown = -1
+        self.update_profile_panel()
 
 
 # ═══════════════════════════════════════════════════════
 # MAIN ENTRY POINT
 # ═══════════════════════════════════════════════════════
+# Cold-start budget checked by `python image_analyzer.py --startup-time`
+# (exit code 1 when exceeded); IPS_STARTUP_TARGET overrides it.
+STARTUP_TARGET = 0.5
+
+
+def report_startup(app, imported, built):
+    # Runs from the first event-loop iteration, after the window is shown.
+    app.processEvents()
+    shown = time.perf_counter()
+    target = float(os.environ.get("IPS_STARTUP_TARGET", STARTUP_TARGET))
+    total = shown - _STARTED
+    ok = total <= target
+    print(f"{'✅' if ok else '❌'} Startup {total:.3f}s (target {target:.2f}s)  |  "
+          f"imports {imported - _STARTED:.3f}s  window {built - imported:.3f}s  "
+          f"first paint {shown - built:.3f}s")
+    app.exit(0 if ok else 1)
+
+
 if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == "batch":
+        from image_batch import main
+        sys.exit(main(sys.argv[2:]))
+    if len(sys.argv) > 1 and sys.argv[1] == "video":
+        from image_video import main
+        sys.exit(main(sys.argv[2:]))
+    if len(sys.argv) > 1 and sys.argv[1] == "bench":
+        from image_bench import main
+        sys.exit(main(sys.argv[2:]))
+    if len(sys.argv) > 1 and sys.argv[1] == "tune":
+        from image_tune import main
+        sys.exit(main(sys.argv[2:]))
+
+    measure = "--startup-time" in sys.argv
+    imported = time.perf_counter()
     app = QApplication(sys.argv)
     window = ImageAnalyzer()
+    built = time.perf_counter()
     window.show()
+    if measure:
+        QTimer.singleShot(0, lambda: report_startup(app, imported, built))
+    else:
+        QTimer.singleShot(0, window.start_warm_up)
     sys.exit(app.exec_())
@@ -0,0 +1,149 @@
+import argparse
+import glob
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import cv2
+
+import fft_backend
+import image_ops
+
+# ─────────────────────────────────────────────
+# Headless batch runner.
+#   python image_analyzer.py batch "scans/*.tif" -o out --op "denoise:median:0.4"
+# ─────────────────────────────────────────────
+
+IMAGE_EXTENSIONS = (".png", ".jpg", ".jpeg", ".bmp", ".tiff", ".tif", ".webp")
+
+
+def collect_inputs(source):
+    if os.path.isdir(source):
+        paths = [os.path.join(source, name) for name in os.listdir(source)]
+    else:
+        paths = glob.glob(source, recursive=True)
+    return sorted(p for p in paths
+                  if os.path.isfile(p) and p.lower().endswith(IMAGE_EXTENSIONS))
+
+
+def _init_worker(fft_name):
+    # One thread per process: the pool already provides the parallelism.
+    cv2.setNumThreads(1)
+    image_ops.TILE_WORKERS = 1
+    fft_backend.set_backend(fft_name, workers=1)
+
+
+def process_file(path, chain, output_dir, suffix, metrics=False):
+    t0 = time.perf_counter()
+    img = cv2.imread(path)
+    if img is None:
+        raise IOError(f"Failed to load image: {path}")
+    t1 = time.perf_counter()
+
+    result = image_ops.apply_chain(img, chain)
+    t2 = time.perf_counter()
+
+    stem, ext = os.path.splitext(os.path.basename(path))
+    out_path = os.path.join(output_dir, f"{stem}{suffix}{ext}")
+    if not cv2.imwrite(out_path, result):
+        raise IOError(f"Failed to write image: {out_path}")
+    t3 = time.perf_counter()
+
+    res = {
+        "path": path,
+        "output": out_path,
+        "width": img.shape[1],
+        "height": img.shape[0],
+        "read": t1 - t0,
+        "process": t2 - t1,
+        "write": t3 - t2,
+        "total": t3 - t0,
+    }
+    if metrics and result.shape == img.shape:
+        res["metrics"] = image_ops.image_quality(img, result)
+    return res
+
+
+def run_batch(paths, chain, output_dir, workers=None, suffix="", fft_name="numpy", metrics=False):
+    # Yields one result dict per file as it completes; failures carry "error".
+    os.makedirs(output_dir, exist_ok=True)
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(fft_name,)) as pool:
+        futures = {pool.submit(process_file, p, chain, output_dir, suffix, metrics): p for p in paths}
+        for future in as_completed(futures):
+            try:
+                yield future.result()
+            except Exception as exc:
+                yield {"path": futures[future], "error": str(exc)}
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        prog="image_analyzer batch",
+        description="Apply an IPS operation chain to many images without a display.",
+    )
+    parser.add_argument("source", help="input directory or glob pattern (quote it)")
+    parser.add_argument("-o", "--output", required=True, help="output directory")
+    parser.add_argument(
+        "--op", dest="ops", action="append", default=[], metavar="STEP",
+        help="operation to apply, repeatable and applied in order, e.g. "
+             "invert, rotate90, 'noise:gaussian:0.3', 'denoise:median:0.5', "
+             "'filter:low pass:30'. Available: " + ", ".join(image_ops.OPERATIONS),
+    )
+    parser.add_argument("-j", "--workers", type=int, default=os.cpu_count(),
+                        help="number of worker processes (default: CPU count)")
+    parser.add_argument("--suffix", default="", help="appended to each output file name")
+    parser.add_argument("--metrics", action="store_true",
+                        help="report MSE, PSNR and SSIM of each result against its input "
+                             "(skipped when the chain changes the image size)")
+    parser.add_argument("--fft-backend", default="auto",
+                        choices=["auto"] + list(fft_backend.available_backends()),
+                        help="FFT implementation for frequency filters (default: "
+                             "fastest in a startup micro-benchmark)")
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+
+    try:
+        chain = [image_ops.parse_step(spec) for spec in args.ops]
+    except ValueError as exc:
+        print(f"❌ {exc}", file=sys.stderr)
+        return 2
+
+    paths = collect_inputs(args.source)
+    if not paths:
+        print(f"❌ No images found for: {args.source}", file=sys.stderr)
+        return 1
+
+    fft_name = fft_backend.configure(args.fft_backend, workers=1)
+    print(f"Processing {len(paths)} image(s) with {args.workers} worker(s)  |  FFT: {fft_name}")
+    start = time.perf_counter()
+    done, failed, megapixels = 0, 0, 0.0
+
+    for res in run_batch(paths, chain, args.output, args.workers, args.suffix, fft_name,
+                         args.metrics):
+        name = os.path.basename(res["path"])
+        if "error" in res:
+            failed += 1
+            print(f"❌ {name}  |  {res['error']}")
+            continue
+        done += 1
+        megapixels += res["width"] * res["height"] / 1e6
+        print(f"✅ {name}  |  {res['width']}×{res['height']}  |  "
+              f"read {res['read']:.3f}s  process {res['process']:.3f}s  "
+              f"write {res['write']:.3f}s  total {res['total']:.3f}s")
+        if "metrics" in res:
+            m = res["metrics"]
+            print(f"   📏 MSE {m['mse']:.2f}  |  PSNR {m['psnr']:.2f} dB  |  SSIM {m['ssim']:.4f}")
+
+    elapsed = time.perf_counter() - start
+    print(f"Done: {done} ok, {failed} failed in {elapsed:.2f}s  |  "
+          f"{done / elapsed:.2f} files/s  |  {megapixels / elapsed:.2f} MP/s")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,266 @@
+import argparse
+import json
+import os
+import platform
+import re
+import statistics
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+import cv2
+
+import fft_backend
+import image_ops
+
+# ─────────────────────────────────────────────
+# Headless benchmark suite.
+#   python image_analyzer.py bench -o bench.json --baseline baseline.json
+# Every operation runs on synthetic images of each size.  Wall time is the
+# best of --repeat runs, peak memory comes from one extra run under
+# tracemalloc (NumPy and OpenCV output buffers; not OpenCV's internal
+# scratch), and throughput is megapixels per second of the best run.
+# ─────────────────────────────────────────────
+
+SIZES = (0.3, 2.0, 12.0, 100.0)          # megapixels, 4:3
+DEFAULT_REPEAT = 3
+MAX_CASE_SECONDS = 10.0                  # slower cases are not repeated
+DEFAULT_THRESHOLD = 0.20                 # +20% time is a regression
+DEFAULT_MEMORY_THRESHOLD = 0.20
+MIN_TIME_DELTA = 0.005                   # ignore changes below timer noise
+
+
+def synthetic_image(megapixels, seed=0):
+    # Deterministic BGR test image: smooth structure (an upscaled random
+    # field) plus fine-grained noise, built in bands to stay at uint8.
+    cols = max(8, round((megapixels * 1e6 * 4 / 3) ** 0.5))
+    rows = max(6, round(cols * 3 / 4))
+    rng = np.random.default_rng(seed)
+    field = rng.integers(0, 256, (48, 64, 3), dtype=np.uint8)
+    img = cv2.resize(field, (cols, rows), interpolation=cv2.INTER_CUBIC)
+    for y in range(0, rows, 1024):
+        band = img[y:y + 1024]
+        cv2.add(band, rng.integers(0, 32, band.shape, dtype=np.uint8), dst=band)
+    return img
+
+
+# ═══════════════════════════════════════════════════════
+# CASES
+# ═══════════════════════════════════════════════════════
+# (group, name, setup, run): setup(img) prepares the input outside the
+# timed region, run(prepared) is the measured call.
+def _same(img):
+    return img
+
+
+def build_cases():
+    cases = []
+    for name in ("invert", "flip_h", "flip_v", "rotate90", "equalize"):
+        fn = image_ops.OPERATIONS[name][0]
+        cases.append(("point", name, _same, fn))
+
+    for noise_type in image_ops.NOISE_TYPES:
+        cases.append(("noise", f"noise:{noise_type}", _same,
+                      lambda img, t=noise_type: image_ops.add_noise(img, t, 0.3, seed=0)))
+
+    for method in image_ops.DENOISE_METHODS:
+        cases.append(("denoise", f"denoise:{method}", _same,
+                      lambda img, m=method: image_ops.denoise(img, m, 0.5)))
+
+    for op in ("filter", "filter_color"):
+        fn = image_ops.OPERATIONS[op][0]
+        for filter_type in image_ops.FREQUENCY_FILTERS:
+            cases.append(("frequency", f"{op}:{filter_type}", _same,
+                          lambda img, f=fn, t=filter_type: f(img, t, 30)))
+
+    cases += [
+        ("hsi", "hsi:planes", _same, image_ops.hsi_planes),
+        ("hsi", "hsi:visual", image_ops.hsi_planes, image_ops.hsi_visual),
+        ("hsi", "hsi:to_bgr", image_ops.hsi_planes, image_ops.hsi_to_bgr),
+        ("histogram", "histogram", _same, image_ops.channel_histograms),
+        ("histogram", "histogram:sampled", _same,
+         lambda img: image_ops.channel_histograms(img, 4_000_000)),
+        ("fourier", "fourier:spectrum", _same,
+         lambda img: image_ops.fourier_spectrum(img).precompute_views()),
+        ("fourier", "fourier:radial", lambda img: image_ops.fourier_spectrum(img).magnitude_log,
+         lambda data: image_ops.radial_profile(data, 1024)),
+        ("metrics", "metrics:quality", lambda img: (img, cv2.blur(img, (5, 5))),
+         lambda pair: image_ops.image_quality(*pair)),
+    ]
+    return cases
+
+
+# ═══════════════════════════════════════════════════════
+# MEASUREMENT
+# ═══════════════════════════════════════════════════════
+def measure(run, arg, repeat=DEFAULT_REPEAT, max_seconds=MAX_CASE_SECONDS, memory=True):
+    times = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        run(arg)
+        times.append(time.perf_counter() - t0)
+        if times[-1] > max_seconds:
+            break
+
+    peak = None
+    if memory:
+        tracemalloc.start()
+        try:
+            run(arg)
+            peak = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+    return times, peak
+
+
+def run_suite(sizes=SIZES, repeat=DEFAULT_REPEAT, only=None, max_seconds=MAX_CASE_SECONDS,
+              memory=True, progress=None):
+    # Yields one result dict per (case, size); failures carry "error".
+    pattern = re.compile(only) if only else None
+    cases = [c for c in build_cases() if pattern is None or pattern.search(c[1])]
+    for megapixels in sizes:
+        img = synthetic_image(megapixels)
+        pixels = img.shape[0] * img.shape[1]
+        for group, name, setup, run in cases:
+            res = {"name": name, "group": group, "megapixels": megapixels,
+                   "shape": list(img.shape[:2])}
+            try:
+                times, peak = measure(run, setup(img), repeat, max_seconds, memory)
+            except (MemoryError, cv2.error) as exc:
+                res["error"] = str(exc) or type(exc).__name__
+            else:
+                best = min(times)
+                res.update({
+                    "runs": len(times),
+                    "first": times[0],
+                    "best": best,
+                    "median": statistics.median(times),
+                    "peak_mb": None if peak is None else peak / 2**20,
+                    "mp_per_s": pixels / 1e6 / best if best else None,
+                })
+            if progress:
+                progress(res)
+            yield res
+        del img
+
+
+def environment(fft_name):
+    return {
+        "date": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "opencv": cv2.__version__,
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "cv2_threads": cv2.getNumThreads(),
+        "fft_backend": fft_name,
+    }
+
+
+# ═══════════════════════════════════════════════════════
+# BASELINE COMPARISON
+# ═══════════════════════════════════════════════════════
+def load_results(path):
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def compare(results, baseline, threshold=DEFAULT_THRESHOLD,
+            memory_threshold=DEFAULT_MEMORY_THRESHOLD, min_delta=MIN_TIME_DELTA):
+    # One row per case present in both runs: (result, baseline result,
+    # time ratio, list of regressions).  A slowdown counts only if it is
+    # above the relative threshold and above the absolute min_delta.
+    base = {(r["name"], r["megapixels"]): r for r in baseline["results"] if "error" not in r}
+    rows = []
+    for res in results:
+        old = base.get((res["name"], res["megapixels"]))
+        if old is None or "error" in res:
+            continue
+        ratio = res["best"] / old["best"] if old["best"] else float("inf")
+        problems = []
+        if ratio > 1 + threshold and res["best"] - old["best"] > min_delta:
+            problems.append(f"time +{(ratio - 1) * 100:.0f}%")
+        if res.get("peak_mb") and old.get("peak_mb"):
+            mem_ratio = res["peak_mb"] / old["peak_mb"]
+            if mem_ratio > 1 + memory_threshold:
+                problems.append(f"memory +{(mem_ratio - 1) * 100:.0f}%")
+        rows.append((res, old, ratio, problems))
+    return rows
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        prog="image_analyzer bench",
+        description="Benchmark every IPS operation on synthetic images without a display.",
+    )
+    parser.add_argument("-o", "--output", default="bench.json", help="results JSON file")
+    parser.add_argument("--sizes", default=",".join(f"{s:g}" for s in SIZES),
+                        help="comma-separated image sizes in megapixels (default: %(default)s)")
+    parser.add_argument("--repeat", type=int, default=DEFAULT_REPEAT,
+                        help="timed runs per case; the best is reported (default: %(default)s)")
+    parser.add_argument("--max-seconds", type=float, default=MAX_CASE_SECONDS,
+                        help="do not repeat cases slower than this (default: %(default)s)")
+    parser.add_argument("--only", metavar="REGEX",
+                        help="run only cases whose name matches, e.g. 'denoise|hsi'")
+    parser.add_argument("--no-memory", action="store_true",
+                        help="skip the extra traced run that measures peak memory")
+    parser.add_argument("--baseline", help="compare against this results JSON file")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="allowed relative slowdown (default: %(default)s)")
+    parser.add_argument("--memory-threshold", type=float, default=DEFAULT_MEMORY_THRESHOLD,
+                        help="allowed relative peak memory growth (default: %(default)s)")
+    parser.add_argument("--fft-backend", default="auto",
+                        choices=["auto"] + list(fft_backend.available_backends()),
+                        help="FFT implementation for frequency filters")
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+
+    try:
+        sizes = [float(s) for s in args.sizes.split(",") if s.strip()]
+        if args.only:
+            re.compile(args.only)
+    except (ValueError, re.error) as exc:
+        print(f"❌ {exc}", file=sys.stderr)
+        return 2
+    baseline = None
+    if args.baseline:
+        try:
+            baseline = load_results(args.baseline)
+        except (OSError, ValueError) as exc:
+            print(f"❌ Failed to read baseline: {exc}", file=sys.stderr)
+            return 2
+
+    fft_name = fft_backend.configure(args.fft_backend)
+    print(f"Benchmarking at {', '.join(f'{s:g}' for s in sizes)} MP  |  FFT: {fft_name}")
+
+    def progress(res):
+        label = f"{res['name']:<28} {res['megapixels']:>6g} MP"
+        if "error" in res:
+            print(f"❌ {label}  |  {res['error']}")
+            return
+        mem = "" if res["peak_mb"] is None else f"  |  peak {res['peak_mb']:.0f} MB"
+        print(f"✅ {label}  |  best {res['best']:.4f}s  |  {res['mp_per_s']:.1f} MP/s{mem}")
+
+    results = list(run_suite(sizes, args.repeat, args.only, args.max_seconds,
+                             not args.no_memory, progress))
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump({"environment": environment(fft_name), "results": results}, f, indent=2)
+    print(f"Results written to {args.output}")
+
+    if baseline is None:
+        return 0
+    rows = compare(results, baseline, args.threshold, args.memory_threshold)
+    regressions = [row for row in rows if row[3]]
+    for res, old, ratio, problems in regressions:
+        print(f"⚠️ {res['name']} @ {res['megapixels']:g} MP  |  "
+              f"{old['best']:.4f}s -> {res['best']:.4f}s  |  {', '.join(problems)}")
+    print(f"Compared {len(rows)} case(s) with {args.baseline}: {len(regressions)} regression(s)")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,142 @@
+import multiprocessing
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+import cv2
+
+import image_ops
+
+# ─────────────────────────────────────────────
+# Side-by-side denoise comparison.
+# The source image is copied into shared memory once; each (method,
+# strength) pair runs in a worker process that attaches to it by name, so
+# only the results travel back through pickling.
+# ─────────────────────────────────────────────
+
+def _init_worker():
+    # One thread per process: the pool already provides the parallelism.
+    cv2.setNumThreads(1)
+    image_ops.TILE_WORKERS = 1
+
+
+def share(bgr):
+    # Copies bgr into a new shared memory block; the caller unlinks it.
+    shm = shared_memory.SharedMemory(create=True, size=max(bgr.nbytes, 1))
+    np.ndarray(bgr.shape, dtype=np.uint8, buffer=shm.buf)[...] = bgr
+    return shm
+
+
+def run_shared(fn, names, shape, *args):
+    # Worker side of share(): calls fn(*arrays, *args) with the named blocks
+    # mapped as arrays, and unmaps them before returning.  Nothing is kept
+    # mapped between jobs.  fn must not return a view of its inputs.
+    blocks = []
+    try:
+        for name in names:
+            blocks.append(shared_memory.SharedMemory(name=name))
+        arrays = [np.ndarray(shape, dtype=np.uint8, buffer=b.buf) for b in blocks]
+        try:
+            return fn(*arrays, *args)
+        except Exception as exc:
+            # the traceback's frames would keep views of the blocks alive
+            raise exc.with_traceback(None)
+        finally:
+            del arrays
+    finally:
+        for block in blocks:
+            block.close()
+
+
+def _timed_denoise(bgr, method, strength, scale):
+    t0 = time.perf_counter()
+    result = image_ops.denoise(bgr, method, strength, scale)
+    return result, time.perf_counter() - t0
+
+
+def _denoise_shared(name, shape, method, strength, scale):
+    return run_shared(_timed_denoise, [name], shape, method, strength, scale)
+
+
+def make_pool(workers=None):
+    # spawn: forking a process that already runs Qt threads is unsafe.
+    return ProcessPoolExecutor(workers, mp_context=multiprocessing.get_context("spawn"),
+                               initializer=_init_worker)
+
+
+class DenoiseComparison:
+    # Submits every method × strength to `pool` at once.  Results are
+    # reported through add_done_callback() as they complete, on a pool
+    # thread; the shared memory is released after the last one.
+    def __init__(self, pool, bgr, methods=image_ops.DENOISE_METHODS, strengths=(0.5,), scale=1.0):
+        self.shm = share(bgr)
+        self.futures = {}
+        self.released = False
+        self._lock = threading.Lock()
+        try:
+            for strength in strengths:
+                for method in methods:
+                    future = pool.submit(_denoise_shared, self.shm.name, bgr.shape, method, strength, scale)
+                    self.futures[future] = (method, strength)
+        except Exception:
+            self.cancel()
+            self.release()
+            raise
+        self.pending = len(self.futures)
+        # results come back pickled, so the block can go as soon as every
+        # job has finished, whether or not anyone asked for the results
+        for future in self.futures:
+            future.add_done_callback(self._finished)
+
+    def add_done_callback(self, fn):
+        # fn(method, strength, result, seconds, error); cancelled jobs are
+        # not reported.
+        for future, (method, strength) in self.futures.items():
+            future.add_done_callback(lambda f, m=method, s=strength: self._done(fn, f, m, s))
+
+    def _done(self, fn, future, method, strength):
+        if future.cancelled():
+            return
+        try:
+            result, seconds = future.result()
+        except Exception as exc:
+            fn(method, strength, None, 0.0, str(exc))
+        else:
+            fn(method, strength, result, seconds, None)
+
+    def _finished(self, future):
+        with self._lock:
+            self.pending -= 1
+            last = self.pending == 0
+        if last:
+            self.release()
+
+    def cancel(self):
+        # Jobs that already started run to completion (cv2 cannot be
+        # interrupted); their results are simply not wanted.
+        for future in self.futures:
+            future.cancel()
+
+    def release(self):
+        with self._lock:
+            if self.released:
+                return
+            self.released = True
+        self.shm.close()
+        self.shm.unlink()
+
+
+def compare_denoise(bgr, methods=image_ops.DENOISE_METHODS, strengths=(0.5,), scale=1.0, workers=None):
+    # Blocking helper for scripts: {(method, strength): (result, seconds)}.
+    results = {}
+    with make_pool(workers) as pool:
+        comparison = DenoiseComparison(pool, bgr, methods, strengths, scale)
+        try:
+            for future, key in comparison.futures.items():
+                results[key] = future.result()
+        finally:
+            comparison.cancel()
+            comparison.release()
+    return results
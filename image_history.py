@@ -0,0 +1,151 @@
+import zlib
+
+import numpy as np
+import cv2
+
+import image_ops
+
+# ─────────────────────────────────────────────
+# Memory-bounded undo/redo history.
+# Exactly invertible steps (flips, rotate, invert) store only the step and
+# are undone by applying the inverse.  Everything else stores one
+# zlib-compressed delta (after - before, modulo 256) that serves both
+# directions; shape-changing entries fall back to a compressed snapshot pair.
+# ─────────────────────────────────────────────
+
+COMPRESS_LEVEL = 1    # fast; deltas of smooth edits compress well anyway
+
+INVERSES = {
+    "invert":   image_ops.invert,
+    "flip_h":   image_ops.flip_horizontal,
+    "flip_v":   image_ops.flip_vertical,
+    "rotate90": lambda bgr: cv2.rotate(bgr, cv2.ROTATE_90_COUNTERCLOCKWISE),
+}
+
+
+def _pack(arr):
+    return zlib.compress(np.ascontiguousarray(arr).data, COMPRESS_LEVEL), arr.shape
+
+
+def _unpack(packed):
+    blob, shape = packed
+    return np.frombuffer(zlib.decompress(blob), dtype=np.uint8).reshape(shape)
+
+
+class StepEntry:
+    def __init__(self, label, step):
+        self.label = label
+        self.step = step
+        self.nbytes = 0
+        self.chain_before = self.chain_after = None
+
+    def undo(self, bgr):
+        return INVERSES[self.step[0]](bgr)
+
+    def redo(self, bgr):
+        return image_ops.apply_step(bgr, self.step)
+
+
+class DeltaEntry:
+    def __init__(self, label, before, after):
+        self.label = label
+        # uint8 arithmetic wraps, so before + delta == after exactly
+        self.delta = _pack(after - before)
+        self.nbytes = len(self.delta[0])
+        self.chain_before = self.chain_after = None
+
+    def undo(self, bgr):
+        return bgr - _unpack(self.delta)
+
+    def redo(self, bgr):
+        return bgr + _unpack(self.delta)
+
+
+class SnapshotEntry:
+    def __init__(self, label, before, after):
+        self.label = label
+        self.before = _pack(before)
+        self.after = _pack(after)
+        self.nbytes = len(self.before[0]) + len(self.after[0])
+        self.chain_before = self.chain_after = None
+
+    def undo(self, bgr):
+        return _unpack(self.before).copy()
+
+    def redo(self, bgr):
+        return _unpack(self.after).copy()
+
+
+def make_entry(label, step, before, after):
+    # Runs on the worker thread together with the operation itself.
+    if step is not None and step[0] in INVERSES:
+        return StepEntry(label, step)
+    if before.shape == after.shape:
+        return DeltaEntry(label, before, after)
+    return SnapshotEntry(label, before, after)
+
+
+def travel(bgr, moves):
+    # moves: [(entry, "undo" | "redo"), ...] as returned by History.moves_to
+    for entry, direction in moves:
+        bgr = getattr(entry, direction)(bgr)
+    return bgr
+
+
+class History:
+    def __init__(self, budget=512 * 1024 * 1024):
+        self.entries = []
+        self.cursor = 0           # entries[:cursor] are applied
+        self.budget = budget
+        self.evicted = 0
+
+    @property
+    def nbytes(self):
+        return sum(e.nbytes for e in self.entries)
+
+    def can_undo(self):
+        return self.cursor > 0
+
+    def can_redo(self):
+        return self.cursor < len(self.entries)
+
+    def push(self, entry):
+        # A new edit discards the redo branch.
+        del self.entries[self.cursor:]
+        self.entries.append(entry)
+        self.cursor = len(self.entries)
+        self.trim()
+
+    def set_budget(self, budget):
+        self.budget = budget
+        self.trim()
+
+    def trim(self):
+        # Evicts the oldest entries until the compressed data fits the
+        # budget; redo entries are never evicted ahead of undo ones.
+        while self.entries and self.nbytes > self.budget:
+            if self.cursor == 0:
+                self.entries.pop()
+                continue
+            self.entries.pop(0)
+            self.cursor -= 1
+            self.evicted += 1
+
+    def moves_to(self, target):
+        # Steps that take the image from the current state to `target`
+        # (number of applied entries).
+        if target < self.cursor:
+            return [(e, "undo") for e in reversed(self.entries[target:self.cursor])]
+        return [(e, "redo") for e in self.entries[self.cursor:target]]
+
+    def chain_at(self, target):
+        if target > 0:
+            return list(self.entries[target - 1].chain_after)
+        if self.entries:
+            return list(self.entries[0].chain_before)
+        return []
+
+    def clear(self):
+        self.entries = []
+        self.cursor = 0
+        self.evicted = 0
@@ -0,0 +1,1038 @@
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+
+import numpy as np
+import cv2
+
+import fft_backend
+import image_profile
+
+# ─────────────────────────────────────────────
+# GUI-free processing core.
+# Every function takes a BGR uint8 array and returns a new one; nothing
+# here touches Qt, so the same code runs in the GUI and in batch jobs.
+# ─────────────────────────────────────────────
+
+# ═══════════════════════════════════════════════════════
+# IMAGE OPERATIONS
+# ═══════════════════════════════════════════════════════
+def invert(bgr):
+    return cv2.bitwise_not(bgr)
+
+
+def flip_horizontal(bgr):
+    return cv2.flip(bgr, 1)
+
+
+def flip_vertical(bgr):
+    return cv2.flip(bgr, 0)
+
+
+def rotate_90(bgr):
+    return cv2.rotate(bgr, cv2.ROTATE_90_CLOCKWISE)
+
+
+def equalize_histogram(bgr):
+    ycrcb = cv2.cvtColor(bgr, cv2.COLOR_BGR2YCrCb)
+    ycrcb[:, :, 0] = cv2.equalizeHist(ycrcb[:, :, 0])
+    return cv2.cvtColor(ycrcb, cv2.COLOR_YCrCb2BGR)
+
+
+# ═══════════════════════════════════════════════════════
+# HISTOGRAM
+# ═══════════════════════════════════════════════════════
+def histogram_sample_step(shape, max_samples=None):
+    # Pixel stride that keeps the histogram at or below max_samples pixels.
+    pixels = shape[0] * shape[1]
+    if not max_samples or pixels <= max_samples:
+        return 1
+    return int(np.ceil(np.sqrt(pixels / max_samples)))
+
+
+def channel_histograms(bgr, max_samples=None, band_rows=64):
+    # All channel histograms as a (channels, 256) float32 array, from one
+    # pass over the buffer: each band of rows is histogrammed for every
+    # channel while it is still in cache.  Large images can be sampled on a
+    # regular grid; counts are then rescaled to the full pixel count.
+    step = histogram_sample_step(bgr.shape, max_samples)
+    channels = bgr.shape[2] if bgr.ndim == 3 else 1
+    hists = [np.zeros((256, 1), np.float32) for _ in range(channels)]
+
+    with image_profile.stage("histogram: calcHist"):
+        for r0 in range(0, bgr.shape[0], band_rows * step):
+            band = bgr[r0:r0 + band_rows * step:step, ::step]
+            if step > 1:
+                band = np.ascontiguousarray(band)
+            for c, hist in enumerate(hists):
+                cv2.calcHist([band], [c], None, [256], [0, 256], hist=hist, accumulate=True)
+
+    out = np.hstack(hists).T
+    if step > 1:
+        sampled = len(range(0, bgr.shape[0], step)) * len(range(0, bgr.shape[1], step))
+        out *= bgr.shape[0] * bgr.shape[1] / sampled
+    return out
+
+
+# ═══════════════════════════════════════════════════════
+# NOISE FUNCTIONS
+# ═══════════════════════════════════════════════════════
+NOISE_TYPES = ("pepper_&_salt", "gaussian", "speckle", "poisson")
+
+
+# Noise comes from seeded numpy Generators in float32.  The image is cut
+# into bands of NOISE_BAND_ROWS rows, each with its own child stream from
+# SeedSequence(seed).spawn(), so bands can be generated on a thread pool and
+# the result for a given seed never depends on the number of workers.
+# (Changing NOISE_BAND_ROWS changes the streams, and so the output.)
+NOISE_BAND_ROWS = 256
+
+
+def new_seed():
+    return int(np.random.SeedSequence().generate_state(1)[0])
+
+
+def poisson_levels(bgr):
+    # Distinct intensity levels rounded up to a power of two.  uint8 has at
+    # most 256 levels, so a 256-bin histogram counts them without sorting.
+    hist = cv2.calcHist([bgr.reshape(-1, 1)], [0], None, [256], [0, 256])
+    return float(2 ** np.ceil(np.log2(np.count_nonzero(hist))))
+
+
+def _noise_band(band, noise_type, strength, rng, levels):
+    with image_profile.stage("noise: to float"):
+        img = band.astype(np.float32)
+        img /= 255.0
+
+    with image_profile.stage("noise: sample"):
+        if noise_type == "pepper_&_salt":
+            noise = rng.random(img.shape[:2], dtype=np.float32)
+            img[noise < strength * 0.5] = 0
+            img[noise > 1 - strength * 0.5] = 1
+
+        elif noise_type == "gaussian":
+            noise = rng.standard_normal(img.shape, dtype=np.float32)
+            noise *= strength * 0.1
+            img += noise
+
+        elif noise_type == "speckle":
+            noise = rng.standard_normal(img.shape, dtype=np.float32)
+            noise *= strength * 0.3
+            noise *= img
+            img += noise
+
+        elif noise_type == "poisson":
+            img = rng.poisson(img * (levels * strength)).astype(np.float32)
+            img /= levels * strength
+
+    with image_profile.stage("noise: to uint8"):
+        np.clip(img, 0, 1, out=img)
+        img *= 255
+        return img.astype(np.uint8)
+
+
+def add_noise(bgr, noise_type, strength, seed=None):
+    if noise_type not in NOISE_TYPES:
+        raise ValueError(f"Unknown noise type: {noise_type}")
+    if noise_type == "poisson" and strength <= 0:
+        return bgr.copy()          # zero photon count: nothing to sample
+    levels = poisson_levels(bgr) if noise_type == "poisson" else None
+    seed = new_seed() if seed is None else seed
+
+    rows = bgr.shape[0]
+    starts = range(0, rows, NOISE_BAND_ROWS)
+    streams = np.random.SeedSequence(seed).spawn(len(starts))
+    out = np.empty_like(bgr)
+
+    def run(y, stream):
+        out[y:y + NOISE_BAND_ROWS] = _noise_band(bgr[y:y + NOISE_BAND_ROWS], noise_type, strength,
+                                                 np.random.default_rng(stream), levels)
+
+    if len(starts) == 1:
+        run(0, streams[0])
+    else:
+        with ThreadPoolExecutor(TILE_WORKERS) as pool:
+            list(pool.map(run, starts, streams))
+    return out
+
+
+def noise_code(noise_type, strength, seed=None):
+    seeded = "" if seed is None else (
+        f"\n\n# Reproduce exactly (banded streams, seed {seed}):\n"
+        f"# img = image_ops.add_noise(img, {noise_type!r}, {strength}, seed={seed})")
+    rng = f"rng = np.random.default_rng({'' if seed is None else seed})\n"
+    if noise_type == "pepper_&_salt":
+        return f"# Pepper & Salt Noise\n{rng}noise = rng.random(img.shape[:2], dtype=np.float32)\nimg[noise < {strength * 0.5}] = 0\nimg[noise > {1 - strength * 0.5}] = 1" + seeded
+    if noise_type == "gaussian":
+        return f"# Gaussian Noise\n{rng}noise = rng.standard_normal(img.shape, dtype=np.float32) * {strength * 0.1}\nimg = img + noise" + seeded
+    if noise_type == "speckle":
+        return f"# Speckle Noise\n{rng}noise = rng.standard_normal(img.shape, dtype=np.float32)\nimg = img + img * noise * {strength * 0.3}" + seeded
+    if noise_type == "poisson":
+        return (f"# Poisson Noise\n{rng}hist = cv2.calcHist([img_u8.reshape(-1, 1)], [0], None, [256], [0, 256])\n"
+                f"vals = 2 ** np.ceil(np.log2(np.count_nonzero(hist)))\n"
+                f"img = rng.poisson(img * vals * {strength}) / float(vals * {strength})") + seeded
+    return "# Unknown noise type"
+
+
+# ═══════════════════════════════════════════════════════
+# DENOISE FUNCTIONS
+# ═══════════════════════════════════════════════════════
+DENOISE_METHODS = ("bilateral", "mean", "median", "non-local means")
+
+
+def _scaled_odd(size, scale, minimum=1):
+    size = int(round(size * scale))
+    if size % 2 == 0:
+        size += 1
+    return max(size, minimum)
+
+
+def denoise_params(method, strength, scale=1.0):
+    # Maps the 0..1 strength slider onto the raw cv2 parameters.  scale < 1
+    # shrinks the spatial ones (window sizes, sigma_space) for a downscaled
+    # proxy; intensity parameters (sigma_color, h) do not depend on size.
+    if method == "bilateral":
+        p = {
+            "d": int(5 + strength * 10),
+            "sigma_color": int(50 + strength * 100),
+            "sigma_space": int(50 + strength * 100),
+        }
+        if scale != 1.0:
+            p["d"] = max(1, int(round(p["d"] * scale)))
+            p["sigma_space"] = max(1, int(round(p["sigma_space"] * scale)))
+        return p
+    if method in ("mean", "median"):
+        ksize = int(3 + strength * 10)
+        if ksize % 2 == 0:
+            ksize += 1
+        if scale != 1.0:
+            ksize = _scaled_odd(ksize, scale)
+        return {"ksize": ksize}
+    if method == "non-local means":
+        p = {"h": int(3 + strength * 20), "template": 7, "search": 21}
+        if scale != 1.0:
+            p["template"] = _scaled_odd(7, scale, 3)
+            p["search"] = _scaled_odd(21, scale, p["template"])
+        return p
+    raise ValueError(f"Unknown denoise method: {method}")
+
+
+# Raw cv2 parameters of each method, in the order denoise_raw() takes them
+# (e.g. found by the auto-tuner); window sizes must be odd.  Bilateral d
+# must be positive: with d <= 0 cv2 sizes the window from sigma_space, which
+# the tile halo (d // 2) would not cover.
+DENOISE_RAW_PARAMS = {
+    "bilateral":       ("d", "sigma_color", "sigma_space"),
+    "mean":            ("ksize",),
+    "median":          ("ksize",),
+    "non-local means": ("h", "template", "search"),
+}
+
+
+def raw_denoise_params(method, values, scale=1.0):
+    names = DENOISE_RAW_PARAMS.get(method)
+    if names is None:
+        raise ValueError(f"Unknown denoise method: {method}")
+    if len(values) != len(names):
+        raise ValueError(f"'{method}' takes {len(names)} parameter(s): {', '.join(names)}")
+    p = dict(zip(names, (int(v) for v in values)))
+    for name in ("ksize", "template", "search"):
+        if name in p and (p[name] < 1 or p[name] % 2 == 0):
+            raise ValueError(f"{name} must be a positive odd number, got {p[name]}")
+    if "d" in p and p["d"] < 1:
+        raise ValueError(f"d must be a positive number, got {p['d']}")
+    if scale != 1.0:
+        if "d" in p:
+            p["d"] = max(1, int(round(p["d"] * scale)))
+            p["sigma_space"] = max(1, int(round(p["sigma_space"] * scale)))
+        if "ksize" in p:
+            p["ksize"] = _scaled_odd(p["ksize"], scale)
+        if "search" in p:
+            p["template"] = _scaled_odd(p["template"], scale, 3)
+            p["search"] = _scaled_odd(p["search"], scale, p["template"])
+    return p
+
+
+# Large images are denoised in tiles on a thread pool (cv2 releases the GIL).
+# Each tile carries a halo at least as wide as the filter reaches, so the
+# stitched result is identical to filtering the whole frame at once, while
+# the filters' temporary buffers stay tile-sized.
+TILE_SIZE = 1024
+TILE_MIN_PIXELS = 4_000_000
+TILE_WORKERS = None        # None = one per core
+
+
+def denoise_halo(method, p):
+    # How far (in pixels) an output pixel can see into its neighbourhood.
+    if method == "bilateral":
+        return max(p["d"] // 2, 1)          # cv2 never uses a radius below 1
+    if method in ("mean", "median"):
+        return p["ksize"] // 2
+    return p["search"] // 2 + p["template"] // 2
+
+
+def tiled(fn, bgr, halo, tile=TILE_SIZE, workers=None):
+    rows, cols = bgr.shape[:2]
+    out = np.empty_like(bgr)
+
+    def run(y, x):
+        y0, x0 = max(y - halo, 0), max(x - halo, 0)
+        y1, x1 = min(y + tile + halo, rows), min(x + tile + halo, cols)
+        # copied so cv2 cannot see (or border-extrapolate past) the parent
+        result = fn(np.ascontiguousarray(bgr[y0:y1, x0:x1]))
+        h, w = min(tile, rows - y), min(tile, cols - x)
+        out[y:y + h, x:x + w] = result[y - y0:y - y0 + h, x - x0:x - x0 + w]
+
+    origins = [(y, x) for y in range(0, rows, tile) for x in range(0, cols, tile)]
+    with ThreadPoolExecutor(workers or TILE_WORKERS) as pool:
+        list(pool.map(lambda yx: run(*yx), origins))
+    return out
+
+
+def denoise(bgr, method, strength, scale=1.0, tile=None):
+    # tile: tile size in pixels; None tiles automatically above
+    # TILE_MIN_PIXELS, 0 never tiles.
+    return denoise_with(bgr, method, denoise_params(method, strength, scale), tile)
+
+
+def denoise_raw(bgr, method, *values, scale=1.0, tile=None):
+    # denoise_raw(img, "bilateral", 9, 75, 75): explicit cv2 parameters.
+    return denoise_with(bgr, method, raw_denoise_params(method, values, scale), tile)
+
+
+def denoise_with(bgr, method, p, tile=None):
+    if tile is None:
+        tile = TILE_SIZE if bgr.shape[0] * bgr.shape[1] >= TILE_MIN_PIXELS else 0
+    if tile and (bgr.shape[0] > tile or bgr.shape[1] > tile):
+        return tiled(lambda part: _denoise(part, method, p), bgr, denoise_halo(method, p), tile)
+    return _denoise(bgr, method, p)
+
+
+def _denoise(bgr, method, p):
+    with image_profile.stage("denoise: cv2 " + method):
+        return _denoise_cv2(bgr, method, p)
+
+
+def _denoise_cv2(bgr, method, p):
+    if method == "bilateral":
+        return cv2.bilateralFilter(bgr, p["d"], p["sigma_color"], p["sigma_space"])
+    if method == "mean":
+        return cv2.blur(bgr, (p["ksize"], p["ksize"]))
+    if method == "median":
+        if p["ksize"] == 1:
+            return bgr.copy()
+        return cv2.medianBlur(bgr, p["ksize"])
+    return cv2.fastNlMeansDenoisingColored(bgr, None, p["h"], p["h"], p["template"], p["search"])
+
+
+def denoise_multi(frames, index, strength, window):
+    # Temporal NL-means: denoises frames[index] using `window` (odd)
+    # consecutive frames centred on it.  cv2 needs the whole window inside
+    # the list, so near the ends the neighbours are mirrored.
+    n = len(frames)
+    if n < 2 or window < 3:
+        return denoise(frames[index], "non-local means", strength)
+    r = window // 2
+    picks = [abs(i) if i < n else 2 * (n - 1) - i for i in range(index - r, index + r + 1)]
+    picks = [min(max(i, 0), n - 1) for i in picks]
+    p = denoise_params("non-local means", strength)
+    return cv2.fastNlMeansDenoisingColoredMulti([frames[i] for i in picks], r, window, None,
+                                                p["h"], p["h"], p["template"], p["search"])
+
+
+def denoise_code(method, strength):
+    if method not in DENOISE_METHODS:
+        return "# Unknown denoise method"
+    return denoise_params_code(method, denoise_params(method, strength))
+
+
+def denoise_params_code(method, p):
+    if method == "bilateral":
+        return f"# Bilateral Filter\nimg = cv2.bilateralFilter(img, {p['d']}, {p['sigma_color']}, {p['sigma_space']})"
+    if method == "mean":
+        return f"# Mean Filter\nimg = cv2.blur(img, ({p['ksize']}, {p['ksize']}))"
+    if method == "median":
+        return f"# Median Filter\nimg = cv2.medianBlur(img, {p['ksize']})"
+    return f"# Non-Local Means\nimg = cv2.fastNlMeansDenoisingColored(img, None, {p['h']}, {p['h']}, {p['template']}, {p['search']})"
+
+
+# ═══════════════════════════════════════════════════════
+# FREQUENCY FILTERS
+# ═══════════════════════════════════════════════════════
+FREQUENCY_FILTERS = ("low pass", "high pass", "notch pass", "notch reject", "gaussian")
+
+
+NOTCH_RADIUS = 20
+
+
+class MaskFactory:
+    # Frequency masks in the unshifted rfft2 half layout (rows × cols//2+1).
+    # Each shape gets one cached grid of signed frequencies and squared
+    # radius; every mask type is derived from it, and finished masks are
+    # kept in a bounded LRU keyed by (shape, type, cutoff, dtype).  Returned
+    # arrays are shared and read-only.
+    def __init__(self, capacity=16, grid_capacity=4):
+        self.capacity = capacity
+        self.grid_capacity = grid_capacity
+        self._masks = OrderedDict()
+        self._grids = OrderedDict()
+        self._lock = threading.Lock()
+
+    def grid(self, shape):
+        # (fy column, fx row, fy² + fx²) for a padded transform shape
+        shape = tuple(shape)
+        with self._lock:
+            grid = self._grids.get(shape)
+            if grid is not None:
+                self._grids.move_to_end(shape)
+                return grid
+
+        rows, cols = shape
+        fy = np.fft.fftfreq(rows, 1.0 / rows).astype(np.float32)[:, None]
+        fx = np.arange(cols // 2 + 1, dtype=np.float32)[None, :]
+        r2 = fy * fy + fx * fx
+        for a in (fy, fx, r2):
+            a.flags.writeable = False
+        grid = (fy, fx, r2)
+
+        with self._lock:
+            self._grids[shape] = grid
+            while len(self._grids) > self.grid_capacity:
+                self._grids.popitem(last=False)
+        return grid
+
+    def mask(self, shape, filter_type, cutoff, dtype=np.float32):
+        key = (tuple(shape), filter_type, cutoff, np.dtype(dtype).str)
+        with self._lock:
+            mask = self._masks.get(key)
+            if mask is not None:
+                self._masks.move_to_end(key)
+                return mask
+
+        mask = self._build(shape, filter_type, cutoff).astype(dtype, copy=False)
+        mask.flags.writeable = False
+
+        with self._lock:
+            self._masks[key] = mask
+            while len(self._masks) > self.capacity:
+                self._masks.popitem(last=False)
+        return mask
+
+    def clear(self):
+        with self._lock:
+            self._masks.clear()
+            self._grids.clear()
+
+    def _build(self, shape, filter_type, cutoff):
+        fy, fx, r2 = self.grid(shape)
+
+        if filter_type == "low pass":
+            return r2 <= cutoff * cutoff
+
+        if filter_type == "high pass":
+            return r2 > cutoff * cutoff
+
+        if filter_type in ("notch pass", "notch reject"):
+            # two discs at (+cutoff, +cutoff) and (-cutoff, -cutoff)
+            rad2 = NOTCH_RADIUS * NOTCH_RADIUS
+            near = (fy - cutoff) ** 2 + (fx - cutoff) ** 2 <= rad2
+            near |= (fy + cutoff) ** 2 + (fx + cutoff) ** 2 <= rad2
+            return near if filter_type == "notch pass" else ~near
+
+        if filter_type == "gaussian":
+            mask = r2 * np.float32(-0.5 / (cutoff * cutoff))
+            return np.exp(mask, out=mask)
+
+        raise ValueError(f"Unknown filter type: {filter_type}")
+
+
+MASKS = MaskFactory()
+
+
+def frequency_mask(shape, filter_type, cutoff):
+    # Centred full-size mask, for display; filtering uses MASKS directly.
+    half = MASKS.mask(shape, filter_type, cutoff)
+    return np.fft.fftshift(fft_backend.hermitian_full(half, shape[1]))
+
+
+def frequency_filter(bgr, filter_type, cutoff, spectrum=None, color=False):
+    # color=False filters the grayscale image (the classic behaviour);
+    # color=True filters the B, G and R planes as one batched transform.
+    # Pass the cached Spectrum of bgr to skip the forward FFT entirely.
+    if spectrum is None:
+        spectrum = fourier_spectrum(bgr, color)
+
+    # Apply filter: the half-layout mask broadcasts over the channel planes
+    with image_profile.stage("filter: mask"):
+        half_mask = MASKS.mask(spectrum.shape, filter_type, cutoff)
+        filtered = spectrum.half * half_mask
+
+    # Inverse FFT, cropped back from the padded transform size
+    rows, cols = spectrum.image_shape
+    with image_profile.stage("fft: inverse"):
+        img_back = fft_backend.get_backend().irfft2(filtered, spectrum.shape)
+
+    # Normalize (one scale for all planes keeps the colour balance)
+    with image_profile.stage("filter: normalize"):
+        img_back = np.abs(img_back[..., :rows, :cols])
+        img_back = np.uint8(255 * img_back / np.max(img_back))
+
+    if spectrum.color:
+        return np.ascontiguousarray(img_back.transpose(1, 2, 0))
+    return cv2.cvtColor(img_back, cv2.COLOR_GRAY2BGR)
+
+
+def frequency_filter_color(bgr, filter_type, cutoff, spectrum=None):
+    return frequency_filter(bgr, filter_type, cutoff, spectrum, color=True)
+
+
+def frequency_filter_code(filter_type, cutoff, color=False):
+    code = _frequency_mask_code(filter_type, cutoff)
+    if color:
+        code += ("\n\n# Color mode: all BGR planes in one batched transform\n"
+                 "planes = img.transpose(2, 0, 1).astype(np.float32)\n"
+                 "F = np.fft.rfft2(planes)\n"
+                 "half_mask = np.fft.ifftshift(mask)[:, :F.shape[-1]]\n"
+                 "img = np.fft.irfft2(F * half_mask, s=planes.shape[1:]).transpose(1, 2, 0)")
+    return code
+
+
+def _frequency_mask_code(filter_type, cutoff):
+    if filter_type == "low pass":
+        return f"# Low Pass Filter\nmask = np.zeros((rows, cols), np.uint8)\ncv2.circle(mask, (ccol, crow), {cutoff}, 1, -1)"
+    if filter_type == "high pass":
+        return f"# High Pass Filter\nmask = np.ones((rows, cols), np.uint8)\ncv2.circle(mask, (ccol, crow), {cutoff}, 0, -1)"
+    if filter_type == "notch pass":
+        return f"# Notch Pass Filter\ncv2.circle(mask, (ccol - {cutoff}, crow - {cutoff}), 20, 1, -1)\ncv2.circle(mask, (ccol + {cutoff}, crow + {cutoff}), 20, 1, -1)"
+    if filter_type == "notch reject":
+        return f"# Notch Reject Filter\nmask = np.ones((rows, cols), np.uint8)\ncv2.circle(mask, (ccol - {cutoff}, crow - {cutoff}), 20, 0, -1)\ncv2.circle(mask, (ccol + {cutoff}, crow + {cutoff}), 20, 0, -1)"
+    if filter_type == "gaussian":
+        return f"# Gaussian Filter\nx = np.linspace(-cols//2, cols//2, cols)\ny = np.linspace(-rows//2, rows//2, rows)\nX, Y = np.meshgrid(x, y)\nmask = np.exp(-(X**2 + Y**2) / (2 * {cutoff}**2))"
+    return "# Unknown filter type"
+
+
+# ═══════════════════════════════════════════════════════
+# FOURIER ANALYSIS
+# ═══════════════════════════════════════════════════════
+class Spectrum:
+    # Real-input spectrum of the grayscale image: the complex64 rfft2 half
+    # of the zero-padded (optimal DFT size) image.  The centred full-size
+    # views are rebuilt by Hermitian symmetry on first access and kept, so
+    # every consumer shares them.  A color spectrum stacks the B, G, R halves
+    # along a leading axis and is only used for filtering.
+    def __init__(self, half, shape, image_shape):
+        self.half = half
+        self.shape = shape
+        self.image_shape = image_shape
+        self.color = half.ndim == 3
+        self._magnitude = None
+        self._phase = None
+        self._magnitude_log = None
+        self._power_log = None
+
+    @property
+    def magnitude(self):
+        if self._magnitude is None:
+            full = fft_backend.hermitian_full(np.abs(self.half), self.shape[1])
+            self._magnitude = np.fft.fftshift(full)
+        return self._magnitude
+
+    @property
+    def phase(self):
+        if self._phase is None:
+            full = fft_backend.hermitian_full(np.angle(self.half), self.shape[1], odd=True)
+            self._phase = np.fft.fftshift(full)
+        return self._phase
+
+    @property
+    def magnitude_log(self):
+        if self._magnitude_log is None:
+            self._magnitude_log = np.log1p(self.magnitude)
+        return self._magnitude_log
+
+    @property
+    def power_log(self):
+        if self._power_log is None:
+            self._power_log = np.log1p(np.square(self.magnitude))
+        return self._power_log
+
+    def precompute_views(self):
+        # Lets a worker thread pay for the views instead of the GUI thread.
+        with image_profile.stage("fourier: views"):
+            self.phase, self.magnitude_log, self.power_log
+        return self
+
+
+def fourier_spectrum(bgr, color=False):
+    with image_profile.stage("fft: to float"):
+        if color:
+            planes = np.ascontiguousarray(bgr.transpose(2, 0, 1), dtype=np.float32)
+        else:
+            planes = cv2.cvtColor(bgr, cv2.COLOR_BGR2GRAY).astype(np.float32)
+        image_shape = planes.shape[-2:]
+        shape = fft_backend.optimal_shape(image_shape)
+        planes = fft_backend.pad_to(planes, shape)
+    with image_profile.stage("fft: forward"):
+        half = fft_backend.get_backend().rfft2(planes)
+    return Spectrum(half, shape, image_shape)
+
+
+class SpectrumCache:
+    # Spectra keyed by (image version, color).  The owner bumps the version
+    # on every change of the image, so an entry can never describe stale
+    # pixels; the small capacity bounds memory (the complex64 half is ~4
+    # bytes/pixel per plane).  The FFT runs outside the lock, so callers
+    # asking for other entries are not held up; if two compute the same
+    # entry, the first one stored wins.
+    def __init__(self, capacity=2):
+        self.capacity = capacity
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, bgr, version, color=False):
+        key = (version, color)
+        with self._lock:
+            spectrum = self._entries.get(key)
+            if spectrum is not None:
+                self._entries.move_to_end(key)
+                return spectrum
+        spectrum = fourier_spectrum(bgr, color)
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                return self._entries[key]
+            self._store(key, spectrum)
+            return spectrum
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def _store(self, key, spectrum):
+        self._entries[key] = spectrum
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.capacity:
+            self._entries.popitem(last=False)
+
+
+@lru_cache(maxsize=4)
+def radial_bins(shape, max_bins=None, log=False):
+    # Per-shape bin index map, bin counts and mean radius of every bin.
+    # Default bins are one pixel of radius wide; max_bins caps their number
+    # with linear (or, with log=True, logarithmic) spacing so huge spectra
+    # do not produce more samples than a plot can show.  Empty bins are
+    # dropped.  Returns read-only (index, counts, radii).
+    rows, cols = shape
+    y = np.arange(rows, dtype=np.float32)[:, None] - (rows - 1) / 2.0
+    x = np.arange(cols, dtype=np.float32)[None, :] - (cols - 1) / 2.0
+    r = np.hypot(x, y).ravel()
+
+    r_max = float(r.max())
+    if log and max_bins:
+        scale = (max_bins - 1) / np.log1p(r_max)
+        index = (np.log1p(r) * scale).astype(np.intp)
+    elif max_bins and r_max + 1 > max_bins:
+        index = (r * ((max_bins - 1) / r_max)).astype(np.intp)
+    else:
+        index = r.astype(np.intp)
+
+    counts = np.bincount(index)
+    radii = np.bincount(index, r)
+    used = counts > 0
+    if not used.all():
+        # renumber so that only non-empty bins remain
+        remap = np.cumsum(used) - 1
+        index = remap[index]
+        counts, radii = counts[used], radii[used]
+    radii = radii / counts
+
+    for a in (index, counts, radii):
+        a.flags.writeable = False
+    return index, counts, radii
+
+
+def radial_profile(data, max_bins=None, log=False):
+    # (bin radii, mean of data per bin): one weighted bincount per call.
+    with image_profile.stage("fourier: radial profile"):
+        index, counts, radii = radial_bins(data.shape, max_bins, log)
+        return radii, np.bincount(index, data.ravel(), minlength=len(counts)) / counts
+
+
+def compute_radial_average(data):
+    return radial_profile(data)[1]
+
+
+# ═══════════════════════════════════════════════════════
+# HSI COLOR SPACE
+# ═══════════════════════════════════════════════════════
+# H in degrees [0, 360), S and I in [0, 1], all float32.  The image is
+# processed in bands of HSI_BAND_ROWS rows with in-place arithmetic, so
+# the float temporaries stay band-sized whatever the image size.
+HSI_BAND_ROWS = 256
+HSI_EPS = 1e-8
+
+
+def _hsi_band(R, G, B, H, S, I):
+    # R, G, B: float32 bands in [0, 1]; writes into the H, S, I views.
+    np.add(R, G, out=I)
+    I += B                                   # R + G + B, reused for S
+    np.minimum(R, G, out=S)
+    np.minimum(S, B, out=S)
+    S *= 3.0
+    S /= I + HSI_EPS
+    np.subtract(1.0, S, out=S)
+    np.clip(S, 0.0, 1.0, out=S)
+    I /= 3.0
+
+    rg = R - G                               # each difference computed once
+    rb = R - B
+    num = rg + rb
+    num *= 0.5
+    rg *= rg
+    rb *= G - B
+    rg += rb
+    np.sqrt(rg, out=rg)
+    rg += HSI_EPS
+    num /= rg
+    np.clip(num, -1.0, 1.0, out=num)
+    np.arccos(num, out=num)
+    np.degrees(num, out=H)
+    np.subtract(360.0, H, out=H, where=B > G)
+    np.mod(H, 360.0, out=H)
+
+
+def hsi_planes(bgr):
+    # (3, rows, cols) float32 H, S, I planes of a BGR uint8 image.
+    rows = bgr.shape[0]
+    planes = np.empty((3,) + bgr.shape[:2], dtype=np.float32)
+    with image_profile.stage("hsi: planes"):
+        for y in range(0, rows, HSI_BAND_ROWS):
+            band = bgr[y:y + HSI_BAND_ROWS].astype(np.float32)
+            band /= 255.0
+            _hsi_band(band[..., 2], band[..., 1], band[..., 0], *planes[:, y:y + HSI_BAND_ROWS])
+    return planes
+
+
+def compute_hsi(rgb):
+    # rgb: float32 in [0, 1]; returns the H, S, I planes.
+    planes = np.empty((3,) + rgb.shape[:2], dtype=np.float32)
+    for y in range(0, rgb.shape[0], HSI_BAND_ROWS):
+        band = rgb[y:y + HSI_BAND_ROWS]
+        _hsi_band(band[..., 0], band[..., 1], band[..., 2], *planes[:, y:y + HSI_BAND_ROWS])
+    return planes[0], planes[1], planes[2]
+
+
+def hsi_visual(planes):
+    # H, S, I scaled to 0..255 and stacked as the three display channels.
+    divisor = np.array([360.0, 1.0, 1.0], dtype=np.float32)[:, None, None]
+    out = np.empty(planes.shape[1:] + (3,), dtype=np.uint8)
+    with image_profile.stage("hsi: visual"):
+        for y in range(0, planes.shape[1], HSI_BAND_ROWS):
+            band = planes[:, y:y + HSI_BAND_ROWS] / divisor
+            band *= 255.0
+            out[y:y + HSI_BAND_ROWS] = band.transpose(1, 2, 0)   # truncates like astype
+    return out
+
+
+def compute_hsi_visual(bgr):
+    return hsi_visual(hsi_planes(bgr))
+
+
+def hsi_to_bgr(planes):
+    # Inverse transform (sector formulas): every hue sector of 120° has one
+    # channel at I(1 - S), one at I(1 + S cos h / cos(60° - h)) and the
+    # third making up 3I; the sector only decides which channel is which.
+    H, S, I = planes
+    out = np.empty(H.shape + (3,), dtype=np.uint8)
+    for y in range(0, H.shape[0], HSI_BAND_ROWS):
+        h, s, i = H[y:y + HSI_BAND_ROWS], S[y:y + HSI_BAND_ROWS], I[y:y + HSI_BAND_ROWS]
+        sector = (h // 120.0).astype(np.int8) % 3
+        hr = np.radians(h % 120.0)
+        low = i * (1.0 - s)
+        high = np.cos(hr)
+        high /= np.cos(np.pi / 3.0 - hr)
+        high *= s
+        high += 1.0
+        high *= i
+        rest = 3.0 * i - low - high
+        # (R, G, B) per sector: RG -> (high, rest, low), GB -> (low, high,
+        # rest), BR -> (rest, low, high)
+        r = np.choose(sector, (high, low, rest))
+        g = np.choose(sector, (rest, high, low))
+        b = np.choose(sector, (low, rest, high))
+        band = np.stack([b, g, r], axis=-1)
+        band *= 255.0
+        np.rint(band, out=band)
+        np.clip(band, 0, 255, out=band)
+        out[y:y + HSI_BAND_ROWS] = band
+    return out
+
+
+class HSI:
+    def __init__(self, planes):
+        self.planes = planes          # (3, rows, cols) float32 H, S, I
+        self._visual = None
+
+    @property
+    def visual(self):
+        if self._visual is None:
+            self._visual = hsi_visual(self.planes)
+        return self._visual
+
+    def to_bgr(self):
+        return hsi_to_bgr(self.planes)
+
+
+class HSICache:
+    # H/S/I planes keyed by image version, like SpectrumCache; switching
+    # display modes or zooming never recomputes them.  12 bytes per pixel,
+    # so only the latest version is kept by default.
+    def __init__(self, capacity=1):
+        self.capacity = capacity
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, bgr, version):
+        with self._lock:
+            hsi = self._entries.get(version)
+            if hsi is None:
+                hsi = HSI(hsi_planes(bgr))
+                self._entries[version] = hsi
+                while len(self._entries) > self.capacity:
+                    self._entries.popitem(last=False)
+            else:
+                self._entries.move_to_end(version)
+            return hsi
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+# ═══════════════════════════════════════════════════════
+# QUALITY METRICS
+# ═══════════════════════════════════════════════════════
+# MSE, PSNR and SSIM of an image against a reference of the same shape.
+# SSIM is Wang et al. (2004): local statistics from an 11×11 Gaussian window
+# (σ = 1.5, separable cv2.GaussianBlur), computed per channel and averaged
+# over every pixel.  Large images are measured in tiles with a halo of half
+# the window, so the result matches the whole-frame computation while the
+# float32 temporaries stay tile-sized.
+SSIM_WINDOW = 11
+SSIM_SIGMA = 1.5
+SSIM_C1 = (0.01 * 255) ** 2
+SSIM_C2 = (0.03 * 255) ** 2
+
+
+def ssim_map(a, b):
+    # a, b: float32 arrays in 0..255; returns the per-pixel SSIM.
+    blur = lambda x: cv2.GaussianBlur(x, (SSIM_WINDOW, SSIM_WINDOW), SSIM_SIGMA)
+    mu_a, mu_b = blur(a), blur(b)
+    var_a = blur(a * a)
+    var_a -= mu_a * mu_a
+    var_b = blur(b * b)
+    var_b -= mu_b * mu_b
+    cov = blur(a * b)
+    cov -= mu_a * mu_b
+
+    num = mu_a * mu_b
+    num *= 2.0
+    num += SSIM_C1
+    cov *= 2.0
+    cov += SSIM_C2
+    num *= cov
+    mu_a *= mu_a
+    mu_b *= mu_b
+    mu_a += mu_b
+    mu_a += SSIM_C1
+    var_a += var_b
+    var_a += SSIM_C2
+    mu_a *= var_a
+    num /= mu_a
+    return num
+
+
+def _quality_tile(reference, bgr, y, x, tile):
+    # (sum of squared errors, sum of SSIM) over one tile of the output.
+    rows, cols = bgr.shape[:2]
+    halo = SSIM_WINDOW // 2
+    y0, x0 = max(y - halo, 0), max(x - halo, 0)
+    y1, x1 = min(y + tile + halo, rows), min(x + tile + halo, cols)
+    h, w = min(tile, rows - y), min(tile, cols - x)
+    with image_profile.stage("metrics: mse"):
+        sq = cv2.norm(np.ascontiguousarray(reference[y:y + h, x:x + w]),
+                      np.ascontiguousarray(bgr[y:y + h, x:x + w]), cv2.NORM_L2SQR)
+    with image_profile.stage("metrics: ssim"):
+        a = reference[y0:y1, x0:x1].astype(np.float32)
+        b = bgr[y0:y1, x0:x1].astype(np.float32)
+        ssim = ssim_map(a, b)[y - y0:y - y0 + h, x - x0:x - x0 + w]
+        return sq, float(ssim.sum(dtype=np.float64))
+
+
+def image_quality(reference, bgr, tile=None, workers=None):
+    # {"mse", "psnr" (dB, inf when identical), "ssim"} of bgr against
+    # reference.  tile: None tiles automatically above TILE_MIN_PIXELS,
+    # 0 never tiles.
+    if reference.shape != bgr.shape:
+        raise ValueError(f"Shapes differ: {reference.shape} vs {bgr.shape}")
+    rows, cols = bgr.shape[:2]
+    if tile is None:
+        tile = TILE_SIZE if rows * cols >= TILE_MIN_PIXELS else 0
+    if not tile:
+        tile = max(rows, cols)
+    origins = [(y, x) for y in range(0, rows, tile) for x in range(0, cols, tile)]
+    if len(origins) == 1:
+        parts = [_quality_tile(reference, bgr, 0, 0, tile)]
+    else:
+        with ThreadPoolExecutor(workers or TILE_WORKERS) as pool:
+            parts = list(pool.map(lambda yx: _quality_tile(reference, bgr, *yx, tile), origins))
+
+    values = bgr.size
+    mse = sum(p[0] for p in parts) / values
+    psnr = 10.0 * np.log10(255.0 ** 2 / mse) if mse else float("inf")
+    return {"mse": mse, "psnr": float(psnr), "ssim": sum(p[1] for p in parts) / values}
+
+
+# ═══════════════════════════════════════════════════════
+# PROXY RESOLUTION
+# ═══════════════════════════════════════════════════════
+def proxy_scale(shape, max_width, max_height):
+    # Downscale factor (<= 1) that fits the image into max_width × max_height.
+    return min(1.0, max_width / shape[1], max_height / shape[0])
+
+
+def make_proxy(bgr, scale):
+    if scale >= 1.0:
+        return bgr.copy()
+    size = (max(1, round(bgr.shape[1] * scale)), max(1, round(bgr.shape[0] * scale)))
+    return cv2.resize(bgr, size, interpolation=cv2.INTER_AREA)
+
+
+# ═══════════════════════════════════════════════════════
+# OPERATION REGISTRY
+# ═══════════════════════════════════════════════════════
+# name -> (function, argument types).  A step is a (name, args) tuple,
+# e.g. ("denoise", ("median", 0.5)); chains are lists of steps.
+# Step arguments always describe the full-resolution result.  Operations in
+# SCALED_OPERATIONS have spatial parameters and take scale= for proxies;
+# frequency cutoffs are in cycles per image and need no scaling.
+OPERATIONS = {
+    "invert":       (invert,                 ()),
+    "flip_h":       (flip_horizontal,        ()),
+    "flip_v":       (flip_vertical,          ()),
+    "rotate90":     (rotate_90,              ()),
+    "equalize":     (equalize_histogram,     ()),
+    "noise":        (add_noise,              (str, float, int)),
+    "denoise":      (denoise,                (str, float)),
+    "denoise_raw":  (denoise_raw,            (str, int, int, int)),
+    "filter":       (frequency_filter,       (str, int)),
+    "filter_color": (frequency_filter_color, (str, int)),
+}
+
+SCALED_OPERATIONS = {"denoise", "denoise_raw"}
+OPTIONAL_ARGS = {"noise": 1,      # trailing arguments that may be omitted (seed)
+                 "denoise_raw": 2}   # mean and median take one value
+
+
+def parse_step(spec):
+    # "denoise:non-local means:0.5" -> ("denoise", ("non-local means", 0.5))
+    name, *raw = spec.split(":")
+    name = name.strip().lower()
+    if name not in OPERATIONS:
+        raise ValueError(f"Unknown operation: {name}")
+    types = OPERATIONS[name][1]
+    required = len(types) - OPTIONAL_ARGS.get(name, 0)
+    if not required <= len(raw) <= len(types):
+        expected = len(types) if required == len(types) else f"{required}-{len(types)}"
+        raise ValueError(f"Operation '{name}' expects {expected} argument(s), got {len(raw)}")
+    args = tuple(t(v.strip().lower() if t is str else v) for t, v in zip(types, raw))
+    if name == "denoise_raw":
+        raw_denoise_params(args[0], args[1:])     # fail early on bad values
+    return name, args
+
+
+def step_spec(step):
+    # Inverse of parse_step(): the "name:arg:arg" syntax of batch --op.
+    # Floats use the shortest repr that reads back exactly; ints (e.g. a
+    # 32-bit noise seed) must never go through exponent notation.
+    name, args = step
+    return ":".join([name, *(_spec_arg(a) for a in args)])
+
+
+def _spec_arg(a):
+    if isinstance(a, str):
+        return a
+    if isinstance(a, (int, np.integer)):
+        return str(int(a))
+    return repr(float(a))
+
+
+def apply_step(bgr, step, scale=1.0):
+    name, args = step
+    with image_profile.stage("op: " + name):
+        if scale != 1.0 and name in SCALED_OPERATIONS:
+            return OPERATIONS[name][0](bgr, *args, scale=scale)
+        return OPERATIONS[name][0](bgr, *args)
+
+
+def apply_chain(bgr, chain, scale=1.0):
+    for step in chain:
+        bgr = apply_step(bgr, step, scale)
+    return bgr
+
+
+class ChainCache:
+    # Outputs of every chain prefix, keyed by (source token, scale, steps so
+    # far).  Editing step k changes the keys of steps k..n only, so rendering
+    # the edited chain resumes from the cached output of step k-1.  Least
+    # recently used intermediates are evicted once their total size exceeds
+    # the budget.  Operations never modify their input, so cached arrays can
+    # be shared with the caller.
+    def __init__(self, budget=1024 * 1024 * 1024):
+        self.budget = budget
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    @property
+    def nbytes(self):
+        with self._lock:
+            return sum(bgr.nbytes for bgr in self._entries.values())
+
+    def put(self, token, scale, chain, bgr):
+        with self._lock:
+            self._store((token, scale, tuple(chain)), bgr)
+
+    def render(self, source, token, chain, scale=1.0):
+        chain = tuple(chain)
+        with self._lock:
+            start, bgr = 0, source
+            for k in range(len(chain), 0, -1):
+                key = (token, scale, chain[:k])
+                if key in self._entries:
+                    self._entries.move_to_end(key)
+                    start, bgr = k, self._entries[key]
+                    break
+        for k in range(start, len(chain)):
+            bgr = apply_step(bgr, chain[k], scale)
+            self.put(token, scale, chain[:k + 1], bgr)
+        return bgr
+
+    def set_budget(self, budget):
+        with self._lock:
+            self.budget = budget
+            self._evict()
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def _store(self, key, bgr):
+        self._entries[key] = bgr
+        self._entries.move_to_end(key)
+        self._evict()
+
+    def _evict(self):
+        total = sum(b.nbytes for b in self._entries.values())
+        while self._entries and total > self.budget:
+            total -= self._entries.popitem(last=False)[1].nbytes
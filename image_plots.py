@@ -0,0 +1,82 @@
+import numpy as np
+from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as FigureCanvas
+from matplotlib.figure import Figure
+
+# ─────────────────────────────────────────────
+# Matplotlib widgets of the GUI.  Importing Matplotlib is the slowest part
+# of starting IPS, so image_analyzer imports this module on first use.
+# ─────────────────────────────────────────────
+
+class MplCanvas(FigureCanvas):
+    def __init__(self, figsize=(7, 4)):
+        self.fig = Figure(figsize=figsize, dpi=100, facecolor='#FAFAF8')
+        self.ax = self.fig.add_subplot(111, facecolor='#FAFAF8')
+        super().__init__(self.fig)
+
+# ─────────────────────────────────────────────
+# Histogram panel with persistent artists
+# ─────────────────────────────────────────────
+class HistogramRenderer:
+    # Axes, legend and layout are built once; an update only swaps the line
+    # data and blits the lines over a cached background.  A full redraw is
+    # needed only when the y-range (or the sampled flag) changes.
+    CHANNELS = (('b', 'Blue'), ('g', 'Green'), ('r', 'Red'))
+
+    def __init__(self, canvas):
+        self.canvas = canvas
+        self.background = None
+        self.sampled = False
+        ax = canvas.ax
+
+        x = np.arange(256)
+        self.lines = [
+            ax.plot(x, np.zeros(256), color=col, label=label, linewidth=1.5, animated=True)[0]
+            for col, label in self.CHANNELS
+        ]
+        ax.set_xlim([0, 256])
+        ax.set_ylim(0, 1)
+        ax.ticklabel_format(axis='y', style='sci', scilimits=(0, 0))
+        ax.set_xlabel('Pixel Intensity', fontsize=9)
+        ax.set_ylabel('Frequency', fontsize=9)
+        ax.set_title('Color Histogram', fontsize=10, fontweight='bold')
+        ax.legend(loc='upper right', fontsize=8)
+        ax.grid(True, alpha=0.3)
+        canvas.fig.tight_layout()
+
+        canvas.mpl_connect('draw_event', self.on_draw)
+
+    def on_draw(self, event):
+        # Every full draw (first show, resize, y-range change) refreshes the
+        # background that later updates are blitted onto.  This can run
+        # inside the canvas' paintEvent, so the lines are only rendered into
+        # the buffer being painted: blitting here would start a nested paint.
+        self.background = self.canvas.copy_from_bbox(self.canvas.ax.bbox)
+        self.render_lines()
+
+    def render_lines(self):
+        for line in self.lines:
+            self.canvas.ax.draw_artist(line)
+
+    def draw_lines(self):
+        # Data updates only, outside any paint.
+        self.render_lines()
+        self.canvas.blit(self.canvas.ax.bbox)
+
+    def update(self, hists, sampled=False):
+        for line, hist in zip(self.lines, hists):
+            line.set_ydata(hist)
+
+        ax = self.canvas.ax
+        top = float(hists.max()) * 1.05 or 1.0
+        ymax = ax.get_ylim()[1]
+        if top > ymax or top < 0.5 * ymax or sampled != self.sampled:
+            self.sampled = sampled
+            ax.set_ylim(0, top)
+            ax.set_title('Color Histogram (sampled)' if sampled else 'Color Histogram',
+                         fontsize=10, fontweight='bold')
+            self.canvas.draw()
+        elif self.background is None:
+            self.canvas.draw()
+        else:
+            self.canvas.restore_region(self.background)
+            self.draw_lines()
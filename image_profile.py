@@ -0,0 +1,136 @@
+import contextlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict, deque
+
+# ─────────────────────────────────────────────
+# Hot-path stage profiler.
+#   with image_profile.stage("fft: forward"):
+#       ...
+# Disabled (the default) stage() returns a shared no-op context manager
+# after one attribute check, so instrumented code runs at full speed.
+# Enabled, every span is recorded with its thread and attributed to the
+# current user action (begin()); the session exports as Chrome trace-event
+# JSON for chrome://tracing or https://ui.perfetto.dev.
+# ─────────────────────────────────────────────
+
+MAX_EVENTS = 200_000       # oldest spans are dropped beyond this
+MAX_ACTIONS = 1_000        # and the oldest action labels beyond this
+
+_NULL = contextlib.nullcontext()
+
+
+class _Span:
+    __slots__ = ("profiler", "name", "start")
+
+    def __init__(self, profiler, name):
+        self.profiler = profiler
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, *exc):
+        self.profiler.record(self.name, self.start, time.perf_counter_ns())
+        return False
+
+
+class Profiler:
+    # Spans arrive from worker threads: every access to events, actions and
+    # threads goes through the lock, and readers work on snapshots.
+    def __init__(self, max_events=MAX_EVENTS, max_actions=MAX_ACTIONS):
+        self.enabled = False
+        self.events = deque(maxlen=max_events)   # (action, name, tid, start ns, end ns)
+        self.actions = OrderedDict()             # action id -> (label, start ns)
+        self.max_actions = max_actions
+        self.action = 0
+        self.count = 0                           # spans recorded so far, for change polling
+        self.threads = {}                        # tid -> thread name
+        self.origin = time.perf_counter_ns()
+        self._lock = threading.Lock()
+
+    def stage(self, name):
+        if not self.enabled:
+            return _NULL
+        return _Span(self, name)
+
+    def begin(self, label):
+        # Starts a new user action; spans recorded from now on (on any
+        # thread) belong to it until the next begin().
+        if not self.enabled:
+            return
+        with self._lock:
+            self.action += 1
+            self.actions[self.action] = (label, time.perf_counter_ns())
+            while len(self.actions) > self.max_actions:
+                self.actions.popitem(last=False)
+
+    def record(self, name, start, end):
+        tid = threading.get_ident()
+        with self._lock:
+            if tid not in self.threads:
+                self.threads[tid] = threading.current_thread().name
+            self.events.append((self.action, name, tid, start, end))
+            self.count += 1
+
+    def clear(self):
+        with self._lock:
+            self.events.clear()
+            latest = self.actions.get(self.action)
+            self.actions = OrderedDict() if latest is None else OrderedDict([(self.action, latest)])
+            self.count = 0
+
+    def snapshot(self):
+        # (events, actions, threads) copied under the lock
+        with self._lock:
+            return list(self.events), dict(self.actions), dict(self.threads)
+
+    def breakdown(self, action=None):
+        # (label, wall seconds, [(stage, total seconds, calls), ...] slowest
+        # first) for one action, by default the latest.  Totals of nested or
+        # parallel stages overlap, so they can add up to more than the wall.
+        action = self.action if action is None else action
+        events, actions, _ = self.snapshot()
+        spans = [e for e in events if e[0] == action]
+        label = actions.get(action, ("", 0))[0]
+        if not spans:
+            return label, 0.0, []
+        totals = {}
+        for _, name, _, start, end in spans:
+            total, calls = totals.get(name, (0, 0))
+            totals[name] = (total + end - start, calls + 1)
+        wall = max(e[4] for e in spans) - min(e[3] for e in spans)
+        stages = sorted(((name, t / 1e9, n) for name, (t, n) in totals.items()),
+                        key=lambda s: s[1], reverse=True)
+        return label, wall / 1e9, stages
+
+    def chrome_trace(self):
+        # Trace-event format: complete ("X") events in microseconds, one
+        # instant marker per action and the thread names as metadata.
+        pid = os.getpid()
+        us = lambda ns: (ns - self.origin) / 1000.0
+        spans, actions, threads = self.snapshot()
+        events = [{"name": "thread_name", "ph": "M", "pid": pid, "tid": tid,
+                   "args": {"name": name}} for tid, name in threads.items()]
+        for action, (label, start) in actions.items():
+            events.append({"name": label, "cat": "action", "ph": "i", "s": "g",
+                           "ts": us(start), "pid": pid, "tid": 0})
+        for action, name, tid, start, end in spans:
+            events.append({"name": name, "cat": name.split(":")[0], "ph": "X",
+                           "ts": us(start), "dur": (end - start) / 1000.0, "pid": pid, "tid": tid,
+                           "args": {"action": actions.get(action, ("",))[0]}})
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+    def export(self, path):
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.chrome_trace(), f)
+
+
+PROFILER = Profiler()
+PROFILER.enabled = os.environ.get("IPS_PROFILE", "") not in ("", "0")
+
+stage = PROFILER.stage
+begin = PROFILER.begin
@@ -0,0 +1,387 @@
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+
+import numpy as np
+import cv2
+
+import image_compare
+import image_ops
+from image_batch import collect_inputs
+
+# ─────────────────────────────────────────────
+# Denoiser auto-tuning.
+#   python image_analyzer.py tune noisy/ clean/ --method median --metric ssim
+# Every candidate (a "denoise" step at one strength, or a "denoise_raw" step
+# with explicit cv2 parameters) is applied to the noisy image and scored
+# against the clean one in a worker process.  Both images reach the workers
+# through shared memory; only the metrics come back.
+# Candidates form lines ordered from weak to strong filtering, along which
+# the score rises until the filter starts to remove detail.  Each line is
+# scored in order and stops once `patience` candidates in a row have not
+# beaten its best: its remaining jobs are cancelled.
+# ─────────────────────────────────────────────
+
+METRICS = ("psnr", "ssim")
+STRENGTHS = tuple(round(s * 0.05, 2) for s in range(21))
+DEFAULT_PATIENCE = 3
+
+# Raw sweeps: one line along the main parameter per setting of the others.
+RAW_GRIDS = {
+    "bilateral":       [[(d, s, s) for s in (10, 25, 50, 75, 100, 150, 200)] for d in (5, 9, 15)],
+    "mean":            [[(k,) for k in range(1, 22, 2)]],
+    "median":          [[(k,) for k in range(1, 22, 2)]],
+    "non-local means": [[(h, t, 21) for h in range(2, 41, 3)] for t in (5, 7)],
+}
+
+
+def candidate_lines(method, raw=False, strengths=STRENGTHS, scale=1.0):
+    if method not in image_ops.DENOISE_METHODS:
+        raise ValueError(f"Unknown denoise method: {method}")
+    if raw:
+        return [[("denoise_raw", (method, *values)) for values in line] for line in RAW_GRIDS[method]]
+    # strengths that map to the same cv2 parameters give the same result
+    line, seen = [], set()
+    for strength in sorted(strengths):
+        key = tuple(sorted(image_ops.denoise_params(method, strength, scale).items()))
+        if key not in seen:
+            seen.add(key)
+            line.append(("denoise", (method, strength)))
+    return [line]
+
+
+def _score(noisy, clean, step, scale):
+    t0 = time.perf_counter()
+    result = image_ops.apply_step(noisy, step, scale)
+    seconds = time.perf_counter() - t0
+    return image_ops.image_quality(clean, result), seconds
+
+
+def _score_shared(noisy_name, clean_name, shape, step, scale):
+    return image_compare.run_shared(_score, [noisy_name, clean_name], shape, step, scale)
+
+
+class ParameterSweep:
+    # Submits every candidate to `pool` (image_compare.make_pool) at once.
+    # callback(step, metrics, seconds, error) is called on a pool thread for
+    # each scored candidate, in line order; cancelled candidates are not
+    # reported.  After the last job the shared memory is released and
+    # on_finished() is called.
+    def __init__(self, pool, noisy, clean, lines, metric="psnr", scale=1.0,
+                 patience=DEFAULT_PATIENCE, callback=None, on_finished=None):
+        if metric not in METRICS:
+            raise ValueError(f"Unknown metric: {metric}")
+        if noisy.shape != clean.shape:
+            raise ValueError(f"Shapes differ: {noisy.shape} vs {clean.shape}")
+        self.metric = metric
+        self.patience = patience
+        self.callback = callback
+        self.on_finished = on_finished
+        self.lines = [list(line) for line in lines]
+        self.results = []                 # (step, metrics, seconds, error) as reported
+        self.finished = threading.Event()
+        self.released = False
+        self._lock = threading.Lock()
+        self._outcomes = [[None] * len(line) for line in self.lines]
+        self._cursor = [0] * len(self.lines)
+        self._best = [None] * len(self.lines)      # (score, index) per line
+        self._closed = [False] * len(self.lines)
+
+        self.shms = []
+        self.futures = []
+        try:
+            self.shms = [image_compare.share(noisy), image_compare.share(clean)]
+            for line in self.lines:
+                self.futures.append([pool.submit(_score_shared, self.shms[0].name, self.shms[1].name,
+                                                 noisy.shape, step, scale) for step in line])
+        except Exception:
+            self.cancel()
+            self.release()
+            raise
+        self.pending = sum(len(line) for line in self.futures)
+        if not self.pending:
+            self.release()
+        for i, line in enumerate(self.futures):
+            for k, future in enumerate(line):
+                future.add_done_callback(lambda f, i=i, k=k: self._done(i, k, f))
+
+    @property
+    def total(self):
+        return sum(len(line) for line in self.lines)
+
+    @property
+    def skipped(self):
+        # Candidates never reported: cancelled before they started, or run
+        # after their line had already stopped improving.
+        return self.total - len(self.results)
+
+    def _done(self, i, k, future):
+        with self._lock:
+            if not future.cancelled():
+                try:
+                    metrics, seconds = future.result()
+                    self._outcomes[i][k] = (metrics, seconds, None)
+                except Exception as exc:
+                    self._outcomes[i][k] = (None, 0.0, str(exc))
+            reports, skip = self._advance(i)
+            self.pending -= 1
+            last = self.pending == 0
+        if self.callback is not None:
+            for report in reports:
+                self.callback(*report)
+        # cancelling runs the cancelled futures' callbacks: not under the lock
+        for other in skip:
+            other.cancel()
+        if last:
+            self.release()
+
+    def _advance(self, i):
+        # Reports line i's results in order while they are available and
+        # closes the line once it stops improving.
+        reports = []
+        outcomes = self._outcomes[i]
+        while not self._closed[i] and self._cursor[i] < len(outcomes) and outcomes[self._cursor[i]]:
+            k = self._cursor[i]
+            self._cursor[i] += 1
+            metrics, seconds, error = outcomes[k]
+            report = (self.lines[i][k], metrics, seconds, error)
+            self.results.append(report)
+            reports.append(report)
+            if metrics is not None and (self._best[i] is None or metrics[self.metric] > self._best[i][0]):
+                self._best[i] = (metrics[self.metric], k)
+            elif k - (self._best[i][1] if self._best[i] else -1) >= self.patience:
+                self._closed[i] = True
+                return reports, self.futures[i][k + 1:]
+        return reports, []
+
+    def best(self):
+        # (step, metrics, seconds) of the highest score so far, or None.
+        with self._lock:
+            scored = [r for r in self.results if r[1] is not None]
+        if not scored:
+            return None
+        step, metrics, seconds, _ = max(scored, key=lambda r: r[1][self.metric])
+        return step, metrics, seconds
+
+    def wait(self, timeout=None):
+        return self.finished.wait(timeout)
+
+    def cancel(self):
+        # Jobs that already started run to completion (cv2 cannot be
+        # interrupted); their results are simply not wanted.
+        for line in self.futures:
+            for future in line:
+                future.cancel()
+
+    def release(self):
+        with self._lock:
+            if self.released:
+                return
+            self.released = True
+        for shm in self.shms:
+            shm.close()
+            shm.unlink()
+        self.finished.set()
+        if self.on_finished is not None:
+            self.on_finished()
+
+
+def tune(noisy, clean, method, metric="psnr", raw=False, strengths=STRENGTHS,
+         patience=DEFAULT_PATIENCE, scale=1.0, workers=None, pool=None):
+    # Blocking helper for scripts: {"best": step, "metrics", "evaluated":
+    # [(step, metrics, seconds)], "skipped"}.
+    own = pool is None
+    pool = image_compare.make_pool(workers) if own else pool
+    try:
+        sweep = ParameterSweep(pool, noisy, clean, candidate_lines(method, raw, strengths, scale),
+                               metric, scale, patience)
+        try:
+            sweep.wait()
+        finally:
+            sweep.cancel()
+            sweep.release()
+    finally:
+        if own:
+            pool.shutdown()
+    return sweep_summary(sweep)
+
+
+def sweep_summary(sweep):
+    best = sweep.best()
+    return {
+        "best": best and best[0],
+        "metrics": best and best[1],
+        "evaluated": [(step, metrics, seconds) for step, metrics, seconds, error in sweep.results
+                      if error is None],
+        "skipped": sweep.skipped,
+    }
+
+
+def json_safe(value):
+    # JSON has no Infinity/NaN (PSNR of identical images is inf): null.
+    if isinstance(value, float):
+        return value if np.isfinite(value) else None
+    if isinstance(value, dict):
+        return {k: json_safe(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [json_safe(v) for v in value]
+    return value
+
+
+# ═══════════════════════════════════════════════════════
+# FOLDER SWEEP
+# ═══════════════════════════════════════════════════════
+def find_pairs(noisy_source, clean_dir):
+    # Noisy images matched to the clean image with the same file name (or,
+    # failing that, the same name with another image extension).
+    clean = {}
+    for path in collect_inputs(clean_dir):
+        name = os.path.basename(path)
+        clean[name] = path
+        clean.setdefault(os.path.splitext(name)[0], path)
+    pairs, missing = [], []
+    for path in collect_inputs(noisy_source):
+        name = os.path.basename(path)
+        match = clean.get(name) or clean.get(os.path.splitext(name)[0])
+        if match is None:
+            missing.append(path)
+        else:
+            pairs.append((path, match))
+    return pairs, missing
+
+
+def overall_best(per_pair, metric):
+    # The candidate with the best mean score over every pair it was
+    # evaluated on for all of them; None if early stopping left none common.
+    scores = {}
+    for summary in per_pair:
+        for step, metrics, _ in summary["evaluated"]:
+            scores.setdefault(step, []).append(metrics[metric])
+    common = {step: np.mean(s) for step, s in scores.items() if len(s) == len(per_pair)}
+    if not common:
+        return None
+    step = max(common, key=common.get)
+    return step, float(common[step])
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        prog="image_analyzer tune",
+        description="Find the denoise setting that best restores noisy images, "
+                    "scored against their clean originals.",
+    )
+    parser.add_argument("noisy", help="directory or glob pattern of noisy images (quote it)")
+    parser.add_argument("clean", help="directory of clean images with the same file names")
+    parser.add_argument("--method", dest="methods", action="append",
+                        choices=image_ops.DENOISE_METHODS,
+                        help="denoise method to tune, repeatable (default: all)")
+    parser.add_argument("--metric", default="psnr", choices=METRICS,
+                        help="score to maximize (default: %(default)s)")
+    parser.add_argument("--raw", action="store_true",
+                        help="sweep the raw cv2 parameters instead of the strength")
+    parser.add_argument("--strengths", default=",".join(f"{s:g}" for s in STRENGTHS),
+                        help="comma-separated strengths to try (default: 0 to 1 in 0.05 steps)")
+    parser.add_argument("--patience", type=int, default=DEFAULT_PATIENCE,
+                        help="stop a sweep line after this many candidates without "
+                             "improvement (default: %(default)s)")
+    parser.add_argument("-j", "--workers", type=int, default=os.cpu_count(),
+                        help="number of worker processes (default: CPU count)")
+    parser.add_argument("-o", "--output", help="write all scores to this JSON file")
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+
+    try:
+        strengths = [float(s) for s in args.strengths.split(",") if s.strip()]
+    except ValueError as exc:
+        print(f"❌ {exc}", file=sys.stderr)
+        return 2
+    if args.patience < 1:
+        print("❌ --patience must be at least 1", file=sys.stderr)
+        return 2
+    methods = args.methods or list(image_ops.DENOISE_METHODS)
+
+    pairs, missing = find_pairs(args.noisy, args.clean)
+    for path in missing:
+        print(f"⚠️ {os.path.basename(path)}  |  no clean image with the same name")
+    if not pairs:
+        print(f"❌ No noisy/clean pairs found for: {args.noisy}", file=sys.stderr)
+        return 1
+
+    print(f"Tuning {', '.join(methods)} on {len(pairs)} pair(s) with {args.workers} worker(s)  |  "
+          f"metric: {args.metric.upper()}")
+    start = time.perf_counter()
+    results = {method: [] for method in methods}
+    failed = 0
+    with image_compare.make_pool(args.workers) as pool:
+        for noisy_path, clean_path in pairs:
+            name = os.path.basename(noisy_path)
+            noisy, clean = cv2.imread(noisy_path), cv2.imread(clean_path)
+            if noisy is None or clean is None or noisy.shape != clean.shape:
+                failed += 1
+                print(f"❌ {name}  |  failed to load, or the two images differ in size")
+                continue
+            # all methods of a pair run at once, so early stopping in one
+            # leaves the cores to the others
+            t0 = time.perf_counter()
+            sweeps = {method: ParameterSweep(pool, noisy, clean,
+                                             candidate_lines(method, args.raw, strengths),
+                                             args.metric, patience=args.patience)
+                      for method in methods}
+            for method, sweep in sweeps.items():
+                sweep.wait()
+                summary = sweep_summary(sweep)
+                summary["path"] = noisy_path
+                results[method].append(summary)
+                if summary["best"] is None:
+                    failed += 1
+                    print(f"❌ {name}  |  {method}: every candidate failed")
+                    continue
+                m = summary["metrics"]
+                print(f"✅ {name}  |  {image_ops.step_spec(summary['best']):<34}  |  PSNR {m['psnr']:.2f} dB  "
+                      f"SSIM {m['ssim']:.4f}  |  {len(summary['evaluated'])} scored, "
+                      f"{summary['skipped']} skipped")
+            print(f"   {time.perf_counter() - t0:.2f}s")
+
+    print()
+    overall = {}
+    for method, per_pair in results.items():
+        per_pair = [s for s in per_pair if s["best"] is not None]
+        best = overall_best(per_pair, args.metric) if per_pair else None
+        if best is None:
+            print(f"⚠️ {method}: no setting was scored on every pair")
+            continue
+        overall[method] = best
+        print(f"🎯 {method:<16} --op \"{image_ops.step_spec(best[0])}\"  |  mean {args.metric.upper()} {best[1]:.4f}")
+    if overall:
+        method, (step, score) = max(overall.items(), key=lambda item: item[1][1])
+        print(f"Best overall: --op \"{image_ops.step_spec(step)}\"  ({args.metric.upper()} {score:.4f})")
+    print(f"Done in {time.perf_counter() - start:.2f}s")
+
+    if args.output:
+        data = {
+            "metric": args.metric,
+            "raw": args.raw,
+            "overall": {m: {"op": image_ops.step_spec(s), "score": v} for m, (s, v) in overall.items()},
+            "pairs": {m: [{"path": s["path"],
+                           "best": s["best"] and image_ops.step_spec(s["best"]),
+                           "metrics": s["metrics"],
+                           "skipped": s["skipped"],
+                           "evaluated": [{"op": image_ops.step_spec(st), "metrics": mt, "seconds": sec}
+                                         for st, mt, sec in s["evaluated"]]}
+                          for s in per_pair]
+                      for m, per_pair in results.items()},
+        }
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(json_safe(data), f, indent=2, allow_nan=False)
+        print(f"Results written to {args.output}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,288 @@
+import argparse
+import os
+import queue
+import sys
+import threading
+import time
+
+import cv2
+
+import fft_backend
+import image_ops
+
+# ─────────────────────────────────────────────
+# Headless video runner.
+#   python image_analyzer.py video in.mp4 -o out.mp4 --op "noise:gaussian:0.2"
+# Decode, processing and encoding run as separate stages connected by
+# bounded queues, so no stage waits on another while there is work and
+# memory stays at a few frames per stage:
+#
+#   decode ─► process (N threads) ─► reorder [+ temporal NL-means] ─► encode
+# ─────────────────────────────────────────────
+
+FOURCC_BY_EXT = {".mp4": "mp4v", ".m4v": "mp4v", ".mov": "mp4v", ".avi": "XVID", ".mkv": "XVID"}
+
+_END = object()
+
+
+class PipelineStopped(Exception):
+    pass
+
+
+def frame_chain(chain, index):
+    # A seeded noise step would freeze the same pattern on every frame:
+    # each frame gets its own stream derived from (seed, frame index).
+    out = []
+    for name, args in chain:
+        if name == "noise" and len(args) > 2:
+            args = args[:2] + ([args[2], index],)
+        out.append((name, args))
+    return out
+
+
+def split_temporal(chain):
+    # (steps before, strength, steps after) around the first NL-means step,
+    # which the temporal stage replaces with its multi-frame version.
+    for k, (name, args) in enumerate(chain):
+        if name == "denoise" and args[0] == "non-local means":
+            return chain[:k], args[1], chain[k + 1:]
+    return None
+
+
+class VideoPipeline:
+    def __init__(self, source, output, chain, workers=None, temporal=0, fourcc=None, queue_size=None):
+        self.source = source
+        self.output = output
+        self.chain = list(chain)
+        self.workers = workers or os.cpu_count() or 1
+        self.temporal = temporal
+        self.fourcc = fourcc
+        self.queue_size = queue_size or 2 * self.workers + 2
+        self.stop = threading.Event()
+        self.errors = []
+        self.frames_done = 0
+        self.total = 0
+        self.fps = 0.0
+
+        self.pre, self.strength, self.post = self.chain, None, []
+        if temporal:
+            split = split_temporal(self.chain)
+            if split is None:
+                raise ValueError("--temporal needs a 'denoise:non-local means:<strength>' step in the chain")
+            self.pre, self.strength, self.post = split
+
+    # ── queue helpers: block, but give up as soon as another stage failed ──
+    def put(self, q, item):
+        while True:
+            if self.stop.is_set():
+                raise PipelineStopped()
+            try:
+                q.put(item, timeout=0.1)
+                return
+            except queue.Full:
+                pass
+
+    def get(self, q):
+        while True:
+            if self.stop.is_set():
+                raise PipelineStopped()
+            try:
+                return q.get(timeout=0.1)
+            except queue.Empty:
+                pass
+
+    def stage(self, fn, *args):
+        def run():
+            try:
+                fn(*args)
+            except PipelineStopped:
+                pass
+            except Exception as exc:
+                self.errors.append(exc)
+                self.stop.set()
+        thread = threading.Thread(target=run, daemon=True)
+        thread.start()
+        return thread
+
+    # ── stages ──
+    def decode(self, cap, out_q):
+        index = 0
+        while True:
+            ok, frame = cap.read()
+            if not ok:
+                break
+            self.put(out_q, (index, frame))
+            index += 1
+        for _ in range(self.workers):
+            self.put(out_q, _END)
+
+    def process(self, in_q, out_q):
+        while True:
+            item = self.get(in_q)
+            if item is _END:
+                self.put(out_q, _END)
+                return
+            index, frame = item
+            self.put(out_q, (index, image_ops.apply_chain(frame, frame_chain(self.pre, index))))
+
+    def ordered(self, in_q):
+        # Frames leave the process threads out of order; yields them in order.
+        pending, following, finished = {}, 0, 0
+        while finished < self.workers:
+            item = self.get(in_q)
+            if item is _END:
+                finished += 1
+                continue
+            pending[item[0]] = item[1]
+            while following in pending:
+                yield following, pending.pop(following)
+                following += 1
+
+    def reorder(self, in_q, out_q):
+        if not self.temporal:
+            for item in self.ordered(in_q):
+                self.put(out_q, item)
+            self.put(out_q, _END)
+            return
+
+        # Sliding window: frame j is denoised once j + r has arrived (or the
+        # stream ended); the buffer keeps frames j - r .. j + r.
+        r = self.temporal // 2
+        buf, base, next_out = [], 0, 0
+
+        def emit(j):
+            frame = image_ops.denoise_multi(buf, j - base, self.strength, self.temporal)
+            self.put(out_q, (j, image_ops.apply_chain(frame, frame_chain(self.post, j))))
+
+        for index, frame in self.ordered(in_q):
+            buf.append(frame)
+            while next_out + r <= index:
+                emit(next_out)
+                next_out += 1
+                if next_out - r > base:
+                    buf.pop(0)
+                    base += 1
+        while next_out < base + len(buf):
+            emit(next_out)
+            next_out += 1
+        self.put(out_q, _END)
+
+    def encode(self, in_q, fps, progress):
+        writer = None
+        start = time.perf_counter()
+        try:
+            while True:
+                item = self.get(in_q)
+                if item is _END:
+                    return
+                frame = item[1]
+                if writer is None:
+                    # opened on the first frame: the chain may change the size
+                    ext = os.path.splitext(self.output)[1].lower()
+                    code = self.fourcc or FOURCC_BY_EXT.get(ext, "mp4v")
+                    writer = cv2.VideoWriter(self.output, cv2.VideoWriter_fourcc(*code), fps,
+                                             (frame.shape[1], frame.shape[0]))
+                    if not writer.isOpened():
+                        raise IOError(f"Failed to open video writer: {self.output} ({code})")
+                writer.write(frame)
+                self.frames_done += 1
+                self.fps = self.frames_done / (time.perf_counter() - start)
+                if progress:
+                    progress(self.frames_done, self.total, self.fps)
+        finally:
+            if writer is not None:
+                writer.release()
+
+    def run(self, progress=None):
+        cap = cv2.VideoCapture(self.source)
+        if not cap.isOpened():
+            raise IOError(f"Failed to open video: {self.source}")
+        fps = cap.get(cv2.CAP_PROP_FPS) or 25.0
+        self.total = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+
+        decoded, processed, ordered = (queue.Queue(self.queue_size) for _ in range(3))
+        start = time.perf_counter()
+        try:
+            threads = [self.stage(self.decode, cap, decoded)]
+            threads += [self.stage(self.process, decoded, processed) for _ in range(self.workers)]
+            threads += [self.stage(self.reorder, processed, ordered),
+                        self.stage(self.encode, ordered, fps, progress)]
+            try:
+                for thread in threads:
+                    while thread.is_alive():
+                        thread.join(0.2)
+            except KeyboardInterrupt:
+                self.stop.set()
+                raise
+        finally:
+            cap.release()
+        if self.errors:
+            raise self.errors[0]
+        elapsed = time.perf_counter() - start
+        return {"frames": self.frames_done, "elapsed": elapsed,
+                "fps": self.frames_done / elapsed if elapsed else 0.0}
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        prog="image_analyzer video",
+        description="Apply an IPS operation chain to every frame of a video.",
+    )
+    parser.add_argument("source", help="input video file")
+    parser.add_argument("-o", "--output", required=True, help="output video file")
+    parser.add_argument(
+        "--op", dest="ops", action="append", default=[], metavar="STEP",
+        help="operation to apply, repeatable and applied in order (same syntax as batch). "
+             "Available: " + ", ".join(image_ops.OPERATIONS),
+    )
+    parser.add_argument("-j", "--workers", type=int, default=os.cpu_count(),
+                        help="frame processing threads (default: CPU count)")
+    parser.add_argument("--temporal", type=int, default=0, metavar="WINDOW",
+                        help="denoise the 'denoise:non-local means' step across WINDOW "
+                             "neighbouring frames (odd, e.g. 3 or 5; default: off)")
+    parser.add_argument("--fourcc", default=None,
+                        help="output codec (default: from the extension, e.g. mp4v, XVID)")
+    parser.add_argument("--fft-backend", default="auto",
+                        choices=["auto"] + list(fft_backend.available_backends()),
+                        help="FFT implementation for frequency filters")
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+
+    if args.temporal and (args.temporal < 3 or args.temporal % 2 == 0):
+        print("❌ --temporal must be an odd window of at least 3 frames", file=sys.stderr)
+        return 2
+    try:
+        chain = [image_ops.parse_step(spec) for spec in args.ops]
+        pipeline = VideoPipeline(args.source, args.output, chain, args.workers, args.temporal, args.fourcc)
+    except ValueError as exc:
+        print(f"❌ {exc}", file=sys.stderr)
+        return 2
+
+    fft_name = fft_backend.configure(args.fft_backend)
+    print(f"Processing {os.path.basename(args.source)} with {pipeline.workers} worker(s)  |  "
+          f"FFT: {fft_name}" + (f"  |  temporal window {args.temporal}" if args.temporal else ""))
+
+    last = [0.0]
+
+    def progress(done, total, fps):
+        now = time.perf_counter()
+        if now - last[0] >= 0.5 or done == total:
+            last[0] = now
+            of = f"/{total}" if total > 0 else ""
+            print(f"\r⏳ {done}{of} frames  |  {fps:.1f} fps", end="", flush=True)
+
+    try:
+        stats = pipeline.run(progress)
+    except (IOError, cv2.error) as exc:
+        print(f"\n❌ {exc}", file=sys.stderr)
+        return 1
+    print(f"\n✅ {stats['frames']} frames in {stats['elapsed']:.2f}s  |  {stats['fps']:.1f} fps  |  "
+          f"{args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,52 @@
+import numpy as np
+import pytest
+
+import fft_backend
+
+
+BACKENDS = list(fft_backend.available_backends(workers=1).items())
+
+
+@pytest.fixture
+def restore_backend():
+    active = fft_backend.get_backend()
+    yield
+    fft_backend._active = active
+
+
+@pytest.mark.parametrize("shape", [(48, 64), (45, 63), (3, 48, 65)])
+@pytest.mark.parametrize("name, backend", BACKENDS, ids=[name for name, _ in BACKENDS])
+def test_backends_match_numpy(name, backend, shape):
+    img = np.random.default_rng(1).random(shape, dtype=np.float32)
+    half = backend.rfft2(img)
+    assert half.dtype == np.complex64
+    assert half.shape == shape[:-1] + (shape[-1] // 2 + 1,)
+    np.testing.assert_allclose(half, np.fft.rfft2(img.astype(np.float64)), rtol=1e-4, atol=1e-3)
+
+    back = backend.irfft2(half, shape[-2:])
+    assert back.dtype == np.float32
+    np.testing.assert_allclose(back, img, atol=1e-5)
+
+
+@pytest.mark.parametrize("width", [64, 65])
+def test_hermitian_full_rebuilds_fft2(width):
+    img = np.random.default_rng(2).random((40, width))
+    full = fft_backend.hermitian_full(np.fft.rfft2(img), width)
+    np.testing.assert_allclose(full, np.fft.fft2(img), atol=1e-9)
+
+
+def test_pad_to_mirrors_the_edge():
+    img = np.arange(12, dtype=np.float32).reshape(3, 4)
+    padded = fft_backend.pad_to(img, (5, 6))
+    assert padded.shape == (5, 6)
+    np.testing.assert_array_equal(padded[:3, :4], img)
+    np.testing.assert_array_equal(padded[3], padded[2])
+    np.testing.assert_array_equal(padded[:, 4], padded[:, 3])
+    assert fft_backend.pad_to(img, (3, 4)) is img
+
+
+def test_set_backend(restore_backend):
+    assert fft_backend.set_backend("opencv").name == "opencv"
+    assert fft_backend.get_backend().name == "opencv"
+    with pytest.raises(ValueError):
+        fft_backend.set_backend("fftw")
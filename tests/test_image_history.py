@@ -0,0 +1,79 @@
+import numpy as np
+import pytest
+
+import image_history
+import image_ops
+
+
+def image(shape=(30, 40, 3), seed=0):
+    return np.random.default_rng(seed).integers(0, 256, shape, dtype=np.uint8)
+
+
+@pytest.mark.parametrize("step", [("invert", ()), ("flip_h", ()), ("flip_v", ()), ("rotate90", ())])
+def test_invertible_steps_store_only_the_step(step):
+    before = image()
+    after = image_ops.apply_step(before, step)
+    entry = image_history.make_entry(step[0], step, before, after)
+    assert isinstance(entry, image_history.StepEntry)
+    assert entry.nbytes == 0
+    np.testing.assert_array_equal(entry.undo(after), before)
+    np.testing.assert_array_equal(entry.redo(before), after)
+
+
+def test_delta_entry_is_exact_in_both_directions():
+    before = image()
+    after = image_ops.denoise(before, "median", 0.5)
+    entry = image_history.make_entry("median", ("denoise", ("median", 0.5)), before, after)
+    assert isinstance(entry, image_history.DeltaEntry)
+    np.testing.assert_array_equal(entry.undo(after), before)
+    np.testing.assert_array_equal(entry.redo(before), after)
+
+
+def test_shape_change_falls_back_to_snapshots():
+    before = image()
+    after = image((20, 10, 3), seed=1)
+    entry = image_history.make_entry("crop", None, before, after)
+    assert isinstance(entry, image_history.SnapshotEntry)
+    np.testing.assert_array_equal(entry.undo(after), before)
+    np.testing.assert_array_equal(entry.redo(before), after)
+
+
+def test_travel_undo_and_redo():
+    history = image_history.History()
+    states = [image()]
+    for step in [("invert", ()), ("denoise", ("mean", 0.5)), ("rotate90", ())]:
+        after = image_ops.apply_step(states[-1], step)
+        history.push(image_history.make_entry(step[0], step, states[-1], after))
+        states.append(after)
+
+    bgr = image_history.travel(states[-1], history.moves_to(1))
+    history.cursor = 1
+    np.testing.assert_array_equal(bgr, states[1])
+    assert history.can_undo() and history.can_redo()
+
+    bgr = image_history.travel(bgr, history.moves_to(3))
+    history.cursor = 3
+    np.testing.assert_array_equal(bgr, states[3])
+    assert not history.can_redo()
+
+
+def test_push_discards_the_redo_branch():
+    history = image_history.History()
+    for label in "abc":
+        history.push(image_history.StepEntry(label, ("invert", ())))
+    history.cursor = 1
+    history.push(image_history.StepEntry("d", ("invert", ())))
+    assert [e.label for e in history.entries] == ["a", "d"]
+    assert history.cursor == 2
+
+
+def test_trim_evicts_the_oldest_entries():
+    history = image_history.History(budget=10 ** 9)
+    before = image()
+    for seed in range(4):
+        history.push(image_history.DeltaEntry(str(seed), before, image(seed=seed + 1)))
+    size = history.entries[0].nbytes
+    history.set_budget(size * 2 + size // 2)
+    assert [e.label for e in history.entries] == ["2", "3"]
+    assert history.cursor == 2
+    assert history.evicted == 2
@@ -0,0 +1,306 @@
+import threading
+
+import cv2
+import numpy as np
+import pytest
+
+import image_ops
+
+
+# ═══════════════════════════════════════════════════════
+# OPERATION REGISTRY
+# ═══════════════════════════════════════════════════════
+@pytest.mark.parametrize("step", [
+    ("invert", ()),
+    ("noise", ("gaussian", 0.3, 4282130541)),
+    ("noise", ("pepper_&_salt", 0.1)),
+    ("denoise", ("non-local means", 0.35)),
+    ("denoise", ("median", 1e-05)),
+    ("denoise_raw", ("bilateral", 9, 75, 75)),
+    ("denoise_raw", ("median", 5)),
+    ("filter", ("low pass", 30)),
+    ("filter_color", ("notch reject", 120)),
+])
+def test_step_spec_round_trip(step):
+    assert image_ops.parse_step(image_ops.step_spec(step)) == step
+
+
+def test_step_spec_keeps_large_seeds_as_integers():
+    seed = image_ops.new_seed()
+    spec = image_ops.step_spec(("noise", ("gaussian", 0.3, seed)))
+    assert spec == f"noise:gaussian:0.3:{seed}"
+
+
+def test_step_spec_accepts_numpy_scalars():
+    step = ("noise", ("speckle", np.float64(0.1), np.uint32(4000000000)))
+    assert image_ops.parse_step(image_ops.step_spec(step)) == ("noise", ("speckle", 0.1, 4000000000))
+
+
+def test_parse_step_rejects_bad_steps():
+    with pytest.raises(ValueError):
+        image_ops.parse_step("sharpen")
+    with pytest.raises(ValueError):
+        image_ops.parse_step("denoise:median")
+    with pytest.raises(ValueError):
+        image_ops.parse_step("denoise_raw:median:4")
+
+
+# ═══════════════════════════════════════════════════════
+# CHAIN CACHE
+# ═══════════════════════════════════════════════════════
+CHAIN = [("invert", ()), ("flip_h", ()), ("denoise", ("mean", 0.5))]
+
+
+def counted_steps(monkeypatch):
+    calls = []
+    apply_step = image_ops.apply_step
+
+    def counting(bgr, step, scale=1.0):
+        calls.append(step)
+        return apply_step(bgr, step, scale)
+
+    monkeypatch.setattr(image_ops, "apply_step", counting)
+    return calls
+
+
+def test_chain_cache_renders_like_apply_chain():
+    source = np.random.default_rng(0).integers(0, 256, (20, 30, 3), dtype=np.uint8)
+    cache = image_ops.ChainCache()
+    np.testing.assert_array_equal(cache.render(source, 1, CHAIN), image_ops.apply_chain(source, CHAIN))
+    assert cache.nbytes == len(CHAIN) * source.nbytes
+
+
+def test_chain_cache_resumes_from_the_unchanged_prefix(monkeypatch):
+    source = np.zeros((20, 30, 3), dtype=np.uint8)
+    cache = image_ops.ChainCache()
+    cache.render(source, 1, CHAIN)
+    calls = counted_steps(monkeypatch)
+
+    edited = CHAIN[:2] + [("denoise", ("median", 0.5))]
+    cache.render(source, 1, edited)
+    assert calls == edited[2:]
+
+    calls.clear()
+    cache.render(source, 1, CHAIN)
+    assert calls == []
+
+    # another source token shares nothing
+    cache.render(source, 2, CHAIN)
+    assert calls == CHAIN
+
+
+def test_chain_cache_evicts_least_recently_used(monkeypatch):
+    source = np.zeros((20, 30, 3), dtype=np.uint8)
+    cache = image_ops.ChainCache(budget=2 * source.nbytes)
+    cache.put(1, 1.0, CHAIN[:1], source)
+    cache.put(1, 1.0, CHAIN[:2], source)
+    cache.render(source, 1, CHAIN[:1])            # hit: now most recent
+    cache.put(1, 1.0, CHAIN, source)              # evicts CHAIN[:2]
+    calls = counted_steps(monkeypatch)
+    cache.render(source, 1, CHAIN[:2])
+    assert calls == CHAIN[1:2]
+
+    cache.set_budget(source.nbytes)
+    assert cache.nbytes == source.nbytes
+    cache.clear()
+    assert cache.nbytes == 0
+
+
+# ═══════════════════════════════════════════════════════
+# DENOISE
+# ═══════════════════════════════════════════════════════
+@pytest.mark.parametrize("method", image_ops.DENOISE_METHODS)
+def test_tiled_denoise_matches_whole_frame(method):
+    bgr = np.random.default_rng(3).integers(0, 256, (150, 170, 3), dtype=np.uint8)
+    whole = image_ops.denoise(bgr, method, 0.5, tile=0)
+    np.testing.assert_array_equal(image_ops.denoise(bgr, method, 0.5, tile=64), whole)
+
+
+@pytest.mark.parametrize("values", [(9, 75, 75), (8, 75, 75), (1, 75, 9), (3, 75, 200)])
+def test_tiled_raw_denoise_matches_whole_frame(values):
+    bgr = np.random.default_rng(4).integers(0, 256, (100, 90, 3), dtype=np.uint8)
+    whole = image_ops.denoise_raw(bgr, "bilateral", *values, tile=0)
+    np.testing.assert_array_equal(image_ops.denoise_raw(bgr, "bilateral", *values, tile=32), whole)
+
+
+@pytest.mark.parametrize("d", [0, -1])
+def test_raw_bilateral_rejects_windows_sized_by_sigma(d):
+    # cv2 would derive the window from sigma_space, beyond the tile halo
+    with pytest.raises(ValueError):
+        image_ops.denoise_raw(np.zeros((8, 8, 3), np.uint8), "bilateral", d, 75, 9)
+    with pytest.raises(ValueError):
+        image_ops.parse_step(f"denoise_raw:bilateral:{d}:75:9")
+
+
+def test_denoise_rejects_unknown_methods():
+    with pytest.raises(ValueError):
+        image_ops.denoise(np.zeros((8, 8, 3), dtype=np.uint8), "wiener", 0.5)
+
+
+# ═══════════════════════════════════════════════════════
+# HSI COLOR SPACE
+# ═══════════════════════════════════════════════════════
+def test_hsi_of_primaries():
+    bgr = np.array([[[0, 0, 255], [0, 255, 0], [255, 0, 0], [128, 128, 128]]], dtype=np.uint8)
+    H, S, I = image_ops.hsi_planes(bgr)
+    np.testing.assert_allclose(H[0, :3], [0, 120, 240], atol=0.01)
+    np.testing.assert_allclose(S[0], [1, 1, 1, 0], atol=1e-6)
+    np.testing.assert_allclose(I[0], [1 / 3, 1 / 3, 1 / 3, 128 / 255], atol=1e-6)
+
+
+def test_hsi_round_trip():
+    bgr = np.random.default_rng(5).integers(0, 256, (70, 80, 3), dtype=np.uint8)
+    back = image_ops.hsi_to_bgr(image_ops.hsi_planes(bgr))
+    assert np.abs(back.astype(int) - bgr).max() <= 1
+
+
+def test_hsi_bands_do_not_change_the_result(monkeypatch):
+    bgr = np.random.default_rng(6).integers(0, 256, (70, 80, 3), dtype=np.uint8)
+    whole = image_ops.hsi_planes(bgr)
+    monkeypatch.setattr(image_ops, "HSI_BAND_ROWS", 16)
+    np.testing.assert_array_equal(image_ops.hsi_planes(bgr), whole)
+    np.testing.assert_array_equal(np.stack(image_ops.compute_hsi(bgr[..., ::-1] / np.float32(255))), whole)
+
+
+def test_hsi_cache_is_keyed_by_version():
+    bgr = np.zeros((10, 10, 3), dtype=np.uint8)
+    cache = image_ops.HSICache()
+    hsi = cache.get(bgr, 1)
+    assert cache.get(bgr, 1) is hsi
+    assert cache.get(bgr, 2) is not hsi
+
+
+# ═══════════════════════════════════════════════════════
+# NOISE
+# ═══════════════════════════════════════════════════════
+@pytest.mark.parametrize("noise_type", image_ops.NOISE_TYPES)
+def test_seeded_noise_is_reproducible(noise_type):
+    bgr = np.random.default_rng(7).integers(0, 256, (600, 50, 3), dtype=np.uint8)
+    first = image_ops.add_noise(bgr, noise_type, 0.3, seed=1234)
+    assert first.dtype == np.uint8 and first.shape == bgr.shape
+    np.testing.assert_array_equal(image_ops.add_noise(bgr, noise_type, 0.3, seed=1234), first)
+    assert not np.array_equal(image_ops.add_noise(bgr, noise_type, 0.3, seed=1235), first)
+
+
+def test_noise_does_not_depend_on_the_worker_count(monkeypatch):
+    bgr = np.random.default_rng(8).integers(0, 256, (600, 50, 3), dtype=np.uint8)
+    pooled = image_ops.add_noise(bgr, "gaussian", 0.5, seed=99)
+    monkeypatch.setattr(image_ops, "TILE_WORKERS", 1)
+    np.testing.assert_array_equal(image_ops.add_noise(bgr, "gaussian", 0.5, seed=99), pooled)
+
+
+def test_noise_bands_use_spawned_streams():
+    bgr = np.random.default_rng(9).integers(0, 256, (600, 50, 3), dtype=np.uint8)
+    noisy = image_ops.add_noise(bgr, "speckle", 0.5, seed=42)
+    rows = image_ops.NOISE_BAND_ROWS
+    streams = np.random.SeedSequence(42).spawn(3)
+    for k, y in enumerate(range(0, 600, rows)):
+        band = image_ops._noise_band(bgr[y:y + rows], "speckle", 0.5, np.random.default_rng(streams[k]), None)
+        np.testing.assert_array_equal(noisy[y:y + rows], band)
+
+
+def test_noise_edge_cases():
+    bgr = np.full((10, 10, 3), 100, dtype=np.uint8)
+    out = image_ops.add_noise(bgr, "poisson", 0.0, seed=1)
+    np.testing.assert_array_equal(out, bgr)
+    assert out is not bgr
+    with pytest.raises(ValueError):
+        image_ops.add_noise(bgr, "uniform", 0.5)
+
+
+# ═══════════════════════════════════════════════════════
+# QUALITY METRICS
+# ═══════════════════════════════════════════════════════
+def reference_quality(reference, bgr):
+    # Straight float64 transcription of MSE / PSNR / SSIM.
+    a, b = reference.astype(np.float64), bgr.astype(np.float64)
+    mse = np.mean((a - b) ** 2)
+    blur = lambda x: cv2.GaussianBlur(x, (image_ops.SSIM_WINDOW, image_ops.SSIM_WINDOW), image_ops.SSIM_SIGMA)
+    mu_a, mu_b = blur(a), blur(b)
+    var_a, var_b = blur(a * a) - mu_a ** 2, blur(b * b) - mu_b ** 2
+    cov = blur(a * b) - mu_a * mu_b
+    c1, c2 = image_ops.SSIM_C1, image_ops.SSIM_C2
+    ssim = (2 * mu_a * mu_b + c1) * (2 * cov + c2) / ((mu_a ** 2 + mu_b ** 2 + c1) * (var_a + var_b + c2))
+    return mse, 10 * np.log10(255 ** 2 / mse), ssim.mean()
+
+
+def noisy_pair(shape=(90, 110, 3)):
+    reference = np.random.default_rng(10).integers(0, 256, shape, dtype=np.uint8)
+    reference = cv2.GaussianBlur(reference, (0, 0), 3)
+    return reference, image_ops.add_noise(reference, "gaussian", 0.3, seed=11)
+
+
+def test_quality_of_identical_images():
+    reference, _ = noisy_pair()
+    q = image_ops.image_quality(reference, reference.copy())
+    assert q["mse"] == 0
+    assert q["psnr"] == float("inf")
+    assert q["ssim"] == pytest.approx(1.0)
+
+
+def test_quality_matches_float64_reference():
+    reference, noisy = noisy_pair()
+    mse, psnr, ssim = reference_quality(reference, noisy)
+    q = image_ops.image_quality(reference, noisy)
+    assert q["mse"] == pytest.approx(mse, rel=1e-12)
+    assert q["psnr"] == pytest.approx(psnr, rel=1e-12)
+    assert q["ssim"] == pytest.approx(ssim, abs=1e-4)
+    assert 0 < q["ssim"] < 1
+
+
+def test_tiled_quality_matches_whole_frame():
+    reference, noisy = noisy_pair()
+    whole = image_ops.image_quality(reference, noisy, tile=0)
+    tiled = image_ops.image_quality(reference, noisy, tile=32, workers=2)
+    assert tiled["mse"] == whole["mse"]
+    assert tiled["psnr"] == whole["psnr"]
+    # float32 blurs: only the rounding differs at tile edges
+    assert tiled["ssim"] == pytest.approx(whole["ssim"], rel=1e-6)
+
+
+def test_quality_rejects_mismatched_shapes():
+    with pytest.raises(ValueError):
+        image_ops.image_quality(np.zeros((10, 10, 3), np.uint8), np.zeros((10, 11, 3), np.uint8))
+
+
+# ═══════════════════════════════════════════════════════
+# SPECTRUM CACHE
+# ═══════════════════════════════════════════════════════
+def test_spectrum_cache_is_keyed_by_version_and_color():
+    bgr = np.random.default_rng(12).integers(0, 256, (40, 50, 3), dtype=np.uint8)
+    cache = image_ops.SpectrumCache(capacity=2)
+    gray = cache.get(bgr, 1)
+    assert cache.get(bgr, 1) is gray
+    color = cache.get(bgr, 1, color=True)
+    assert color is not gray and color.color and not gray.color
+    cache.get(bgr, 2)                              # evicts (1, gray)
+    assert cache.get(bgr, 1, color=True) is color
+    assert cache.get(bgr, 1) is not gray
+
+
+def test_spectrum_cache_computes_outside_the_lock(monkeypatch):
+    bgr = np.zeros((16, 16, 3), dtype=np.uint8)
+    cache = image_ops.SpectrumCache()
+    cached = cache.get(bgr, 1)
+    started, release = threading.Event(), threading.Event()
+    fourier_spectrum = image_ops.fourier_spectrum
+
+    def slow(bgr, color=False):
+        started.set()
+        release.wait(10)
+        return fourier_spectrum(bgr, color)
+
+    monkeypatch.setattr(image_ops, "fourier_spectrum", slow)
+    worker = threading.Thread(target=cache.get, args=(bgr, 2))
+    worker.start()
+    try:
+        assert started.wait(10)
+        hits = []
+        reader = threading.Thread(target=lambda: hits.append(cache.get(bgr, 1)))
+        reader.start()
+        reader.join(2)
+        assert hits == [cached]                    # not stuck behind version 2
+    finally:
+        release.set()
+        worker.join()
+    assert cache.get(bgr, 2) is not None
@@ -0,0 +1,62 @@
+import json
+import threading
+
+import image_profile
+
+
+def test_disabled_profiler_records_nothing():
+    profiler = image_profile.Profiler()
+    with profiler.stage("fft: forward"):
+        pass
+    profiler.begin("Load image")
+    assert profiler.count == 0 and not profiler.actions
+
+
+def test_breakdown_and_trace():
+    profiler = image_profile.Profiler()
+    profiler.enabled = True
+    profiler.begin("Denoise")
+    for _ in range(2):
+        with profiler.stage("denoise: cv2 median"):
+            pass
+    label, wall, stages = profiler.breakdown()
+    assert label == "Denoise" and wall >= 0
+    assert [(name, calls) for name, _, calls in stages] == [("denoise: cv2 median", 2)]
+
+    trace = json.loads(json.dumps(profiler.chrome_trace()))
+    phases = [e["ph"] for e in trace["traceEvents"]]
+    assert phases.count("X") == 2 and phases.count("i") == 1 and phases.count("M") == 1
+
+
+def test_actions_are_capped():
+    profiler = image_profile.Profiler(max_actions=3)
+    profiler.enabled = True
+    for i in range(5):
+        profiler.begin(f"action {i}")
+    assert [label for label, _ in profiler.actions.values()] == ["action 2", "action 3", "action 4"]
+    profiler.clear()
+    assert list(profiler.actions) == [5]
+
+
+def test_export_while_threads_record():
+    profiler = image_profile.Profiler(max_actions=100_000)
+    profiler.enabled = True
+    for i in range(20_000):
+        profiler.begin(f"action {i}")
+
+    def work():
+        for _ in range(5_000):
+            profiler.begin("job")
+            with profiler.stage("work"):
+                pass
+
+    writers = [threading.Thread(target=work) for _ in range(4)]
+    for t in writers:
+        t.start()
+    # long exports, so the writers get scheduled in the middle of one
+    while any(t.is_alive() for t in writers):
+        profiler.chrome_trace()
+        profiler.breakdown()
+    for t in writers:
+        t.join()
+    assert profiler.count == 20_000
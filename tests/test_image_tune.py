@@ -0,0 +1,102 @@
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import cv2
+import numpy as np
+import pytest
+
+import image_ops
+import image_tune
+
+
+@pytest.fixture(scope="module")
+def pair():
+    clean = np.random.default_rng(0).integers(0, 256, (80, 100, 3), dtype=np.uint8)
+    clean = cv2.GaussianBlur(clean, (0, 0), 4)
+    return image_ops.add_noise(clean, "pepper_&_salt", 0.1, seed=1), clean
+
+
+def test_candidate_lines_drop_duplicate_settings():
+    (line,) = image_tune.candidate_lines("median")
+    kernels = [image_ops.denoise_params("median", s)["ksize"] for _, (_, s) in line]
+    assert kernels == sorted(set(kernels))
+    assert len(image_tune.candidate_lines("bilateral", raw=True)) == len(image_tune.RAW_GRIDS["bilateral"])
+    with pytest.raises(ValueError):
+        image_tune.candidate_lines("wiener")
+
+
+def test_sweep_reports_in_order_and_stops_early(pair):
+    noisy, clean = pair
+    lines = image_tune.candidate_lines("mean", raw=True)
+    # one thread: jobs run in submission order, so early stopping is exact
+    with ThreadPoolExecutor(1) as pool:
+        sweep = image_tune.ParameterSweep(pool, noisy, clean, lines, "psnr", patience=2)
+        assert sweep.wait(60)
+    assert sweep.released
+
+    steps = [step for step, _, _, _ in sweep.results]
+    assert steps == lines[0][:len(steps)]
+    scores = [metrics["psnr"] for _, metrics, _, _ in sweep.results]
+    best = int(np.argmax(scores))
+    assert len(scores) == best + 3
+    assert sweep.skipped == sweep.total - len(scores) > 0
+
+    step, metrics, _ = sweep.best()
+    assert step == steps[best]
+    assert metrics == image_ops.image_quality(clean, image_ops.apply_step(noisy, step))
+
+
+def test_sweep_reports_failures(pair):
+    noisy, clean = pair
+    lines = [[("denoise_raw", ("median", 4)), ("denoise_raw", ("median", 3))]]
+    with ThreadPoolExecutor(1) as pool:
+        sweep = image_tune.ParameterSweep(pool, noisy, clean, lines, "ssim")
+        sweep.wait(60)
+    assert sweep.results[0][1] is None and sweep.results[0][3]
+    assert sweep.best()[0] == lines[0][1]
+    assert image_tune.sweep_summary(sweep)["skipped"] == 0
+
+
+def test_sweep_rejects_bad_input(pair):
+    noisy, clean = pair
+    with pytest.raises(ValueError):
+        image_tune.ParameterSweep(None, noisy, clean, [], "mse")
+    with pytest.raises(ValueError):
+        image_tune.ParameterSweep(None, noisy, clean[:10], [], "psnr")
+
+
+def test_tune_in_worker_processes(pair):
+    noisy, clean = pair
+    summary = image_tune.tune(noisy, clean, "median", workers=2)
+    assert summary["best"][1][0] == "median"
+    assert len(summary["evaluated"]) + summary["skipped"] == len(image_tune.candidate_lines("median")[0])
+    assert summary["metrics"]["psnr"] == max(m["psnr"] for _, m, _ in summary["evaluated"])
+
+
+def test_overall_best_uses_steps_scored_on_every_pair():
+    a, b, c = (("denoise", ("mean", s)) for s in (0.1, 0.2, 0.3))
+    per_pair = [
+        {"evaluated": [(a, {"psnr": 30.0}, 0), (b, {"psnr": 31.0}, 0), (c, {"psnr": 40.0}, 0)]},
+        {"evaluated": [(a, {"psnr": 30.0}, 0), (b, {"psnr": 33.0}, 0)]},
+    ]
+    assert image_tune.overall_best(per_pair, "psnr") == (b, 32.0)
+    assert image_tune.overall_best(per_pair + [{"evaluated": [(c, {"psnr": 1.0}, 0)]}], "psnr") is None
+
+
+def test_find_pairs_matches_names(tmp_path):
+    noisy, clean = tmp_path / "noisy", tmp_path / "clean"
+    noisy.mkdir()
+    clean.mkdir()
+    for path in (noisy / "a.png", noisy / "b.png", noisy / "c.png", clean / "a.png", clean / "b.jpg"):
+        path.write_bytes(b"")
+    pairs, missing = image_tune.find_pairs(str(noisy), str(clean))
+    assert [(os.path.basename(n), os.path.basename(c)) for n, c in pairs] == [("a.png", "a.png"),
+                                                                             ("b.png", "b.jpg")]
+    assert [os.path.basename(p) for p in missing] == ["c.png"]
+
+
+def test_json_safe_maps_non_finite_values_to_null():
+    data = {"psnr": float("inf"), "ssim": np.float64(1.0), "l": [(1, float("nan"))]}
+    assert json.dumps(image_tune.json_safe(data), allow_nan=False) == \
+        '{"psnr": null, "ssim": 1.0, "l": [[1, null]]}'